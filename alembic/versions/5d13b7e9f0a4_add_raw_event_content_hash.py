@@ -0,0 +1,36 @@
+"""add_raw_event_content_hash
+
+Revision ID: 5d13b7e9f0a4
+Revises: e2b8f6a03c91
+Create Date: 2026-10-19 13:58:26.310557
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d13b7e9f0a4'
+down_revision: Union[str, None] = 'e2b8f6a03c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'raw_events',
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+    )
+    op.create_index(
+        'ix_raw_events_source_content_hash',
+        'raw_events',
+        ['source_id', 'content_hash'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_raw_events_source_content_hash', table_name='raw_events')
+    op.drop_column('raw_events', 'content_hash')
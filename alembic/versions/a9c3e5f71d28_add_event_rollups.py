@@ -0,0 +1,53 @@
+"""add_event_rollups
+
+Revision ID: a9c3e5f71d28
+Revises: 5d13b7e9f0a4
+Create Date: 2026-10-19 14:31:08.215604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3e5f71d28'
+down_revision: Union[str, None] = '5d13b7e9f0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'event_rollups',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('window_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('window_seconds', sa.Integer(), nullable=False),
+        sa.Column('field', sa.String(length=100), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('value_sum', sa.Float(), nullable=True),
+        sa.Column('value_min', sa.Float(), nullable=True),
+        sa.Column('value_max', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_event_rollups_window',
+        'event_rollups',
+        ['source_id', 'status', 'window_start', 'window_seconds', 'field'],
+        unique=True,
+    )
+    op.create_index(
+        'ix_event_rollups_window_start',
+        'event_rollups',
+        ['window_start'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_rollups_window_start', table_name='event_rollups')
+    op.drop_index('ix_event_rollups_window', table_name='event_rollups')
+    op.drop_table('event_rollups')
@@ -0,0 +1,138 @@
+"""archive_record_id_ranges
+
+Revision ID: b7d2f9e4a613
+Revises: e5a9b3c7d014
+Create Date: 2026-10-19 21:06:44.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f9e4a613'
+down_revision: Union[str, None] = 'e5a9b3c7d014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _insert_runs(connection, runs: list[dict]) -> None:
+    if runs:
+        connection.execute(
+            sa.text(
+                "INSERT INTO archive_record_ranges "
+                "(first_record_id, last_record_id, segment_id) "
+                "VALUES (:first_record_id, :last_record_id, :segment_id)"
+            ),
+            runs,
+        )
+
+
+def upgrade() -> None:
+    op.create_table(
+        'archive_record_ranges',
+        sa.Column('first_record_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('last_record_id', sa.Integer(), nullable=False),
+        sa.Column('segment_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('first_record_id'),
+    )
+    # Folds the per-record rows into runs of consecutive ids of one segment,
+    # in keyset batches; the open run is carried across batches.
+    connection = op.get_bind()
+    current: dict | None = None
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                "SELECT record_id, segment_id FROM archive_record_ids "
+                "WHERE record_id > :last_id ORDER BY record_id LIMIT :limit"
+            ),
+            {'last_id': last_id, 'limit': BATCH_SIZE},
+        ).all()
+        if not rows:
+            break
+        runs = []
+        for record_id, segment_id in rows:
+            if (
+                current is not None
+                and current['segment_id'] == segment_id
+                and current['last_record_id'] == record_id - 1
+            ):
+                current['last_record_id'] = record_id
+                continue
+            if current is not None:
+                runs.append(current)
+            current = {
+                'first_record_id': record_id,
+                'last_record_id': record_id,
+                'segment_id': segment_id,
+            }
+        _insert_runs(connection, runs)
+        last_id = rows[-1][0]
+    if current is not None:
+        _insert_runs(connection, [current])
+    op.drop_table('archive_record_ids')
+    # Never read: per-segment min/max record ids overlap between segments
+    op.drop_index('ix_archive_segments_record_ids', table_name='archive_segments')
+    op.drop_column('archive_segments', 'last_record_id')
+    op.drop_column('archive_segments', 'first_record_id')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'archive_segments', sa.Column('first_record_id', sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        'archive_segments', sa.Column('last_record_id', sa.Integer(), nullable=True)
+    )
+    op.create_index(
+        'ix_archive_segments_record_ids',
+        'archive_segments',
+        ['first_record_id', 'last_record_id'],
+        unique=False,
+    )
+    op.create_table(
+        'archive_record_ids',
+        sa.Column('record_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('segment_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('record_id'),
+    )
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        runs = connection.execute(
+            sa.text(
+                "SELECT first_record_id, last_record_id, segment_id "
+                "FROM archive_record_ranges WHERE first_record_id > :last_id "
+                "ORDER BY first_record_id LIMIT :limit"
+            ),
+            {'last_id': last_id, 'limit': BATCH_SIZE},
+        ).all()
+        if not runs:
+            break
+        connection.execute(
+            sa.text(
+                "INSERT INTO archive_record_ids (record_id, segment_id) "
+                "VALUES (:record_id, :segment_id)"
+            ),
+            [
+                {'record_id': record_id, 'segment_id': segment_id}
+                for first_id, last_id_in_run, segment_id in runs
+                for record_id in range(first_id, last_id_in_run + 1)
+            ],
+        )
+        last_id = runs[-1][0]
+    connection.execute(
+        sa.text(
+            "UPDATE archive_segments SET "
+            "first_record_id = (SELECT min(first_record_id) "
+            "FROM archive_record_ranges WHERE segment_id = archive_segments.id), "
+            "last_record_id = (SELECT max(last_record_id) "
+            "FROM archive_record_ranges WHERE segment_id = archive_segments.id)"
+        )
+    )
+    op.drop_table('archive_record_ranges')
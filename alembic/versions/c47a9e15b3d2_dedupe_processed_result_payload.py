@@ -0,0 +1,51 @@
+"""dedupe_processed_result_payload
+
+Revision ID: c47a9e15b3d2
+Revises: 8b61e0d4c2f7
+Create Date: 2026-10-19 11:20:05.731842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a9e15b3d2'
+down_revision: Union[str, None] = '8b61e0d4c2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'processed_records',
+        sa.Column(
+            'result_is_raw',
+            sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        ),
+    )
+    # Drop the duplicated copy for rows whose result equals the raw payload
+    op.execute(
+        """
+        UPDATE processed_records AS p
+        SET result_payload = NULL, result_is_raw = true
+        FROM raw_events AS r
+        WHERE r.id = p.raw_event_id AND p.result_payload = r.payload
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE processed_records AS p
+        SET result_payload = r.payload
+        FROM raw_events AS r
+        WHERE r.id = p.raw_event_id AND p.result_is_raw
+        """
+    )
+    op.drop_column('processed_records', 'result_is_raw')
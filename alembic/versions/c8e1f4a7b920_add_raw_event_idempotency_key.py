@@ -0,0 +1,36 @@
+"""add_raw_event_idempotency_key
+
+Revision ID: c8e1f4a7b920
+Revises: f3a8c6d1e947
+Create Date: 2026-10-19 18:02:47.513284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e1f4a7b920'
+down_revision: Union[str, None] = 'f3a8c6d1e947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'raw_events',
+        sa.Column('idempotency_key', sa.String(length=128), nullable=True),
+    )
+    op.create_index(
+        'ix_raw_events_idempotency_key',
+        'raw_events',
+        ['idempotency_key'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_raw_events_idempotency_key', table_name='raw_events')
+    op.drop_column('raw_events', 'idempotency_key')
@@ -0,0 +1,43 @@
+"""add_backfill_ranges
+
+Revision ID: d71e4b2a9c05
+Revises: a9c3e5f71d28
+Create Date: 2026-10-19 16:02:47.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd71e4b2a9c05'
+down_revision: Union[str, None] = 'a9c3e5f71d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'backfill_ranges',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job', sa.String(length=100), nullable=False),
+        sa.Column('start_id', sa.Integer(), nullable=False),
+        sa.Column('end_id', sa.Integer(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_backfill_ranges_job_start',
+        'backfill_ranges',
+        ['job', 'start_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_backfill_ranges_job_start', table_name='backfill_ranges')
+    op.drop_table('backfill_ranges')
@@ -0,0 +1,101 @@
+"""compress_event_payloads
+
+Revision ID: e2b8f6a03c91
+Revises: c47a9e15b3d2
+Create Date: 2026-10-19 12:41:52.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.compression import get_payload_codec
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8f6a03c91'
+down_revision: Union[str, None] = 'c47a9e15b3d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+COLUMNS = (('raw_events', 'payload'), ('processed_records', 'result_payload'))
+
+
+def _compress_existing_rows(table: str, column: str) -> None:
+    codec = get_payload_codec()
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.text(
+                f"SELECT id, {column} FROM {table} "
+                f"WHERE id > :last_id AND octet_length({column}) >= :threshold "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {
+                'last_id': last_id,
+                'threshold': codec.threshold_bytes,
+                'limit': BATCH_SIZE,
+            },
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row_id, value in rows:
+            encoded = codec.encode(codec.decode(value))
+            if encoded != bytes(value):
+                updates.append({'row_id': row_id, 'value': encoded})
+        if updates:
+            connection.execute(
+                sa.text(f"UPDATE {table} SET {column} = :value WHERE id = :row_id"),
+                updates,
+            )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    # Existing text becomes plain UTF-8 bytes, which the codec reads as-is;
+    # rows above the threshold are then compressed in place.
+    for table, column in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.LargeBinary(),
+            postgresql_using=f"convert_to({column}, 'UTF8')",
+        )
+    for table, column in COLUMNS:
+        _compress_existing_rows(table, column)
+
+
+def downgrade() -> None:
+    codec = get_payload_codec()
+    connection = op.get_bind()
+    for table, column in COLUMNS:
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.text(
+                    f"SELECT id, {column} FROM {table} "
+                    f"WHERE id > :last_id AND get_byte({column}, 0) = 0 "
+                    "ORDER BY id LIMIT :limit"
+                ),
+                {'last_id': last_id, 'limit': BATCH_SIZE},
+            ).all()
+            if not rows:
+                break
+            connection.execute(
+                sa.text(f"UPDATE {table} SET {column} = :value WHERE id = :row_id"),
+                [
+                    {'row_id': row_id, 'value': codec.decode(value).encode('utf-8')}
+                    for row_id, value in rows
+                ],
+            )
+            last_id = rows[-1][0]
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Text(),
+            postgresql_using=f"convert_from({column}, 'UTF8')",
+        )
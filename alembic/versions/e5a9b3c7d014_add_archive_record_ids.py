@@ -0,0 +1,31 @@
+"""add_archive_record_ids
+
+Revision ID: e5a9b3c7d014
+Revises: c8e1f4a7b920
+Create Date: 2026-10-19 18:31:09.274615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9b3c7d014'
+down_revision: Union[str, None] = 'c8e1f4a7b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'archive_record_ids',
+        sa.Column('record_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('segment_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('record_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('archive_record_ids')
@@ -0,0 +1,53 @@
+"""add_archive_segments
+
+Revision ID: f3a8c6d1e947
+Revises: d71e4b2a9c05
+Create Date: 2026-10-19 17:24:13.905116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c6d1e947'
+down_revision: Union[str, None] = 'd71e4b2a9c05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'archive_segments',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('day', sa.String(length=10), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('first_raw_event_id', sa.Integer(), nullable=False),
+        sa.Column('last_raw_event_id', sa.Integer(), nullable=False),
+        sa.Column('first_record_id', sa.Integer(), nullable=True),
+        sa.Column('last_record_id', sa.Integer(), nullable=True),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('path'),
+    )
+    op.create_index(
+        'ix_archive_segments_raw_event_ids',
+        'archive_segments',
+        ['first_raw_event_id', 'last_raw_event_id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_archive_segments_record_ids',
+        'archive_segments',
+        ['first_record_id', 'last_record_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_archive_segments_record_ids', table_name='archive_segments')
+    op.drop_index('ix_archive_segments_raw_event_ids', table_name='archive_segments')
+    op.drop_table('archive_segments')
@@ -1,8 +1,5 @@
 from functools import lru_cache
 import os
-import dotenv
-
-dotenv.load_dotenv(".env")
 
 
 class Settings:
@@ -13,21 +10,212 @@ class Settings:
         self.app_debug: bool = os.getenv("APP_DEBUG", "true").lower() == "true"
         self.api_host: str = os.getenv("API_HOST", "0.0.0.0")
         self.api_port: int = int(os.getenv("API_PORT", "8000"))
+        # Production launcher (python -m app.main outside development);
+        # API_WORKERS=0 starts one worker process per CPU
+        self.api_workers: int = int(os.getenv("API_WORKERS", "0"))
+        self.api_backlog: int = int(os.getenv("API_BACKLOG", "2048"))
+        self.api_graceful_shutdown_seconds: int = int(
+            os.getenv("API_GRACEFUL_SHUTDOWN_SECONDS", "30")
+        )
+        self.api_warmup: bool = os.getenv("API_WARMUP", "true").lower() == "true"
         self.postgres_host: str = os.getenv("POSTGRES_HOST", "localhost")
         self.postgres_port: int = int(os.getenv("POSTGRES_PORT", "5432"))
         self.postgres_db: str = os.getenv("POSTGRES_DB", "")
         self.postgres_user: str = os.getenv("POSTGRES_USER", "")
         self.postgres_password: str = os.getenv("POSTGRES_PASSWORD", "")
+        self.db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.db_pool_timeout_seconds: float = float(
+            os.getenv("DB_POOL_TIMEOUT_SECONDS", "30")
+        )
+        self.db_pool_recycle_seconds: int = int(
+            os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")
+        )
+        self.db_pool_pre_ping: bool = (
+            os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+        )
+        # asyncpg prepared statements cached per connection; 0 for PgBouncer
+        self.db_statement_cache_size: int = int(
+            os.getenv("DB_STATEMENT_CACHE_SIZE", "100")
+        )
+        # Read-only endpoints use a separate pool, on this replica if set
+        self.db_read_replica_url: str = os.getenv("DB_READ_REPLICA_URL", "")
+        self.db_read_pool_size: int = int(os.getenv("DB_READ_POOL_SIZE", "5"))
+        self.db_read_max_overflow: int = int(os.getenv("DB_READ_MAX_OVERFLOW", "5"))
 
         # Redis settings
         self.redis_host: str = os.getenv("REDIS_HOST", "localhost")
         self.redis_port: int = int(os.getenv("REDIS_PORT", "6379"))
+        # The cache is best-effort: short timeouts keep a slow Redis from
+        # adding latency to ingest
+        self.redis_connect_timeout_seconds: float = float(
+            os.getenv("REDIS_CONNECT_TIMEOUT_SECONDS", "0.2")
+        )
+        self.redis_timeout_seconds: float = float(
+            os.getenv("REDIS_TIMEOUT_SECONDS", "0.1")
+        )
 
         # RabbitMQ settings
         self.rabbitmq_host: str = os.getenv("RABBITMQ_HOST", "localhost")
         self.rabbitmq_port: int = int(os.getenv("RABBITMQ_PORT", "5672"))
         self.rabbitmq_user: str = os.getenv("RABBITMQ_USER", "")
         self.rabbitmq_password: str = os.getenv("RABBITMQ_PASSWORD", "")
+        self.rabbitmq_connect_timeout_seconds: float = float(
+            os.getenv("RABBITMQ_CONNECT_TIMEOUT_SECONDS", "2")
+        )
+        # Socket reads and a broker blocking publishes (resource alarms)
+        self.rabbitmq_timeout_seconds: float = float(
+            os.getenv("RABBITMQ_TIMEOUT_SECONDS", "5")
+        )
+
+        # Circuit breakers for Redis and RabbitMQ: this many consecutive
+        # failures open the circuit, and calls fail fast until a trial call
+        # after CIRCUIT_RESET_TIMEOUT_SECONDS succeeds
+        self.circuit_failure_threshold: int = int(
+            os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")
+        )
+        self.circuit_reset_timeout_seconds: float = float(
+            os.getenv("CIRCUIT_RESET_TIMEOUT_SECONDS", "10")
+        )
+
+        # Payload compression
+        self.payload_compression_threshold: int = int(
+            os.getenv("PAYLOAD_COMPRESSION_THRESHOLD", "512")
+        )
+        self.payload_compression_level: int = int(
+            os.getenv("PAYLOAD_COMPRESSION_LEVEL", "6")
+        )
+        self.payload_dictionary_dir: str = os.getenv("PAYLOAD_DICTIONARY_DIR", "")
+
+        # Content-hash de-duplication
+        self.dedup_enabled: bool = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+        self.dedup_recent_capacity: int = int(
+            os.getenv("DEDUP_RECENT_CAPACITY", "100000")
+        )
+
+        # Transactional outbox
+        self.outbox_enabled: bool = (
+            os.getenv("OUTBOX_ENABLED", "false").lower() == "true"
+        )
+        self.outbox_routing_key: str = os.getenv(
+            "OUTBOX_ROUTING_KEY", "etl.processed"
+        )
+
+        # Per-source validation rules (YAML or JSON); empty disables them
+        self.validation_rules_path: str = os.getenv("VALIDATION_RULES_PATH", "")
+
+        # Per-source transforms (YAML or JSON); empty disables them
+        self.transform_rules_path: str = os.getenv("TRANSFORM_RULES_PATH", "")
+        # Process pool for sources marked process_pool; 0 runs transforms inline
+        self.transform_process_workers: int = int(
+            os.getenv("TRANSFORM_PROCESS_WORKERS", "0")
+        )
+        self.transform_pool_min_rows: int = int(
+            os.getenv("TRANSFORM_POOL_MIN_ROWS", "1000")
+        )
+
+        # Admission control for the ingest endpoints; 0 sizes the concurrency
+        # limit to the DB pool (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+        self.admission_max_concurrent: int = int(
+            os.getenv("ADMISSION_MAX_CONCURRENT", "0")
+        )
+        self.admission_max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "50"))
+        self.admission_queue_timeout_seconds: float = float(
+            os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "0.5")
+        )
+        # Per-source token buckets (requests/second); 0 disables them.
+        # ADMISSION_SOURCE_RATES overrides single sources: "a=50,b=5"
+        self.admission_source_rate: float = float(
+            os.getenv("ADMISSION_SOURCE_RATE", "0")
+        )
+        self.admission_source_burst: float = float(
+            os.getenv("ADMISSION_SOURCE_BURST", "0")
+        )
+        self.admission_source_rates: str = os.getenv("ADMISSION_SOURCE_RATES", "")
+        self.admission_max_sources: int = int(
+            os.getenv("ADMISSION_MAX_SOURCES", "10000")
+        )
+
+        # Tumbling-window event stats (served by /api/stats)
+        self.stats_enabled: bool = (
+            os.getenv("STATS_ENABLED", "false").lower() == "true"
+        )
+        self.stats_window_seconds: int = int(os.getenv("STATS_WINDOW_SECONDS", "60"))
+        self.stats_flush_seconds: float = float(os.getenv("STATS_FLUSH_SECONDS", "10"))
+        # Comma-separated numeric payload fields to sum/min/max per window
+        self.stats_fields: str = os.getenv("STATS_FIELDS", "")
+
+        # gRPC IngestBatch / IngestStream micro-batches: committed and
+        # acknowledged every GRPC_BATCH_SIZE events or GRPC_BATCH_FLUSH_SECONDS
+        self.grpc_batch_size: int = int(os.getenv("GRPC_BATCH_SIZE", "500"))
+        self.grpc_batch_flush_seconds: float = float(
+            os.getenv("GRPC_BATCH_FLUSH_SECONDS", "0.05")
+        )
+
+        # Event-loop lag sampling and blocked-loop detection (API, gRPC,
+        # workers); stalls longer than the threshold are logged with a stack
+        self.loop_monitor_enabled: bool = (
+            os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+        )
+        self.loop_monitor_interval_seconds: float = float(
+            os.getenv("LOOP_MONITOR_INTERVAL_SECONDS", "0.1")
+        )
+        self.loop_block_threshold_seconds: float = float(
+            os.getenv("LOOP_BLOCK_THRESHOLD_SECONDS", "0.25")
+        )
+
+        # Metrics live in each process; workers serve theirs as JSON on this
+        # port (0 = off), since GET /api/metrics only sees the API process
+        self.worker_metrics_host: str = os.getenv("WORKER_METRICS_HOST", "0.0.0.0")
+        self.worker_metrics_port: int = int(os.getenv("WORKER_METRICS_PORT", "0"))
+
+        # Local SQLite (WAL) spool: ingest falls back to it when the database
+        # fails or takes longer than SPOOL_WRITE_TIMEOUT_SECONDS (0 waits),
+        # and a drainer replays it once the database is back
+        self.spool_enabled: bool = os.getenv("SPOOL_ENABLED", "false").lower() == "true"
+        self.spool_path: str = os.getenv("SPOOL_PATH", "spool.db")
+        self.spool_max_events: int = int(os.getenv("SPOOL_MAX_EVENTS", "1000000"))
+        self.spool_write_timeout_seconds: float = float(
+            os.getenv("SPOOL_WRITE_TIMEOUT_SECONDS", "2")
+        )
+        self.spool_drain_batch_size: int = int(
+            os.getenv("SPOOL_DRAIN_BATCH_SIZE", "500")
+        )
+        self.spool_drain_interval_seconds: float = float(
+            os.getenv("SPOOL_DRAIN_INTERVAL_SECONDS", "1")
+        )
+
+        # Backfill (python -m app.workers.backfill): raw_events id ranges of
+        # BACKFILL_RANGE_SIZE split across BACKFILL_WORKERS, committed every
+        # BACKFILL_CHUNK_SIZE rows and capped at BACKFILL_MAX_ROWS_PER_SECOND
+        # (0 = unlimited) to protect a live database
+        self.backfill_workers: int = int(os.getenv("BACKFILL_WORKERS", "4"))
+        self.backfill_range_size: int = int(
+            os.getenv("BACKFILL_RANGE_SIZE", "10000")
+        )
+        self.backfill_chunk_size: int = int(os.getenv("BACKFILL_CHUNK_SIZE", "500"))
+        self.backfill_max_rows_per_second: float = float(
+            os.getenv("BACKFILL_MAX_ROWS_PER_SECOND", "2000")
+        )
+
+        # Retention (python -m app.workers.retention): events older than
+        # RETENTION_DAYS (0 = keep forever) move, with their processed
+        # records, to gzipped NDJSON segments under ARCHIVE_PATH
+        self.retention_days: int = int(os.getenv("RETENTION_DAYS", "0"))
+        self.archive_path: str = os.getenv("ARCHIVE_PATH", "archive")
+        self.retention_batch_size: int = int(
+            os.getenv("RETENTION_BATCH_SIZE", "1000")
+        )
+
+        # Span tracing to an OTLP/JSON lines file (app.tracing); the sample
+        # rate applies per trace, at its entry point
+        self.tracing_enabled: bool = (
+            os.getenv("TRACING_ENABLED", "false").lower() == "true"
+        )
+        self.tracing_sample_rate: float = float(
+            os.getenv("TRACING_SAMPLE_RATE", "0.01")
+        )
+        self.tracing_path: str = os.getenv("TRACING_PATH", "traces.jsonl")
 
         # Logging
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
@@ -43,5 +231,9 @@ class Settings:
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    # Return cached Settings instance to avoid re-reading environment variables
+    # Return cached Settings instance to avoid re-reading environment variables.
+    # .env is loaded here, on first use, rather than as an import side effect.
+    from app.utils.env import load_dataenv
+
+    load_dataenv(".env")
     return Settings()
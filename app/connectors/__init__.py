@@ -1,3 +1,27 @@
+from typing import Any
+
 from .base import IngestionConnector as IngestionConnector
 from .csv import CsvFileIngestionConnector as CsvFileIngestionConnector
+from .factory import (
+    connector_for_path as connector_for_path,
+    iter_path_batches as iter_path_batches,
+)
 from .file import JsonFileIngestionConnector as JsonFileIngestionConnector
+from .jsonl import (
+    ParallelJsonlIngestionConnector as ParallelJsonlIngestionConnector,
+    shutdown_parser_pools as shutdown_parser_pools,
+)
+
+# The columnar connector pulls in NumPy; load it only when it is used
+_LAZY = {
+    "ColumnarBatch": ".columnar",
+    "ColumnarCsvIngestionConnector": ".columnar",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        from importlib import import_module
+
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,183 @@
+import csv
+import re
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+
+from .base import IngestionConnector
+
+INT = "int"
+FLOAT = "float"
+DATE = "date"
+CATEGORY = "category"
+STRING = "string"
+
+# Widening order when a later chunk no longer fits the inferred type
+_FALLBACK = {INT: FLOAT, FLOAT: STRING, DATE: STRING, CATEGORY: STRING}
+
+_CONVERSION_ERRORS = (ValueError, OverflowError)
+
+# Only plain dates: numpy would also take "2000-01-01T10:30" and drop the time
+_PLAIN_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Integer text a float cannot hold as written: leading zeros (zip codes,
+# ids) or more digits than a double keeps exactly
+_NOT_A_FLOAT = re.compile(r"[+-]?(0\d+|\d{16,})")
+
+
+class ColumnarBatch:
+    # One chunk of a CSV file held as typed NumPy columns. Missing numeric and
+    # date values are NaN/NaT; categorical columns keep codes + categories.
+
+    def __init__(
+        self,
+        columns: dict[str, np.ndarray],
+        types: dict[str, str],
+        categories: dict[str, np.ndarray],
+    ) -> None:
+        self.columns = columns
+        self.types = types
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def _column_values(self, name: str) -> list[Any]:
+        column = self.columns[name]
+        column_type = self.types[name]
+        if column_type == INT:
+            return column.tolist()
+        if column_type == FLOAT:
+            values = column.astype(object)
+            values[np.isnan(column)] = None
+            return values.tolist()
+        if column_type == DATE:
+            values = np.datetime_as_string(column, unit="D").astype(object)
+            values[np.isnat(column)] = None
+            return values.tolist()
+        if column_type == CATEGORY:
+            return self.categories[name][column].tolist()
+        return column.tolist()
+
+    def to_records(self) -> list[dict[str, Any]]:
+        names = list(self.columns)
+        values = [self._column_values(name) for name in names]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def _convert(
+    values: tuple[str, ...], column_type: str
+) -> tuple[np.ndarray, np.ndarray | None]:
+    # Whole-column conversions; map()/fromiter keep the per-value work in C.
+    count = len(values)
+    missing = "" in values
+    if column_type == INT:
+        if missing:
+            raise ValueError("missing values in int column")
+        numbers = list(map(int, values))
+        # "004" or "+4" would not come back as written
+        if list(map(str, numbers)) != list(values):
+            raise ValueError("int column values do not round-trip")
+        # OverflowError past int64
+        return np.fromiter(numbers, dtype=np.int64, count=count), None
+    if column_type == FLOAT:
+        if any(_NOT_A_FLOAT.fullmatch(value) for value in values):
+            raise ValueError("float column would change integer text")
+        if missing:
+            values = tuple(value or "nan" for value in values)
+        return np.fromiter(map(float, values), dtype=np.float64, count=count), None
+    if column_type == DATE:
+        if not all(_PLAIN_DATE.fullmatch(value) for value in values if value):
+            raise ValueError("date column values are not plain dates")
+        # "" parses as NaT
+        return np.array(values, dtype="datetime64[D]"), None
+    if column_type == CATEGORY:
+        index: dict[str, int] = {}
+        codes = np.fromiter(
+            (index.setdefault(value, len(index)) for value in values),
+            dtype=np.int32,
+            count=count,
+        )
+        return codes, np.array(list(index), dtype=object)
+    return np.array(values, dtype=object), None
+
+
+def _infer_type(values: tuple[str, ...], category_ratio: float) -> str:
+    present = tuple(value for value in values if value != "")
+    if not present:
+        return STRING
+    for candidate in (INT, FLOAT, DATE):
+        try:
+            _convert(present, candidate)
+        except _CONVERSION_ERRORS:
+            continue
+        if candidate == INT and len(present) != len(values):
+            return FLOAT
+        return candidate
+    if len(set(present)) <= len(present) * category_ratio:
+        return CATEGORY
+    return STRING
+
+
+class ColumnarCsvIngestionConnector(IngestionConnector):
+    def __init__(
+        self,
+        path: str,
+        chunk_rows: int = 50_000,
+        category_ratio: float = 0.5,
+    ) -> None:
+        self._path = Path(path)
+        self._chunk_rows = chunk_rows
+        self._category_ratio = category_ratio
+
+    def iter_column_batches(self) -> Iterator[ColumnarBatch]:
+        if not self._path.exists():
+            return
+        with self._path.open("r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return
+            width = len(header)
+            types: dict[str, str] = {}
+            while True:
+                chunk = list(islice(reader, self._chunk_rows))
+                if not chunk:
+                    break
+                if any(len(row) != width for row in chunk):
+                    chunk = [(row + [""] * width)[:width] for row in chunk if row]
+                if chunk:
+                    yield self._build_batch(header, chunk, types)
+
+    def _build_batch(
+        self,
+        header: list[str],
+        rows: list[list[str]],
+        types: dict[str, str],
+    ) -> ColumnarBatch:
+        # Types are inferred on the first chunk and reused for the rest of the
+        # file; a column only widens (int -> float -> string) if a later chunk
+        # stops fitting.
+        columns: dict[str, np.ndarray] = {}
+        categories: dict[str, np.ndarray] = {}
+        for name, values in zip(header, zip(*rows)):
+            column_type = types.get(name) or _infer_type(values, self._category_ratio)
+            while True:
+                try:
+                    converted, column_categories = _convert(values, column_type)
+                    break
+                except _CONVERSION_ERRORS:
+                    column_type = _FALLBACK[column_type]
+            types[name] = column_type
+            columns[name] = converted
+            if column_categories is not None:
+                categories[name] = column_categories
+        return ColumnarBatch(columns, dict(types), categories)
+
+    async def fetch_batch(self) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        for batch in self.iter_column_batches():
+            rows.extend(batch.to_records())
+        return rows
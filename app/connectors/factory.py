@@ -0,0 +1,36 @@
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from .base import IngestionConnector
+from .file import JsonFileIngestionConnector
+from .jsonl import ParallelJsonlIngestionConnector
+
+SUPPORTED_SUFFIXES = (".csv", ".json", ".jsonl", ".ndjson")
+
+
+def connector_for_path(path: str) -> IngestionConnector:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        from .columnar import ColumnarCsvIngestionConnector
+
+        return ColumnarCsvIngestionConnector(path)
+    if suffix in (".jsonl", ".ndjson"):
+        return ParallelJsonlIngestionConnector(path)
+    # .json and anything unrecognised: a JSON document (object or array)
+    return JsonFileIngestionConnector(path)
+
+
+async def iter_path_batches(path: str) -> AsyncIterator[list[dict[str, Any]]]:
+    # Streams a file in the connector's natural batches; formats without
+    # chunked reads yield the whole file once.
+    connector = connector_for_path(path)
+    if Path(path).suffix.lower() == ".csv":
+        for chunk in connector.iter_column_batches():  # type: ignore[attr-defined]
+            yield chunk.to_records()
+    elif isinstance(connector, ParallelJsonlIngestionConnector):
+        async for batch in connector.iter_batches():
+            yield batch
+    else:
+        batch = await connector.fetch_batch()
+        if batch:
+            yield batch
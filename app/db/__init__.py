@@ -1,6 +1,12 @@
 from .engine import (
     AsyncSessionLocal as AsyncSessionLocal,
-    engine as engine,
+    ReadSessionLocal as ReadSessionLocal,
+    dispose_engines as dispose_engines,
+    get_engine as get_engine,
     get_db_session as get_db_session,
+    get_read_db_session as get_read_db_session,
+    get_read_engine as get_read_engine,
     init_db as init_db,
+    pool_stats as pool_stats,
+    warm_up_engine as warm_up_engine,
 )
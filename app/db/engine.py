@@ -1,5 +1,8 @@
-from typing import AsyncGenerator
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Callable
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -10,18 +13,74 @@ from sqlalchemy.ext.asyncio import (
 from app.config import get_settings
 from app.models import Base
 
-settings = get_settings()
 
-engine: AsyncEngine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    future=True,
-)
+def _create_engine(url: str, pool_size: int, max_overflow: int) -> AsyncEngine:
+    settings = get_settings()
+    connect_args: dict[str, Any] = {}
+    if url.startswith("postgresql+asyncpg"):
+        # 0 disables both caches, which PgBouncer in transaction mode needs
+        connect_args = {
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "statement_cache_size": settings.db_statement_cache_size,
+        }
+    return create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-)
+
+@lru_cache(maxsize=1)
+def get_engine() -> AsyncEngine:
+    # Built on first use: importing app.db neither reads settings nor loads
+    # the asyncpg dialect, and processes that never query never get a pool.
+    settings = get_settings()
+    return _create_engine(
+        settings.database_url, settings.db_pool_size, settings.db_max_overflow
+    )
+
+
+@lru_cache(maxsize=1)
+def get_read_engine() -> AsyncEngine:
+    # Reads get their own pool, on the replica when one is configured, so
+    # slow dashboard queries cannot take the connections ingest needs.
+    settings = get_settings()
+    return _create_engine(
+        settings.db_read_replica_url or settings.database_url,
+        settings.db_read_pool_size,
+        settings.db_read_max_overflow,
+    )
+
+
+class _LazySessionFactory:
+    def __init__(self, engine_getter: Callable[[], AsyncEngine]) -> None:
+        self._engine_getter = engine_getter
+        self._factory: async_sessionmaker[AsyncSession] | None = None
+
+    def __call__(self, **kwargs: Any) -> AsyncSession:
+        if self._factory is None:
+            self._factory = async_sessionmaker(
+                bind=self._engine_getter(),
+                expire_on_commit=False,
+            )
+        return self._factory(**kwargs)
+
+
+AsyncSessionLocal = _LazySessionFactory(get_engine)
+ReadSessionLocal = _LazySessionFactory(get_read_engine)
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatible ``from app.db.engine import engine``
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -32,6 +91,50 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
+async def get_read_db_session() -> AsyncGenerator[AsyncSession, None]:
+    # For read-only endpoints; never commit through this session
+    session: AsyncSession = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def pool_stats() -> dict[str, dict[str, int]]:
+    # Only engines that were already created are reported
+    engines = {"primary": get_engine, "read": get_read_engine}
+    stats: dict[str, dict[str, int]] = {}
+    for name, getter in engines.items():
+        if not getter.cache_info().currsize:
+            continue
+        pool = getter().pool
+        if not hasattr(pool, "checkedout"):
+            continue
+        stats[name] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+    return stats
+
+
+async def dispose_engines() -> None:
+    for getter in (get_engine, get_read_engine):
+        if getter.cache_info().currsize:
+            await getter().dispose()
+
+
 async def init_db() -> None:
-    async with engine.begin() as connection:
+    async with get_engine().begin() as connection:
         await connection.run_sync(Base.metadata.create_all)
+
+
+async def warm_up_engine(connections: int, engine: AsyncEngine | None = None) -> None:
+    # Connects up front so the first requests do not pay for it. All
+    # connections are held at once, otherwise the pool would reuse just one.
+    engine = engine or get_engine()
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text("SELECT 1"))
@@ -22,19 +22,26 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import struct_pb2 as google_dot_protobuf_dot_struct__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x65tlpay.proto\x12\x06\x65tlpay\":\n\rIngestRequest\x12\x13\n\x0bsource_name\x18\x01 \x01(\t\x12\x14\n\x0cpayload_json\x18\x02 \x01(\t\",\n\x0eIngestResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t2E\n\nEtlService\x12\x37\n\x06Ingest\x12\x15.etlpay.IngestRequest\x1a\x16.etlpay.IngestResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x65tlpay.proto\x12\x06\x65tlpay\x1a\x1cgoogle/protobuf/struct.proto\"\x93\x01\n\rIngestRequest\x12\x13\n\x0bsource_name\x18\x01 \x01(\t\x12\x16\n\x0cpayload_json\x18\x02 \x01(\tH\x00\x12\x31\n\x0epayload_struct\x18\x03 \x01(\x0b\x32\x17.google.protobuf.StructH\x00\x12\x17\n\rpayload_bytes\x18\x04 \x01(\x0cH\x00\x42\t\n\x07payload\",\n\x0eIngestResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\";\n\x12IngestBatchRequest\x12%\n\x06\x65vents\x18\x01 \x03(\x0b\x32\x15.etlpay.IngestRequest\"9\n\x0cIngestResult\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"p\n\x13IngestBatchResponse\x12\x0e\n\x06offset\x18\x01 \x01(\x03\x12%\n\x07results\x18\x02 \x03(\x0b\x32\x14.etlpay.IngestResult\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x03 \x01(\x05\x12\x10\n\x08rejected\x18\x04 \x01(\x05\x32\xd5\x01\n\nEtlService\x12\x37\n\x06Ingest\x12\x15.etlpay.IngestRequest\x1a\x16.etlpay.IngestResponse\x12\x46\n\x0bIngestBatch\x12\x1a.etlpay.IngestBatchRequest\x1a\x1b.etlpay.IngestBatchResponse\x12\x46\n\x0cIngestStream\x12\x15.etlpay.IngestRequest\x1a\x1b.etlpay.IngestBatchResponse(\x01\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'etlpay_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_INGESTREQUEST']._serialized_start=24
-  _globals['_INGESTREQUEST']._serialized_end=82
-  _globals['_INGESTRESPONSE']._serialized_start=84
-  _globals['_INGESTRESPONSE']._serialized_end=128
-  _globals['_ETLSERVICE']._serialized_start=130
-  _globals['_ETLSERVICE']._serialized_end=199
+  _globals['_INGESTREQUEST']._serialized_start=55
+  _globals['_INGESTREQUEST']._serialized_end=202
+  _globals['_INGESTRESPONSE']._serialized_start=204
+  _globals['_INGESTRESPONSE']._serialized_end=248
+  _globals['_INGESTBATCHREQUEST']._serialized_start=250
+  _globals['_INGESTBATCHREQUEST']._serialized_end=309
+  _globals['_INGESTRESULT']._serialized_start=311
+  _globals['_INGESTRESULT']._serialized_end=368
+  _globals['_INGESTBATCHRESPONSE']._serialized_start=370
+  _globals['_INGESTBATCHRESPONSE']._serialized_end=482
+  _globals['_ETLSERVICE']._serialized_start=485
+  _globals['_ETLSERVICE']._serialized_end=698
 # @@protoc_insertion_point(module_scope)
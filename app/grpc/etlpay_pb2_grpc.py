@@ -28,6 +28,16 @@ class EtlServiceStub(object):
                 request_serializer=etlpay__pb2.IngestRequest.SerializeToString,
                 response_deserializer=etlpay__pb2.IngestResponse.FromString,
                 _registered_method=True)
+        self.IngestBatch = channel.unary_unary(
+                '/etlpay.EtlService/IngestBatch',
+                request_serializer=etlpay__pb2.IngestBatchRequest.SerializeToString,
+                response_deserializer=etlpay__pb2.IngestBatchResponse.FromString,
+                _registered_method=True)
+        self.IngestStream = channel.stream_stream(
+                '/etlpay.EtlService/IngestStream',
+                request_serializer=etlpay__pb2.IngestRequest.SerializeToString,
+                response_deserializer=etlpay__pb2.IngestBatchResponse.FromString,
+                _registered_method=True)
 
 
 class EtlServiceServicer(object):
@@ -39,6 +49,18 @@ class EtlServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def IngestBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def IngestStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_EtlServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -47,6 +69,16 @@ def add_EtlServiceServicer_to_server(servicer, server):
                     request_deserializer=etlpay__pb2.IngestRequest.FromString,
                     response_serializer=etlpay__pb2.IngestResponse.SerializeToString,
             ),
+            'IngestBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.IngestBatch,
+                    request_deserializer=etlpay__pb2.IngestBatchRequest.FromString,
+                    response_serializer=etlpay__pb2.IngestBatchResponse.SerializeToString,
+            ),
+            'IngestStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.IngestStream,
+                    request_deserializer=etlpay__pb2.IngestRequest.FromString,
+                    response_serializer=etlpay__pb2.IngestBatchResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'etlpay.EtlService', rpc_method_handlers)
@@ -84,3 +116,57 @@ class EtlService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def IngestBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/etlpay.EtlService/IngestBatch',
+            etlpay__pb2.IngestBatchRequest.SerializeToString,
+            etlpay__pb2.IngestBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def IngestStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/etlpay.EtlService/IngestStream',
+            etlpay__pb2.IngestRequest.SerializeToString,
+            etlpay__pb2.IngestBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,41 +1,234 @@
 import asyncio
 import json
+import math
+from typing import Any, AsyncIterator
 
 import grpc
 
+from app.config import get_settings
 from app.db import AsyncSessionLocal
 from app.repositories import SqlAlchemyEventRepository
+from app.services import DuplicateEventError, TransformError
 from app.services import etl as etl_services
+from app.services.aggregates import run_aggregate_flusher
+from app.services.spool import SPOOLABLE_ERRORS
+from app.utils.admission import AdmissionRejected, get_admission_controller
+from app.tracing import span, traced
+from app.utils.loop_monitor import monitor_event_loop
 
 from . import etlpay_pb2, etlpay_pb2_grpc
 
 
+def _from_struct(struct: Any) -> dict[str, Any]:
+    return {key: _from_value(item) for key, item in struct.fields.items()}
+
+
+def _from_value(value: Any) -> Any:
+    kind = value.WhichOneof("kind")
+    if kind == "struct_value":
+        return _from_struct(value.struct_value)
+    if kind == "list_value":
+        return [_from_value(item) for item in value.list_value.values]
+    if kind == "number_value":
+        # Struct only has doubles; give back the integers JSON producers sent
+        number = value.number_value
+        return int(number) if number.is_integer() and abs(number) < 2**53 else number
+    if kind == "string_value":
+        return value.string_value
+    if kind == "bool_value":
+        return value.bool_value
+    return None
+
+
+def decode_payload(request: etlpay_pb2.IngestRequest) -> dict[str, Any]:
+    kind = request.WhichOneof("payload")
+    if kind == "payload_struct":
+        return _from_struct(request.payload_struct)
+    if kind == "payload_bytes":
+        payload = json.loads(request.payload_bytes)
+    else:
+        payload = json.loads(request.payload_json or "{}")
+    if not isinstance(payload, dict):
+        raise ValueError("Payload must be a JSON object")
+    return payload
+
+
+async def _abort_rejected(
+    context: grpc.aio.ServicerContext, exc: AdmissionRejected
+) -> None:
+    context.set_trailing_metadata(
+        (("retry-after", str(max(math.ceil(exc.retry_after), 1))),)
+    )
+    await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(exc))
+
+
+@traced("grpc.ingest_events", root=True)
+async def ingest_events(
+    events: list[etlpay_pb2.IngestRequest], offset: int = 0
+) -> etlpay_pb2.IngestBatchResponse:
+    # One transaction per micro-batch; events that cannot be decoded or
+    # ingested are reported in their result and do not fail the others.
+    results: list[etlpay_pb2.IngestResult | None] = [None] * len(events)
+    records: list[tuple[str, dict[str, Any]]] = []
+    positions: list[int] = []
+    for position, event in enumerate(events):
+        try:
+            records.append((event.source_name, decode_payload(event)))
+        except ValueError as exc:
+            results[position] = etlpay_pb2.IngestResult(
+                status="REJECTED", error=f"Invalid payload: {exc}"
+            )
+            continue
+        positions.append(position)
+    async with AsyncSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        outcomes = await etl_services.ingest_batch(repository, records)
+        with span("db.commit"):
+            await session.commit()
+    for position, (status, record, error) in zip(positions, outcomes):
+        results[position] = etlpay_pb2.IngestResult(
+            id=record.id if record is not None else 0, status=status, error=error
+        )
+    # DUPLICATE is neither: the event is already stored
+    accepted = sum(result.status == "SUCCESS" for result in results)
+    rejected = sum(result.status in ("REJECTED", "FAILED") for result in results)
+    return etlpay_pb2.IngestBatchResponse(
+        offset=offset,
+        results=results,
+        accepted=accepted,
+        rejected=rejected,
+    )
+
+
 class EtlServiceServicer(etlpay_pb2_grpc.EtlServiceServicer):
     async def Ingest(self, request, context):
+        try:
+            async with get_admission_controller().admit(request.source_name):
+                return await self._ingest(request, context)
+        except AdmissionRejected as exc:
+            await _abort_rejected(context, exc)
+
+    @traced("grpc.Ingest", root=True)
+    async def _ingest(self, request, context):
         async with AsyncSessionLocal() as session:
             repository = SqlAlchemyEventRepository(session=session)
-            payload = json.loads(request.payload_json or "{}")
-            raw_event = await etl_services.ingest_event(
-                repository=repository,
-                source_name=request.source_name,
-                payload=payload,
-            )
+            try:
+                payload = decode_payload(request)
+                result_payload = etl_services.transform_payload(
+                    request.source_name, payload
+                )
+            except (TransformError, ValueError) as exc:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exc))
+            try:
+                raw_event = await etl_services.ingest_event(
+                    repository=repository,
+                    source_name=request.source_name,
+                    payload=payload,
+                )
+            except DuplicateEventError:
+                await context.abort(grpc.StatusCode.ALREADY_EXISTS, "Duplicate event")
             processed = await etl_services.mark_processed(
                 repository=repository,
                 raw_event=raw_event,
                 status="SUCCESS",
-                result_payload=payload,
+                result_payload=result_payload,
             )
-            await session.commit()
+            with span("db.commit"):
+                await session.commit()
             return etlpay_pb2.IngestResponse(id=processed.id, status=processed.status)
 
+    async def IngestBatch(self, request, context):
+        # Large batches are committed in GRPC_BATCH_SIZE chunks; the response
+        # merges their acknowledgements.
+        batch_size = get_settings().grpc_batch_size
+        events = list(request.events)
+        response = etlpay_pb2.IngestBatchResponse()
+        try:
+            for start in range(0, len(events), batch_size):
+                async with get_admission_controller().admit():
+                    ack = await ingest_events(events[start : start + batch_size], start)
+                response.results.extend(ack.results)
+                response.accepted += ack.accepted
+                response.rejected += ack.rejected
+        except AdmissionRejected as exc:
+            await _abort_rejected(context, exc)
+        except SPOOLABLE_ERRORS as exc:
+            # Chunks already acknowledged stay committed; the client retries
+            await context.abort(grpc.StatusCode.UNAVAILABLE, repr(exc))
+        return response
+
+    async def IngestStream(
+        self, request_iterator, context
+    ) -> AsyncIterator[etlpay_pb2.IngestBatchResponse]:
+        # Events are committed in micro-batches of up to GRPC_BATCH_SIZE,
+        # or whatever arrived within GRPC_BATCH_FLUSH_SECONDS of the first
+        # one, and each batch is acknowledged with its stream offset. The
+        # bounded queue stops reading, and so applies HTTP/2 flow control,
+        # while a batch is being written.
+        settings = get_settings()
+        batch_size = settings.grpc_batch_size
+        queue: asyncio.Queue[etlpay_pb2.IngestRequest | None] = asyncio.Queue(
+            maxsize=batch_size * 2
+        )
+
+        async def read() -> None:
+            try:
+                async for request in request_iterator:
+                    await queue.put(request)
+            finally:
+                await queue.put(None)
+
+        reader = asyncio.create_task(read())
+        loop = asyncio.get_running_loop()
+        offset = 0
+        finished = False
+        try:
+            while not finished:
+                event = await queue.get()
+                if event is None:
+                    break
+                batch = [event]
+                deadline = loop.time() + settings.grpc_batch_flush_seconds
+                while len(batch) < batch_size:
+                    try:
+                        event = await asyncio.wait_for(
+                            queue.get(), timeout=max(deadline - loop.time(), 0)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                    if event is None:
+                        finished = True
+                        break
+                    batch.append(event)
+                try:
+                    async with get_admission_controller().admit():
+                        ack = await ingest_events(batch, offset)
+                except AdmissionRejected as exc:
+                    await _abort_rejected(context, exc)
+                except SPOOLABLE_ERRORS as exc:
+                    await context.abort(grpc.StatusCode.UNAVAILABLE, repr(exc))
+                offset += len(batch)
+                yield ack
+            # Surfaces a failed read instead of ending the stream cleanly
+            await reader
+        finally:
+            reader.cancel()
+
 
 async def serve(host: str = "0.0.0.0", port: int = 50051) -> None:
     server = grpc.aio.server()
     etlpay_pb2_grpc.add_EtlServiceServicer_to_server(EtlServiceServicer(), server)
     server.add_insecure_port(f"{host}:{port}")
     await server.start()
-    await server.wait_for_termination()
+    stop_event = asyncio.Event()
+    flusher = asyncio.create_task(run_aggregate_flusher(AsyncSessionLocal, stop_event))
+    try:
+        async with monitor_event_loop("grpc"):
+            await server.wait_for_termination()
+    finally:
+        stop_event.set()
+        # The flusher writes whatever is left before returning
+        await flusher
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,9 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from datetime import datetime
+from typing import Any, AsyncContextManager
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import IngestionSource, ProcessedRecord, RawEvent
+from app.models import (
+    ArchiveSegment,
+    BackfillRange,
+    DeadLetter,
+    EventRollup,
+    IngestionSource,
+    OutboxMessage,
+    ProcessedRecord,
+    RawEvent,
+)
 
 
 class EventRepository(ABC):
@@ -15,6 +25,38 @@ class EventRepository(ABC):
     async def ingest_event(self, source_name: str, payload: dict[str, Any]) -> RawEvent:
         raise NotImplementedError
 
+    @abstractmethod
+    async def ingest_event_if_new(
+        self,
+        source_name: str,
+        payload: dict[str, Any],
+        content_hash: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> RawEvent | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_recent_content_hashes(self, limit: int) -> list[tuple[str, str]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def record_outcome(
+        self,
+        source_name: str,
+        status: str,
+        payload: dict[str, Any] | None = None,
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def ingest_processed_batch(
+        self,
+        items: list[
+            tuple[str, dict[str, Any], dict[str, Any] | None, str | None]
+        ],
+    ) -> list[tuple[int, ProcessedRecord]]:
+        raise NotImplementedError
+
     @abstractmethod
     async def mark_processed(
         self,
@@ -24,6 +66,132 @@ class EventRepository(ABC):
     ) -> ProcessedRecord:
         raise NotImplementedError
 
+    @abstractmethod
+    def savepoint(self) -> AsyncContextManager[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def record_dead_letter(
+        self,
+        source_name: str,
+        payload: dict[str, Any],
+        error: str,
+        origin: str,
+    ) -> DeadLetter:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_pending_dead_letters(
+        self,
+        limit: int,
+        source_name: str | None = None,
+    ) -> list[DeadLetter]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_outbox_message(
+        self, routing_key: str, message: dict[str, Any]
+    ) -> OutboxMessage:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def claim_outbox_batch(self, limit: int) -> list[OutboxMessage]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_outbox_messages(self, message_ids: list[int]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert_rollups(self, rows: list[dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_rollups(
+        self,
+        window_seconds: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        source_name: str | None = None,
+    ) -> list[tuple[str, EventRollup]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def raw_event_id_bounds(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[int, int] | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def scan_raw_events(
+        self,
+        after_id: int,
+        before_id: int,
+        limit: int,
+        source_name: str | None = None,
+    ) -> list[tuple[int, str, str, int | None]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rewrite_processed_records(
+        self,
+        updates: list[dict[str, Any]],
+        inserts: list[dict[str, Any]],
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_backfill_ranges(
+        self, job: str, ranges: list[tuple[int, int]]
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_backfill_ranges(self, job: str) -> list[BackfillRange]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def checkpoint_backfill_range(
+        self,
+        range_id: int,
+        last_id: int,
+        processed: int,
+        completed: bool,
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_processed_record(self, record_id: int) -> ProcessedRecord | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_expired_raw_events(
+        self, cutoff: datetime, limit: int
+    ) -> list[tuple[RawEvent, str]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_processed_records_for(
+        self, raw_event_ids: list[int]
+    ) -> list[ProcessedRecord]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_raw_events(self, raw_event_ids: list[int]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_archive_segment(
+        self, segment: ArchiveSegment, record_ranges: list[tuple[int, int]]
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find_archive_segment(self, record_id: int) -> ArchiveSegment | None:
+        raise NotImplementedError
+
 
 class CacheClient(ABC):
     @abstractmethod
@@ -40,6 +208,10 @@ class MessageQueueClient(ABC):
     async def publish(self, routing_key: str, message: dict[str, Any]) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def publish_batch(self, messages: list[tuple[str, str]]) -> None:
+        raise NotImplementedError
+
 
 class SessionFactory(ABC):
     @abstractmethod
@@ -1,33 +1,157 @@
-import uvicorn
+import argparse
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 from fastapi import FastAPI
 
 from app.config import configure_logging, get_settings
+from app.db import AsyncSessionLocal, dispose_engines, warm_up_engine
 from app.middlewares.errors import register_error_middleware
+from app.middlewares.tracing import register_tracing_middleware
+from app.repositories import SqlAlchemyEventRepository
 from app.routes.api import router as api_router
+from app.services.aggregates import run_aggregate_flusher
+from app.services.dedup import get_dedup_index
+from app.services.spool import get_spool
+from app.services.transforms import shutdown_transform_pool
+from app.utils.cache import close_redis_client, warm_up_redis
+from app.utils.loop_monitor import monitor_event_loop
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up() -> None:
+    # Runs before the worker starts accepting connections. A dependency that
+    # is down is logged, not fatal: its pool fills on first use instead.
+    settings = get_settings()
+    try:
+        await warm_up_engine(settings.db_pool_size)
+    except Exception:
+        logger.warning("Database pool warm-up failed", exc_info=True)
+    try:
+        await warm_up_redis(settings.db_pool_size)
+    except Exception:
+        logger.warning("Redis pool warm-up failed", exc_info=True)
+    dedup = get_dedup_index()
+    if dedup is not None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await dedup.warm_up(SqlAlchemyEventRepository(session=session))
+        except Exception:
+            logger.warning("Dedup warm-up failed", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    if get_settings().api_warmup:
+        await warm_up()
+    stop_event = asyncio.Event()
+    flusher = asyncio.create_task(run_aggregate_flusher(AsyncSessionLocal, stop_event))
+    drainer = None
+    spool = get_spool()
+    if spool is not None:
+        from app.workers.spool_drainer import run_spool_drainer
+
+        settings = get_settings()
+        drainer = asyncio.create_task(
+            run_spool_drainer(
+                spool,
+                batch_size=settings.spool_drain_batch_size,
+                interval_seconds=settings.spool_drain_interval_seconds,
+                stop_event=stop_event,
+            )
+        )
+    try:
+        async with monitor_event_loop("api"):
+            yield
+    finally:
+        stop_event.set()
+        # The flusher writes whatever is left before returning
+        await flusher
+        if drainer is not None:
+            await drainer
+        await shutdown_transform_pool()
+        await close_redis_client()
+        await dispose_engines()
 
 
 def create_app() -> FastAPI:
     configure_logging()
     settings = get_settings()
 
-    application = FastAPI(title=settings.app_name, debug=settings.app_debug)
+    application = FastAPI(
+        title=settings.app_name,
+        debug=settings.app_debug,
+        lifespan=lifespan,
+    )
 
     register_error_middleware(application)
+    register_tracing_middleware(application)
     application.include_router(api_router, prefix="/api")
 
     return application
 
 
-app = create_app()
+_app: FastAPI | None = None
+
+
+def __getattr__(name: str) -> Any:
+    # "app.main:app" builds the application on first access instead of at
+    # import time, so importing this module has no side effects.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
+def run(argv: list[str] | None = None) -> None:
+    import uvicorn
 
-def run() -> None:
     settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the HTTP API")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.api_workers,
+        help="Worker processes in production mode (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        default=settings.app_env != "development",
+        help="Run the production launcher even when APP_ENV=development",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.production:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            reload=True,
+            log_level=settings.log_level.lower(),
+        )
+        return
+
+    # The parent binds the socket once and every worker process accepts on
+    # it; each worker builds its own app (and pools) through the factory.
+    # On SIGTERM workers stop accepting and let in-flight requests finish
+    # for up to API_GRACEFUL_SHUTDOWN_SECONDS.
     uvicorn.run(
-        "app.main:app",
+        "app.main:create_app",
+        factory=True,
         host=settings.api_host,
         port=settings.api_port,
-        reload=settings.app_env == "development",
+        workers=args.workers or os.cpu_count() or 1,
+        loop="uvloop",
+        http="httptools",
+        backlog=settings.api_backlog,
+        timeout_graceful_shutdown=settings.api_graceful_shutdown_seconds,
         log_level=settings.log_level.lower(),
     )
 
@@ -1 +1,3 @@
+from .admission import admit_ingest as admit_ingest
 from .errors import register_error_middleware as register_error_middleware
+from .tracing import register_tracing_middleware as register_tracing_middleware
@@ -0,0 +1,21 @@
+import math
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+
+from app.schemas.etl import RawEventCreate
+from app.utils.admission import AdmissionRejected, get_admission_controller
+
+
+async def admit_ingest(payload: RawEventCreate) -> AsyncIterator[None]:
+    # Holds an admission slot for the whole request; overload is answered
+    # with 429 before the endpoint touches the database.
+    try:
+        async with get_admission_controller().admit(payload.source_name):
+            yield
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests" if exc.reason == "rate_limited" else "Overloaded",
+            headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+        ) from exc
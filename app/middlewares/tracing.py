@@ -0,0 +1,24 @@
+from fastapi import Request
+
+from app.tracing import span
+
+
+def register_tracing_middleware(app) -> None:
+    @app.middleware("http")
+    async def tracing_middleware(request: Request, call_next):
+        # Named after the method until routing picks a template, so ids in the
+        # path never turn every request into its own span name; the raw path
+        # is only kept as http.target.
+        with span(
+            request.method,
+            root=True,
+            **{"http.method": request.method, "http.target": request.url.path},
+        ) as current:
+            response = await call_next(request)
+            if current is not None:
+                route = request.scope.get("route")
+                if route is not None:
+                    current.name = f"{request.method} {route.path}"
+                    current.set_attribute("http.route", route.path)
+                current.set_attribute("http.status_code", response.status_code)
+            return response
@@ -1,6 +1,12 @@
 from .models import (
+    ArchivedRecordRange as ArchivedRecordRange,
+    ArchiveSegment as ArchiveSegment,
+    BackfillRange as BackfillRange,
     Base as Base,
+    DeadLetter as DeadLetter,
+    EventRollup as EventRollup,
     IngestionSource as IngestionSource,
+    OutboxMessage as OutboxMessage,
     RawEvent as RawEvent,
     ProcessedRecord as ProcessedRecord,
 )
@@ -1,7 +1,9 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Integer, String, Text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, Text, false
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
+from .types import CompressedText
 
 
 class Base(DeclarativeBase):
@@ -24,13 +26,28 @@ class RawEvent(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     source_id: Mapped[int] = mapped_column(Integer, nullable=False)
-    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    payload: Mapped[str] = mapped_column(CompressedText, nullable=False)
+    # sha256 of (source, canonical payload); only set when dedup is enabled
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Idempotency-Key of an API request, or the key a spooled event is
+    # replayed with; unique so a replay of a commit that did land is a no-op
+    idempotency_key: Mapped[str | None] = mapped_column(String(128), nullable=True)
     received_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
     )
 
+    __table_args__ = (
+        Index(
+            "ix_raw_events_source_content_hash",
+            "source_id",
+            "content_hash",
+            unique=True,
+        ),
+        Index("ix_raw_events_idempotency_key", "idempotency_key", unique=True),
+    )
+
 
 class ProcessedRecord(Base):
     __tablename__ = "processed_records"
@@ -38,9 +55,157 @@ class ProcessedRecord(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     raw_event_id: Mapped[int] = mapped_column(Integer, nullable=False)
     status: Mapped[str] = mapped_column(String(50), nullable=False)
-    result_payload: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Left NULL when the result is identical to the raw payload (result_is_raw),
+    # so pass-through sources store each payload once.
+    stored_result_payload: Mapped[str | None] = mapped_column(
+        "result_payload", CompressedText, nullable=True
+    )
+    result_is_raw: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default=false()
+    )
     processed_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
         default=datetime.utcnow,
     )
+    # Only result_is_raw records need the raw event, so it is never joined
+    # implicitly; queries that read result_payload load it with selectinload.
+    raw_event: Mapped[RawEvent] = relationship(
+        primaryjoin="foreign(ProcessedRecord.raw_event_id) == RawEvent.id",
+        lazy="raise",
+    )
+
+    @property
+    def result_payload(self) -> str | None:
+        if self.result_is_raw:
+            return self.raw_event.payload
+        return self.stored_result_payload
+
+
+class DeadLetter(Base):
+    __tablename__ = "dead_letters"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    origin: Mapped[str] = mapped_column(String(255), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    error: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    replayed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    routing_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+
+class EventRollup(Base):
+    # Per-source, per-status tumbling-window aggregates. The row with
+    # field == "" counts events; one row per configured numeric field holds
+    # count/sum/min/max of that field's values.
+    __tablename__ = "event_rollups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(String(50), nullable=False)
+    window_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    window_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    field: Mapped[str] = mapped_column(String(100), nullable=False, default="")
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    value_sum: Mapped[float | None] = mapped_column(Float, nullable=True)
+    value_min: Mapped[float | None] = mapped_column(Float, nullable=True)
+    value_max: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_event_rollups_window",
+            "source_id",
+            "status",
+            "window_start",
+            "window_seconds",
+            "field",
+            unique=True,
+        ),
+        Index("ix_event_rollups_window_start", "window_start"),
+    )
+
+
+class BackfillRange(Base):
+    # One raw_events id range [start_id, end_id) of a backfill job. last_id
+    # is the checkpoint: every event up to it has been reprocessed, so an
+    # interrupted job resumes where it stopped.
+    __tablename__ = "backfill_ranges"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job: Mapped[str] = mapped_column(String(100), nullable=False)
+    start_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    end_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (
+        Index("ix_backfill_ranges_job_start", "job", "start_id", unique=True),
+    )
+
+
+class ArchiveSegment(Base):
+    # Index of one gzipped NDJSON segment written by the retention job: a
+    # raw_events id range of one received_at day. Reads by record id go
+    # through ArchivedRecordRange, which names the one segment holding it.
+    __tablename__ = "archive_segments"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    day: Mapped[str] = mapped_column(String(10), nullable=False)
+    path: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    first_raw_event_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_raw_event_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_archive_segments_raw_event_ids",
+            "first_raw_event_id",
+            "last_raw_event_id",
+        ),
+    )
+
+
+class ArchivedRecordRange(Base):
+    # Exact processed record id -> segment map, stored as runs of consecutive
+    # ids [first_record_id, last_record_id] written in the transaction that
+    # archives them. Records of a batch are mostly consecutive, so a segment
+    # needs a handful of rows rather than one per record; runs never overlap,
+    # and unlike per-segment min/max ranges they never point at a wrong file
+    # when records were reprocessed out of order.
+    __tablename__ = "archive_record_ranges"
+
+    first_record_id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=False
+    )
+    last_record_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    segment_id: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,34 @@
+from typing import Any
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.utils.compression import PayloadText, get_payload_codec
+
+
+class CompressedText(TypeDecorator[str]):
+    # Text payload stored as bytes: zlib-compressed above the configured size
+    # threshold (optionally with the source's trained dictionary) and plain
+    # UTF-8 below it. Rows written before compression read back unchanged.
+    # Values are decoded when a row is loaded, not on attribute access:
+    # callers treat payloads as str (json.loads, comparisons), and only
+    # columns a query selects are decoded at all.
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect: Any) -> bytes | None:
+        if value is None:
+            return None
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)
+        source_name = value.source_name if isinstance(value, PayloadText) else None
+        return get_payload_codec().encode(value, source_name)
+
+    def process_result_value(self, value: Any, dialect: Any) -> str | None:
+        if value is None:
+            return None
+        return get_payload_codec().decode(value)
+
+    @property
+    def python_type(self) -> type:
+        return str
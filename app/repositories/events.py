@@ -1,18 +1,40 @@
 import json
-from typing import Any
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, AsyncContextManager, AsyncIterator
 
-from sqlalchemy import select
+from sqlalchemy import case, delete, func, insert, select, update
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.interfaces.events import EventRepository
-from app.models import IngestionSource, ProcessedRecord, RawEvent
+from app.models import (
+    ArchivedRecordRange,
+    ArchiveSegment,
+    BackfillRange,
+    DeadLetter,
+    EventRollup,
+    IngestionSource,
+    OutboxMessage,
+    ProcessedRecord,
+    RawEvent,
+)
+from app.tracing import traced
+from app.utils.compression import PayloadText
+
+PENDING_HASHES_KEY = "dedup_pending_hashes"
+PENDING_AGGREGATES_KEY = "stats_pending_events"
+# session.info lists only acted upon once the root transaction commits
+_PENDING_KEYS = (PENDING_HASHES_KEY, PENDING_AGGREGATES_KEY)
 
 
 class SqlAlchemyEventRepository(EventRepository):
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
+    @traced("repository.get_or_create_source")
     async def get_or_create_source(self, source_name: str) -> IngestionSource:
         result = await self.session.execute(
             select(IngestionSource).where(IngestionSource.name == source_name)
@@ -22,41 +44,504 @@ class SqlAlchemyEventRepository(EventRepository):
             return source
 
         source = IngestionSource(name=source_name)
-        self.session.add(source)
         try:
-            await self.session.flush()
+            # Savepoint so a concurrent insert of the same source only undoes
+            # this statement, not the caller's whole batch.
+            async with self.session.begin_nested():
+                self.session.add(source)
             return source
         except IntegrityError:
-            await self.session.rollback()
             result = await self.session.execute(
                 select(IngestionSource).where(IngestionSource.name == source_name),
             )
             existing = result.scalar_one()
             return existing
 
+    @traced("repository.ingest_event")
     async def ingest_event(self, source_name: str, payload: dict[str, Any]) -> RawEvent:
         source = await self.get_or_create_source(source_name)
         raw_event = RawEvent(
             source_id=source.id,
-            payload=json.dumps(payload),
+            payload=PayloadText(json.dumps(payload), source_name),
         )
         self.session.add(raw_event)
         await self.session.flush()
         return raw_event
 
+    @traced("repository.mark_processed")
     async def mark_processed(
         self,
         raw_event: RawEvent,
         status: str,
         result_payload: dict[str, Any] | None = None,
     ) -> ProcessedRecord:
+        encoded = json.dumps(result_payload) if result_payload is not None else None
+        result_is_raw = encoded is not None and encoded == raw_event.payload
+        stored_result_payload = None
+        if encoded is not None and not result_is_raw:
+            source_name = getattr(raw_event.payload, "source_name", None)
+            stored_result_payload = PayloadText(encoded, source_name)
         record = ProcessedRecord(
             raw_event_id=raw_event.id,
             status=status,
-            result_payload=json.dumps(result_payload)
-            if result_payload is not None
-            else None,
+            stored_result_payload=stored_result_payload,
+            result_is_raw=result_is_raw,
         )
+        record.raw_event = raw_event
         self.session.add(record)
         await self.session.flush()
+        self.session.info.setdefault(PENDING_AGGREGATES_KEY, []).append(
+            (raw_event.source_id, status, result_payload)
+        )
         return record
+
+    @traced("repository.ingest_processed_batch")
+    async def ingest_processed_batch(
+        self,
+        items: list[
+            tuple[str, dict[str, Any], dict[str, Any] | None, str | None]
+        ],
+    ) -> list[tuple[int, ProcessedRecord]]:
+        # Stores (source_name, payload, result_payload, content_hash) items as
+        # SUCCESS with one multi-row INSERT per table instead of two flushes
+        # per item; any conflict fails the whole statement. Same storage
+        # rules as mark_processed. Returns (source_id, record) per item.
+        if not items:
+            return []
+        source_ids = {
+            name: (await self.get_or_create_source(name)).id
+            for name in {source_name for source_name, _, _, _ in items}
+        }
+        now = datetime.utcnow()
+        encoded_payloads = [json.dumps(payload) for _, payload, _, _ in items]
+        raw_event_ids = (
+            await self.session.scalars(
+                insert(RawEvent).returning(RawEvent.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "source_id": source_ids[source_name],
+                        "payload": PayloadText(encoded, source_name),
+                        "content_hash": digest,
+                        "received_at": now,
+                    }
+                    for (source_name, _, _, digest), encoded in zip(
+                        items, encoded_payloads
+                    )
+                ],
+            )
+        ).all()
+        rows: list[dict[str, Any]] = []
+        for (source_name, _, result_payload, _), encoded, raw_event_id in zip(
+            items, encoded_payloads, raw_event_ids
+        ):
+            result = json.dumps(result_payload) if result_payload is not None else None
+            result_is_raw = result is not None and result == encoded
+            rows.append(
+                {
+                    "raw_event_id": raw_event_id,
+                    "status": "SUCCESS",
+                    "stored_result_payload": (
+                        PayloadText(result, source_name)
+                        if result is not None and not result_is_raw
+                        else None
+                    ),
+                    "result_is_raw": result_is_raw,
+                    "processed_at": now,
+                }
+            )
+        records = (
+            await self.session.scalars(
+                insert(ProcessedRecord).returning(
+                    ProcessedRecord, sort_by_parameter_order=True
+                ),
+                rows,
+            )
+        ).all()
+        pending_hashes = self.session.info.setdefault(PENDING_HASHES_KEY, [])
+        pending_events = self.session.info.setdefault(PENDING_AGGREGATES_KEY, [])
+        stored: list[tuple[int, ProcessedRecord]] = []
+        for (source_name, _, result_payload, digest), record in zip(items, records):
+            source_id = source_ids[source_name]
+            if digest is not None:
+                pending_hashes.append((source_name, digest))
+            pending_events.append((source_id, "SUCCESS", result_payload))
+            stored.append((source_id, record))
+        return stored
+
+    def savepoint(self) -> AsyncContextManager[Any]:
+        return self._savepoint()
+
+    @asynccontextmanager
+    async def _savepoint(self) -> AsyncIterator[None]:
+        marks = {
+            key: len(self.session.info.setdefault(key, [])) for key in _PENDING_KEYS
+        }
+        try:
+            async with self.session.begin_nested():
+                yield
+        except BaseException:
+            # Entries added inside a rolled back savepoint were never stored
+            for key, mark in marks.items():
+                del self.session.info.setdefault(key, [])[mark:]
+            raise
+
+    @traced("repository.ingest_event_if_new")
+    async def ingest_event_if_new(
+        self,
+        source_name: str,
+        payload: dict[str, Any],
+        content_hash: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> RawEvent | None:
+        # None when an event with the same content hash or idempotency key is
+        # already stored; no conflict target, so both unique indexes apply
+        source = await self.get_or_create_source(source_name)
+        dialect = self.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = (
+            insert(RawEvent)
+            .values(
+                source_id=source.id,
+                payload=PayloadText(json.dumps(payload), source_name),
+                content_hash=content_hash,
+                idempotency_key=idempotency_key,
+                received_at=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing()
+            .returning(RawEvent)
+        )
+        raw_event = (await self.session.scalars(statement)).one_or_none()
+        if raw_event is not None and content_hash is not None:
+            self.session.info.setdefault(PENDING_HASHES_KEY, []).append(
+                (source_name, content_hash)
+            )
+        return raw_event
+
+    @traced("repository.list_recent_content_hashes")
+    async def list_recent_content_hashes(self, limit: int) -> list[tuple[str, str]]:
+        # (source name, content hash) of the newest hashed events, newest first
+        result = await self.session.execute(
+            select(IngestionSource.name, RawEvent.content_hash)
+            .join(IngestionSource, IngestionSource.id == RawEvent.source_id)
+            .where(RawEvent.content_hash.is_not(None))
+            .order_by(RawEvent.id.desc())
+            .limit(limit)
+        )
+        return [(name, digest) for name, digest in result.all()]
+
+    @traced("repository.record_outcome")
+    async def record_outcome(
+        self,
+        source_name: str,
+        status: str,
+        payload: dict[str, Any] | None = None,
+    ) -> None:
+        # Counts a record that was not stored (REJECTED, FAILED) in the stats
+        # windows once the transaction commits. Windows are keyed by source
+        # id, so a source that has no row yet is not counted; it is never
+        # created here, since the failure may be the source itself.
+        source_id = await self.session.scalar(
+            select(IngestionSource.id).where(IngestionSource.name == source_name)
+        )
+        if source_id is not None:
+            self.session.info.setdefault(PENDING_AGGREGATES_KEY, []).append(
+                (source_id, status, payload)
+            )
+
+    @traced("repository.record_dead_letter")
+    async def record_dead_letter(
+        self,
+        source_name: str,
+        payload: dict[str, Any],
+        error: str,
+        origin: str,
+    ) -> DeadLetter:
+        dead_letter = DeadLetter(
+            source_name=source_name,
+            origin=origin,
+            payload=json.dumps(payload, default=str),
+            error=error,
+        )
+        self.session.add(dead_letter)
+        await self.session.flush()
+        await self.record_outcome(source_name, "FAILED", payload)
+        return dead_letter
+
+    async def list_pending_dead_letters(
+        self,
+        limit: int,
+        source_name: str | None = None,
+    ) -> list[DeadLetter]:
+        query = (
+            select(DeadLetter)
+            .where(DeadLetter.replayed_at.is_(None))
+            .order_by(DeadLetter.id)
+            .limit(limit)
+        )
+        if source_name is not None:
+            query = query.where(DeadLetter.source_name == source_name)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    @traced("repository.add_outbox_message")
+    async def add_outbox_message(
+        self, routing_key: str, message: dict[str, Any]
+    ) -> OutboxMessage:
+        # No flush: the row goes out with the caller's next flush/commit
+        outbox_message = OutboxMessage(
+            routing_key=routing_key,
+            payload=json.dumps(message),
+        )
+        self.session.add(outbox_message)
+        return outbox_message
+
+    @traced("repository.claim_outbox_batch")
+    async def claim_outbox_batch(self, limit: int) -> list[OutboxMessage]:
+        # SKIP LOCKED lets several relays drain the outbox without blocking
+        # on, or double-publishing, each other's rows.
+        result = await self.session.execute(
+            select(OutboxMessage)
+            .order_by(OutboxMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    @traced("repository.delete_outbox_messages")
+    async def delete_outbox_messages(self, message_ids: list[int]) -> None:
+        if not message_ids:
+            return
+        await self.session.execute(
+            delete(OutboxMessage).where(OutboxMessage.id.in_(message_ids))
+        )
+
+    @traced("repository.upsert_rollups")
+    async def upsert_rollups(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        dialect = self.session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = insert(EventRollup).values(rows)
+        table, excluded = EventRollup.__table__.c, statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                "source_id",
+                "status",
+                "window_start",
+                "window_seconds",
+                "field",
+            ],
+            set_={
+                "event_count": table.event_count + excluded.event_count,
+                "value_sum": table.value_sum + excluded.value_sum,
+                "value_min": case(
+                    (excluded.value_min < table.value_min, excluded.value_min),
+                    else_=table.value_min,
+                ),
+                "value_max": case(
+                    (excluded.value_max > table.value_max, excluded.value_max),
+                    else_=table.value_max,
+                ),
+            },
+        )
+        await self.session.execute(statement)
+
+    @traced("repository.list_rollups")
+    async def list_rollups(
+        self,
+        window_seconds: int,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        source_name: str | None = None,
+    ) -> list[tuple[str, EventRollup]]:
+        statement = (
+            select(IngestionSource.name, EventRollup)
+            .join(IngestionSource, IngestionSource.id == EventRollup.source_id)
+            .where(EventRollup.window_seconds == window_seconds)
+            .order_by(EventRollup.window_start, IngestionSource.name, EventRollup.status)
+        )
+        if since is not None:
+            statement = statement.where(EventRollup.window_start >= since)
+        if until is not None:
+            statement = statement.where(EventRollup.window_start < until)
+        if source_name is not None:
+            statement = statement.where(IngestionSource.name == source_name)
+        result = await self.session.execute(statement)
+        return [(name, rollup) for name, rollup in result.all()]
+
+    @traced("repository.raw_event_id_bounds")
+    async def raw_event_id_bounds(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> tuple[int, int] | None:
+        statement = select(func.min(RawEvent.id), func.max(RawEvent.id))
+        if since is not None:
+            statement = statement.where(RawEvent.received_at >= since)
+        if until is not None:
+            statement = statement.where(RawEvent.received_at < until)
+        first_id, last_id = (await self.session.execute(statement)).one()
+        if first_id is None:
+            return None
+        return first_id, last_id
+
+    @traced("repository.scan_raw_events")
+    async def scan_raw_events(
+        self,
+        after_id: int,
+        before_id: int,
+        limit: int,
+        source_name: str | None = None,
+    ) -> list[tuple[int, str, str, int | None]]:
+        # Keyset scan: (raw event id, payload, source name, processed record
+        # id or None) for ids in (after_id, before_id), walking the primary
+        # key index instead of paging with OFFSET.
+        statement = (
+            select(
+                RawEvent.id,
+                RawEvent.payload,
+                IngestionSource.name,
+                ProcessedRecord.id,
+            )
+            .join(IngestionSource, IngestionSource.id == RawEvent.source_id)
+            .outerjoin(ProcessedRecord, ProcessedRecord.raw_event_id == RawEvent.id)
+            .where(RawEvent.id > after_id, RawEvent.id < before_id)
+            .order_by(RawEvent.id)
+            .limit(limit)
+        )
+        if source_name is not None:
+            statement = statement.where(IngestionSource.name == source_name)
+        result = await self.session.execute(statement)
+        return [tuple(row) for row in result.all()]  # type: ignore[misc]
+
+    @traced("repository.rewrite_processed_records")
+    async def rewrite_processed_records(
+        self,
+        updates: list[dict[str, Any]],
+        inserts: list[dict[str, Any]],
+    ) -> None:
+        # Bulk statements (executemany) rather than one ORM flush per row.
+        # updates carry the processed record "id"; existing ids are kept.
+        if updates:
+            await self.session.execute(update(ProcessedRecord), updates)
+        if inserts:
+            await self.session.execute(insert(ProcessedRecord), inserts)
+
+    async def create_backfill_ranges(
+        self, job: str, ranges: list[tuple[int, int]]
+    ) -> None:
+        self.session.add_all(
+            BackfillRange(job=job, start_id=start, end_id=end, last_id=start - 1)
+            for start, end in ranges
+        )
+        await self.session.flush()
+
+    async def list_backfill_ranges(self, job: str) -> list[BackfillRange]:
+        result = await self.session.execute(
+            select(BackfillRange)
+            .where(BackfillRange.job == job)
+            .order_by(BackfillRange.start_id)
+        )
+        return list(result.scalars().all())
+
+    async def checkpoint_backfill_range(
+        self,
+        range_id: int,
+        last_id: int,
+        processed: int,
+        completed: bool,
+    ) -> None:
+        await self.session.execute(
+            update(BackfillRange)
+            .where(BackfillRange.id == range_id)
+            .values(
+                last_id=last_id,
+                processed=BackfillRange.processed + processed,
+                completed_at=datetime.now(timezone.utc) if completed else None,
+            )
+        )
+
+    async def get_processed_record(self, record_id: int) -> ProcessedRecord | None:
+        return await self.session.get(
+            ProcessedRecord,
+            record_id,
+            options=[selectinload(ProcessedRecord.raw_event)],
+        )
+
+    @traced("repository.list_expired_raw_events")
+    async def list_expired_raw_events(
+        self, cutoff: datetime, limit: int
+    ) -> list[tuple[RawEvent, str]]:
+        # Oldest first, with their source names: (raw event, source name)
+        result = await self.session.execute(
+            select(RawEvent, IngestionSource.name)
+            .join(IngestionSource, IngestionSource.id == RawEvent.source_id)
+            .where(RawEvent.received_at < cutoff)
+            .order_by(RawEvent.id)
+            .limit(limit)
+        )
+        return [(raw_event, name) for raw_event, name in result.all()]
+
+    async def list_processed_records_for(
+        self, raw_event_ids: list[int]
+    ) -> list[ProcessedRecord]:
+        if not raw_event_ids:
+            return []
+        result = await self.session.execute(
+            select(ProcessedRecord)
+            .options(selectinload(ProcessedRecord.raw_event))
+            .where(ProcessedRecord.raw_event_id.in_(raw_event_ids))
+            .order_by(ProcessedRecord.id)
+        )
+        return list(result.scalars().all())
+
+    @traced("repository.delete_raw_events")
+    async def delete_raw_events(self, raw_event_ids: list[int]) -> None:
+        # Bulk deletes of the events and their processed records
+        if not raw_event_ids:
+            return
+        await self.session.execute(
+            delete(ProcessedRecord)
+            .where(ProcessedRecord.raw_event_id.in_(raw_event_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(
+            delete(RawEvent)
+            .where(RawEvent.id.in_(raw_event_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def add_archive_segment(
+        self, segment: ArchiveSegment, record_ranges: list[tuple[int, int]]
+    ) -> None:
+        # The segment and the id runs of the records it holds commit together
+        self.session.add(segment)
+        await self.session.flush()
+        if record_ranges:
+            await self.session.execute(
+                insert(ArchivedRecordRange),
+                [
+                    {
+                        "first_record_id": first_id,
+                        "last_record_id": last_id,
+                        "segment_id": segment.id,
+                    }
+                    for first_id, last_id in record_ranges
+                ],
+            )
+
+    async def find_archive_segment(self, record_id: int) -> ArchiveSegment | None:
+        # Runs do not overlap: only the last run starting at or before the id
+        # can hold it, found with one primary key probe
+        run = (
+            select(ArchivedRecordRange)
+            .where(ArchivedRecordRange.first_record_id <= record_id)
+            .order_by(ArchivedRecordRange.first_record_id.desc())
+            .limit(1)
+            .subquery()
+        )
+        return await self.session.scalar(
+            select(ArchiveSegment)
+            .join(run, run.c.segment_id == ArchiveSegment.id)
+            .where(run.c.last_record_id >= record_id)
+        )
@@ -1,14 +1,40 @@
+import asyncio
 import json
 import logging
+import uuid
+from datetime import datetime
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db_session
+from app.config import get_settings
+from app.db import get_db_session, get_read_db_session, pool_stats
+from app.middlewares.admission import admit_ingest
 from app.repositories.events import SqlAlchemyEventRepository
-from app.schemas.etl import IngestionSourceRead, ProcessedRecordRead, RawEventCreate
+from app.schemas.etl import (
+    IngestionSourceRead,
+    ProcessedRecordRead,
+    RawEventCreate,
+    SpooledEventRead,
+    WindowStatsRead,
+)
+from app.services import DuplicateEventError, TransformError
 from app.services import etl as etl_services
+from app.services.aggregates import list_window_stats
+from app.services.archive import read_archived_processed_record
+from app.services.spool import (
+    SPOOLABLE_ERRORS,
+    EventSpool,
+    SpoolFullError,
+    get_database_circuit_breaker,
+    get_spool,
+)
+from app.tracing import span
 from app.utils.cache import RedisCacheClient
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.metrics import get_metrics
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -18,20 +44,48 @@ logger = logging.getLogger(__name__)
     "/ingest",
     response_model=ProcessedRecordRead,
     status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit_ingest)],
+    responses={status.HTTP_202_ACCEPTED: {"model": SpooledEventRead}},
 )
 async def ingest_event_endpoint(
     payload: RawEventCreate,
     session: AsyncSession = Depends(get_db_session),
-) -> ProcessedRecordRead:
+    idempotency_key: str | None = Header(default=None, max_length=128),
+) -> ProcessedRecordRead | JSONResponse:
     repository = SqlAlchemyEventRepository(session=session)
     cache_client = RedisCacheClient()
-    try:
+    spool = get_spool()
+    if spool is not None and idempotency_key is None:
+        # Stored with the event and reused if it is spooled, so replaying a
+        # commit that landed after the timeout is a no-op
+        idempotency_key = uuid.uuid4().hex
+
+    async def ingest_and_commit() -> Any:
         _, processed = await etl_services.ingest_and_mark_success(
             repository=repository,
             source_name=payload.source_name,
             payload=payload.payload,
+            idempotency_key=idempotency_key,
         )
-        await session.commit()
+        with span("db.commit"):
+            await session.commit()
+        return processed
+
+    async def ingest_within_timeout() -> Any:
+        timeout = get_settings().spool_write_timeout_seconds
+        return await asyncio.wait_for(
+            ingest_and_commit(), timeout if timeout > 0 else None
+        )
+
+    try:
+        if spool is None:
+            processed = await ingest_and_commit()
+        else:
+            # While the database is known to be down, events go straight to
+            # the spool instead of each waiting out the write timeout
+            processed = await get_database_circuit_breaker().call(
+                ingest_within_timeout
+            )
         cache_key = f"processed_record:{processed.id}"
         cache_value = json.dumps(
             {
@@ -42,6 +96,27 @@ async def ingest_event_endpoint(
         )
         await cache_client.set(cache_key, cache_value, ttl_seconds=3600)
         return ProcessedRecordRead.model_validate(processed, from_attributes=True)
+    except (*SPOOLABLE_ERRORS, CircuitOpenError) as exc:
+        if spool is None:
+            logger.exception("Error while ingesting event")
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to ingest event",
+            ) from exc
+        return await _spool_event(session, spool, payload, idempotency_key, exc)
+    except DuplicateEventError as exc:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Duplicate event",
+        ) from exc
+    except TransformError as exc:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(exc),
+        ) from exc
     except Exception as exc:
         logger.exception("Error while ingesting event")
         await session.rollback()
@@ -51,12 +126,50 @@ async def ingest_event_endpoint(
         ) from exc
 
 
+async def _spool_event(
+    session: AsyncSession,
+    spool: EventSpool,
+    payload: RawEventCreate,
+    idempotency_key: str | None,
+    error: BaseException,
+) -> JSONResponse:
+    # The database is down or too slow: keep the event in the local spool and
+    # accept it; the spool drainer writes it once the database is back. A
+    # commit cut off by the timeout may still land; the replay then carries
+    # the same idempotency key and is skipped by its unique index.
+    logger.warning(
+        "Database unavailable, spooling event",
+        extra={"source_name": payload.source_name, "error": repr(error)},
+    )
+    try:
+        await session.rollback()
+    except Exception:
+        logger.debug("Rollback after database failure failed", exc_info=True)
+    try:
+        key = await spool.append(
+            payload.source_name,
+            payload.payload,
+            origin="api",
+            idempotency_key=idempotency_key,
+        )
+    except SpoolFullError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable and spool full",
+        ) from exc
+    get_metrics().increment("ingest_spooled", labels={"origin": "api"})
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=SpooledEventRead(idempotency_key=key).model_dump(),
+    )
+
+
 @router.get(
     "/sources",
     response_model=list[IngestionSourceRead],
 )
 async def list_sources_endpoint(
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
 ) -> list[IngestionSourceRead]:
     from sqlalchemy import select
 
@@ -72,15 +185,73 @@ async def list_sources_endpoint(
     response_model=list[ProcessedRecordRead],
 )
 async def list_processed_records_endpoint(
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_read_db_session),
 ) -> list[ProcessedRecordRead]:
     from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
 
     from app.models import ProcessedRecord
 
-    result = await session.execute(select(ProcessedRecord))
+    result = await session.execute(
+        select(ProcessedRecord).options(selectinload(ProcessedRecord.raw_event))
+    )
     records = result.scalars().all()
     return [
         ProcessedRecordRead.model_validate(record, from_attributes=True)
         for record in records
     ]
+
+
+@router.get(
+    "/processed-records/{record_id}",
+    response_model=ProcessedRecordRead,
+)
+async def get_processed_record_endpoint(
+    record_id: int,
+    session: AsyncSession = Depends(get_read_db_session),
+) -> ProcessedRecordRead:
+    # Records moved out by the retention job are served from the archive
+    repository = SqlAlchemyEventRepository(session=session)
+    record = await repository.get_processed_record(record_id)
+    if record is not None:
+        return ProcessedRecordRead.model_validate(record, from_attributes=True)
+    archived = await read_archived_processed_record(
+        repository, get_settings().archive_path, record_id
+    )
+    if archived is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Processed record not found",
+        )
+    return ProcessedRecordRead.model_validate(archived)
+
+
+@router.get("/metrics")
+async def metrics_endpoint() -> dict[str, dict[str, float]]:
+    metrics = get_metrics()
+    for pool, stats in pool_stats().items():
+        for name, value in stats.items():
+            metrics.set_gauge(f"db_pool_{name}", value, labels={"pool": pool})
+    return metrics.snapshot()
+
+
+@router.get(
+    "/stats",
+    response_model=list[WindowStatsRead],
+)
+async def stats_endpoint(
+    source: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    window_seconds: int | None = None,
+    session: AsyncSession = Depends(get_read_db_session),
+) -> list[WindowStatsRead]:
+    repository = SqlAlchemyEventRepository(session=session)
+    windows = await list_window_stats(
+        repository,
+        window_seconds=window_seconds or get_settings().stats_window_seconds,
+        since=since,
+        until=until,
+        source_name=source,
+    )
+    return [WindowStatsRead.model_validate(window) for window in windows]
@@ -1,6 +1,8 @@
 from .etl import (
+    FieldStatsRead as FieldStatsRead,
     IngestionSourceCreate as IngestionSourceCreate,
     IngestionSourceRead as IngestionSourceRead,
     RawEventCreate as RawEventCreate,
     ProcessedRecordRead as ProcessedRecordRead,
+    WindowStatsRead as WindowStatsRead,
 )
@@ -40,6 +40,11 @@ class RawEventCreate(BaseModel):
         return value
 
 
+class SpooledEventRead(BaseModel):
+    status: str = "SPOOLED"
+    idempotency_key: str
+
+
 class ProcessedRecordRead(BaseModel):
     id: int
     raw_event_id: int
@@ -58,3 +63,20 @@ class ProcessedRecordRead(BaseModel):
             except ValueError:
                 return None
         return value
+
+
+class FieldStatsRead(BaseModel):
+    count: int
+    sum: float | None
+    min: float | None
+    max: float | None
+    avg: float | None
+
+
+class WindowStatsRead(BaseModel):
+    source_name: str
+    status: str
+    window_start: datetime
+    window_seconds: int
+    event_count: int
+    fields: dict[str, FieldStatsRead]
@@ -1 +1,4 @@
+from .aggregates import get_aggregator as get_aggregator
+from .dedup import DuplicateEventError as DuplicateEventError
+from .transforms import TransformError as TransformError
 from .etl import ingest_event as ingest_event, mark_processed as mark_processed
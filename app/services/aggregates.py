@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.interfaces.events import EventRepository
+from app.repositories.events import PENDING_AGGREGATES_KEY, SqlAlchemyEventRepository
+
+logger = logging.getLogger(__name__)
+
+# (source_id, status, window_start epoch seconds, field)
+WindowKey = tuple[int, str, int, str]
+
+
+class WindowAggregator:
+    # In-memory tumbling-window counters, fed with committed processed
+    # records and periodically merged into event_rollups by flush().
+
+    def __init__(
+        self,
+        window_seconds: int = 60,
+        fields: tuple[str, ...] = (),
+        flush_interval_seconds: float = 10.0,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.fields = fields
+        self.flush_interval_seconds = flush_interval_seconds
+        # [count, sum, min, max]; sum/min/max stay None for the event counter
+        self._windows: dict[WindowKey, list[Any]] = {}
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _merge(
+        self,
+        key: WindowKey,
+        count: int,
+        total: float | None,
+        low: float | None,
+        high: float | None,
+    ) -> None:
+        current = self._windows.get(key)
+        if current is None:
+            self._windows[key] = [count, total, low, high]
+            return
+        current[0] += count
+        if total is not None:
+            current[1] = total if current[1] is None else current[1] + total
+            current[2] = low if current[2] is None else min(current[2], low)
+            current[3] = high if current[3] is None else max(current[3], high)
+
+    def record(
+        self,
+        source_id: int,
+        status: str,
+        payload: dict[str, Any] | None,
+        at: float | None = None,
+    ) -> None:
+        at = time.time() if at is None else at
+        window_start = int(at // self.window_seconds) * self.window_seconds
+        self._merge((source_id, status, window_start, ""), 1, None, None, None)
+        if not payload:
+            return
+        for field in self.fields:
+            value = payload.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._merge(
+                    (source_id, status, window_start, field), 1, value, value, value
+                )
+
+    def drain(self) -> list[dict[str, Any]]:
+        windows, self._windows = self._windows, {}
+        self._last_flush = time.monotonic()
+        return [
+            {
+                "source_id": source_id,
+                "status": status,
+                "window_start": datetime.fromtimestamp(window_start, tz=timezone.utc),
+                "window_seconds": self.window_seconds,
+                "field": field,
+                "event_count": count,
+                "value_sum": total,
+                "value_min": low,
+                "value_max": high,
+            }
+            for (source_id, status, window_start, field), (
+                count,
+                total,
+                low,
+                high,
+            ) in windows.items()
+        ]
+
+    def restore(self, rows: list[dict[str, Any]]) -> None:
+        # Puts back rows whose flush failed, so no counts are lost
+        for row in rows:
+            key = (
+                row["source_id"],
+                row["status"],
+                int(row["window_start"].timestamp()),
+                row["field"],
+            )
+            self._merge(
+                key,
+                row["event_count"],
+                row["value_sum"],
+                row["value_min"],
+                row["value_max"],
+            )
+
+    def flush_due(self) -> bool:
+        return (
+            bool(self._windows)
+            and time.monotonic() - self._last_flush >= self.flush_interval_seconds
+        )
+
+    async def flush(self, session_factory: Callable[[], AsyncSession]) -> int:
+        rows = self.drain()
+        if not rows:
+            return 0
+        try:
+            async with session_factory() as session:
+                repository = SqlAlchemyEventRepository(session=session)
+                await repository.upsert_rollups(rows)
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to flush event rollups", extra={"rows": len(rows)})
+            self.restore(rows)
+            return 0
+        return len(rows)
+
+
+@lru_cache(maxsize=1)
+def get_aggregator() -> WindowAggregator | None:
+    settings = get_settings()
+    if not settings.stats_enabled:
+        return None
+    return WindowAggregator(
+        window_seconds=settings.stats_window_seconds,
+        fields=tuple(
+            field.strip() for field in settings.stats_fields.split(",") if field.strip()
+        ),
+        flush_interval_seconds=settings.stats_flush_seconds,
+    )
+
+
+async def run_aggregate_flusher(
+    session_factory: Callable[[], AsyncSession],
+    stop_event: asyncio.Event,
+) -> None:
+    aggregator = get_aggregator()
+    if aggregator is None:
+        return
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(
+                stop_event.wait(), timeout=aggregator.flush_interval_seconds
+            )
+        except asyncio.TimeoutError:
+            pass
+        await aggregator.flush(session_factory)
+
+
+async def list_window_stats(
+    repository: EventRepository,
+    window_seconds: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    source_name: str | None = None,
+) -> list[dict[str, Any]]:
+    # One entry per (source, status, window) with its field stats nested
+    windows: dict[tuple[str, str, datetime], dict[str, Any]] = {}
+    rollups = await repository.list_rollups(
+        window_seconds=window_seconds,
+        since=since,
+        until=until,
+        source_name=source_name,
+    )
+    for name, rollup in rollups:
+        window = windows.setdefault(
+            (name, rollup.status, rollup.window_start),
+            {
+                "source_name": name,
+                "status": rollup.status,
+                "window_start": rollup.window_start,
+                "window_seconds": rollup.window_seconds,
+                "event_count": 0,
+                "fields": {},
+            },
+        )
+        if rollup.field == "":
+            window["event_count"] = rollup.event_count
+        else:
+            window["fields"][rollup.field] = {
+                "count": rollup.event_count,
+                "sum": rollup.value_sum,
+                "min": rollup.value_min,
+                "max": rollup.value_max,
+                "avg": (
+                    rollup.value_sum / rollup.event_count
+                    if rollup.value_sum is not None and rollup.event_count
+                    else None
+                ),
+            }
+    return list(windows.values())
+
+
+@event.listens_for(Session, "after_commit")
+def _aggregate_committed_events(session: Session) -> None:
+    # Only committed records are counted; savepoints that roll back drop
+    # their entries in the repository.
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop(PENDING_AGGREGATES_KEY, None)
+    aggregator = get_aggregator()
+    if not pending or aggregator is None:
+        return
+    now = time.time()
+    for source_id, status, payload in pending:
+        aggregator.record(source_id, status, payload, at=now)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(PENDING_AGGREGATES_KEY, None)
@@ -0,0 +1,151 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any
+
+from app.interfaces.events import EventRepository
+from app.models import ArchiveSegment, ProcessedRecord, RawEvent
+from app.tracing import traced
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def segment_path(day: str, first_id: int, last_id: int) -> str:
+    # Relative to the archive root, partitioned by month and day:
+    # 2026-10/2026-10-19/raw-000000001001-000000002000.ndjson.gz
+    return os.path.join(
+        day[:7], day, f"raw-{first_id:012d}-{last_id:012d}.ndjson.gz"
+    )
+
+
+def id_runs(ids: list[int]) -> list[tuple[int, int]]:
+    # Sorted runs of consecutive ids: [1, 2, 3, 7, 8] -> [(1, 3), (7, 8)]
+    runs: list[tuple[int, int]] = []
+    for value in sorted(ids):
+        if runs and value == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], value)
+        else:
+            runs.append((value, value))
+    return runs
+
+
+def _encode_record(record: ProcessedRecord) -> dict[str, Any]:
+    return {
+        "id": record.id,
+        "raw_event_id": record.raw_event_id,
+        "status": record.status,
+        "result_payload": record.result_payload,
+        "processed_at": record.processed_at.isoformat(),
+    }
+
+
+def _encode_event(
+    raw_event: RawEvent, source_name: str, records: list[ProcessedRecord]
+) -> dict[str, Any]:
+    # One NDJSON line per raw event, with its processed records inline
+    return {
+        "raw_event": {
+            "id": raw_event.id,
+            "source_id": raw_event.source_id,
+            "source_name": source_name,
+            "payload": raw_event.payload,
+            "content_hash": raw_event.content_hash,
+            "received_at": raw_event.received_at.isoformat(),
+        },
+        "processed_records": [_encode_record(record) for record in records],
+    }
+
+
+def write_segment(root: str, relative_path: str, lines: list[dict[str, Any]]) -> None:
+    # Written to a temporary file and renamed, so a segment is either
+    # complete or absent. Rewriting the same batch after a crash (same ids,
+    # same name) replaces the file.
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as raw_file:
+        with gzip.GzipFile(fileobj=raw_file, mode="wb", mtime=0) as segment:
+            for line in lines:
+                segment.write(json.dumps(line).encode("utf-8") + b"\n")
+        raw_file.flush()
+        os.fsync(raw_file.fileno())
+    os.replace(temporary, path)
+
+
+def _find_record(path: str, record_id: int) -> dict[str, Any] | None:
+    with gzip.open(path, "rt", encoding="utf-8") as segment:
+        for line in segment:
+            for record in json.loads(line)["processed_records"]:
+                if record["id"] == record_id:
+                    return record
+    return None
+
+
+@traced("archive.archive_expired_events")
+async def archive_expired_events(
+    repository: EventRepository,
+    root: str,
+    cutoff: datetime,
+    limit: int,
+) -> int:
+    # Moves up to limit events received before cutoff, with their processed
+    # records, into one segment per received_at day, indexes the segments
+    # and deletes the rows. The caller commits; segments are on disk first,
+    # so a failed commit leaves files that the next run overwrites.
+    rows = await repository.list_expired_raw_events(cutoff, limit)
+    if not rows:
+        return 0
+    raw_event_ids = [raw_event.id for raw_event, _ in rows]
+    records_by_event: dict[int, list[ProcessedRecord]] = {}
+    for record in await repository.list_processed_records_for(raw_event_ids):
+        records_by_event.setdefault(record.raw_event_id, []).append(record)
+
+    days: dict[str, list[dict[str, Any]]] = {}
+    for raw_event, source_name in rows:
+        day = raw_event.received_at.date().isoformat()
+        days.setdefault(day, []).append(
+            _encode_event(
+                raw_event, source_name, records_by_event.get(raw_event.id, [])
+            )
+        )
+    for day, lines in days.items():
+        first_id, last_id = lines[0]["raw_event"]["id"], lines[-1]["raw_event"]["id"]
+        relative_path = segment_path(day, first_id, last_id)
+        await asyncio.to_thread(write_segment, root, relative_path, lines)
+        record_ids = [
+            record["id"] for line in lines for record in line["processed_records"]
+        ]
+        await repository.add_archive_segment(
+            ArchiveSegment(
+                day=day,
+                path=relative_path,
+                first_raw_event_id=first_id,
+                last_raw_event_id=last_id,
+                event_count=len(lines),
+            ),
+            id_runs(record_ids),
+        )
+    await repository.delete_raw_events(raw_event_ids)
+    get_metrics().increment("archive_events", len(raw_event_ids))
+    get_metrics().increment("archive_segments", len(days))
+    return len(raw_event_ids)
+
+
+@traced("archive.read_processed_record")
+async def read_archived_processed_record(
+    repository: EventRepository, root: str, record_id: int
+) -> dict[str, Any] | None:
+    # Only the one segment indexed for record_id is opened
+    segment = await repository.find_archive_segment(record_id)
+    if segment is None:
+        return None
+    path = os.path.join(root, segment.path)
+    try:
+        return await asyncio.to_thread(_find_record, path, record_id)
+    except FileNotFoundError:
+        logger.warning("Archive segment missing", extra={"path": path})
+        return None
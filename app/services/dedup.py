@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.interfaces.events import EventRepository
+from app.models import RawEvent
+from app.repositories.events import PENDING_HASHES_KEY
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateEventError(Exception):
+    def __init__(self, source_name: str, content_hash: str) -> None:
+        super().__init__(f"Duplicate event for source {source_name}")
+        self.source_name = source_name
+        self.content_hash = content_hash
+
+
+def content_hash(source_name: str, payload: dict[str, Any]) -> str:
+    canonical = json.dumps(
+        payload,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(f"{source_name}\x00{canonical}".encode("utf-8")).hexdigest()
+
+
+class DedupIndex:
+    # Exact LRU set of hashes known to be stored: committed by this process,
+    # or loaded from the newest rows at start-up. A hit is skipped with no
+    # database round trip; anything else is confirmed by the unique index
+    # through INSERT ... ON CONFLICT DO NOTHING, which is one round trip
+    # whether or not the event is new.
+
+    def __init__(self, recent_capacity: int = 100_000) -> None:
+        self._recent_capacity = recent_capacity
+        self._recent: OrderedDict[tuple[str, str], None] = OrderedDict()
+        self._metrics = get_metrics()
+
+    async def warm_up(self, repository: EventRepository) -> None:
+        # Run once at start-up, outside any request: the newest hashes are
+        # the likeliest to be re-sent (retries, replays).
+        hashes = await repository.list_recent_content_hashes(self._recent_capacity)
+        for source_name, digest in reversed(hashes):
+            self.remember_committed(source_name, digest)
+        logger.info("Loaded dedup hashes", extra={"hashes": len(hashes)})
+
+    def seen_recently(self, source_name: str, digest: str) -> bool:
+        key = (source_name, digest)
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            return True
+        return False
+
+    def remember_committed(self, source_name: str, digest: str) -> None:
+        self._recent[(source_name, digest)] = None
+        self._recent.move_to_end((source_name, digest))
+        while len(self._recent) > self._recent_capacity:
+            self._recent.popitem(last=False)
+
+    def count(self, source_name: str, outcome: str) -> None:
+        self._metrics.increment(
+            "dedup_events", labels={"source": source_name, "outcome": outcome}
+        )
+
+
+@lru_cache(maxsize=1)
+def get_dedup_index() -> DedupIndex | None:
+    settings = get_settings()
+    if not settings.dedup_enabled:
+        return None
+    return DedupIndex(recent_capacity=settings.dedup_recent_capacity)
+
+
+async def ingest_event_deduplicated(
+    repository: EventRepository,
+    dedup: DedupIndex,
+    source_name: str,
+    payload: dict[str, Any],
+    idempotency_key: str | None = None,
+) -> RawEvent:
+    digest = content_hash(source_name, payload)
+    if dedup.seen_recently(source_name, digest):
+        dedup.count(source_name, "skipped_memory")
+        raise DuplicateEventError(source_name, digest)
+    raw_event = await repository.ingest_event_if_new(
+        source_name=source_name,
+        payload=payload,
+        content_hash=digest,
+        idempotency_key=idempotency_key,
+    )
+    if raw_event is None:
+        dedup.count(source_name, "skipped_confirmed")
+        raise DuplicateEventError(source_name, digest)
+    dedup.count(source_name, "inserted")
+    return raw_event
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_hashes(session: Session) -> None:
+    # Hashes only become "certainly stored" once the root transaction
+    # commits; the repository drops entries whose savepoint rolled back.
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop(PENDING_HASHES_KEY, None)
+    dedup = get_dedup_index()
+    if not pending or dedup is None:
+        return
+    for source_name, digest in pending:
+        dedup.remember_committed(source_name, digest)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_hashes(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(PENDING_HASHES_KEY, None)
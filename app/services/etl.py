@@ -1,39 +1,88 @@
 import logging
 from typing import Any
 
+from app.config import get_settings
 from app.interfaces.events import EventRepository
 from app.models import ProcessedRecord, RawEvent
+from app.services.dedup import (
+    DuplicateEventError,
+    content_hash,
+    get_dedup_index,
+    ingest_event_deduplicated,
+)
+from app.services.spool import SPOOLABLE_ERRORS
+from app.services.transforms import get_transform_registry
+from app.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+@traced("etl.ingest_event")
 async def ingest_event(
     repository: EventRepository,
     source_name: str,
     payload: dict[str, Any],
+    idempotency_key: str | None = None,
 ) -> RawEvent:
-    raw_event = await repository.ingest_event(source_name=source_name, payload=payload)
+    # Raises DuplicateEventError when the idempotency key (or, with
+    # DEDUP_ENABLED, the content hash) is already stored
+    dedup = get_dedup_index()
+    if dedup is not None:
+        raw_event = await ingest_event_deduplicated(
+            repository=repository,
+            dedup=dedup,
+            source_name=source_name,
+            payload=payload,
+            idempotency_key=idempotency_key,
+        )
+    elif idempotency_key is not None:
+        new_event = await repository.ingest_event_if_new(
+            source_name=source_name,
+            payload=payload,
+            idempotency_key=idempotency_key,
+        )
+        if new_event is None:
+            raise DuplicateEventError(source_name, idempotency_key)
+        raw_event = new_event
+    else:
+        raw_event = await repository.ingest_event(
+            source_name=source_name, payload=payload
+        )
     logger.info(f"Ingested event {raw_event}", extra={"source_name": source_name})
     return raw_event
 
 
+@traced("etl.transform_payload")
+def transform_payload(source_name: str, payload: dict[str, Any]) -> dict[str, Any]:
+    # Single-record path (API, gRPC); batches go through
+    # TransformRegistry.transform_records. Raises TransformError.
+    return get_transform_registry().transform_one(source_name, payload)
+
+
+@traced("etl.ingest_and_mark_success")
 async def ingest_and_mark_success(
     repository: EventRepository,
     source_name: str,
     payload: dict[str, Any],
+    idempotency_key: str | None = None,
 ) -> tuple[RawEvent, ProcessedRecord]:
+    result_payload = transform_payload(source_name, payload)
     raw_event = await ingest_event(
-        repository=repository, source_name=source_name, payload=payload
+        repository=repository,
+        source_name=source_name,
+        payload=payload,
+        idempotency_key=idempotency_key,
     )
     record = await mark_processed(
         repository=repository,
         raw_event=raw_event,
         status="SUCCESS",
-        result_payload=payload,
+        result_payload=result_payload,
     )
     return raw_event, record
 
 
+@traced("etl.mark_processed")
 async def mark_processed(
     repository: EventRepository,
     raw_event: RawEvent,
@@ -45,5 +94,149 @@ async def mark_processed(
         status=status,
         result_payload=result_payload,
     )
+    await _add_outbox_message(
+        repository, record, raw_event.source_id, result_payload
+    )
     logger.info(f"Processed event {raw_event}", extra={"status": status})
     return record
+
+
+async def _add_outbox_message(
+    repository: EventRepository,
+    record: ProcessedRecord,
+    source_id: int,
+    result_payload: dict[str, Any] | None,
+) -> None:
+    settings = get_settings()
+    if settings.outbox_enabled:
+        # Same transaction as the processed record: the event is published
+        # by the outbox relay if and only if the record commits.
+        await repository.add_outbox_message(
+            routing_key=settings.outbox_routing_key,
+            message={
+                "id": record.id,
+                "raw_event_id": record.raw_event_id,
+                "source_id": source_id,
+                "status": record.status,
+                "result_payload": result_payload,
+            },
+        )
+
+
+async def _ingest_success_batch(
+    repository: EventRepository,
+    items: list[tuple[str, dict[str, Any], dict[str, Any] | None]],
+) -> list[ProcessedRecord]:
+    # (source_name, payload, result_payload) items stored as SUCCESS with
+    # bulk inserts. Raises on any duplicate, leaving it to the caller's
+    # record-by-record fallback to tell which records were duplicates.
+    dedup = get_dedup_index()
+    digests: list[str | None] = [None] * len(items)
+    if dedup is not None:
+        digests = [
+            content_hash(source_name, payload) for source_name, payload, _ in items
+        ]
+        for (source_name, _, _), digest in zip(items, digests):
+            if dedup.seen_recently(source_name, digest):
+                raise DuplicateEventError(source_name, digest)
+    stored = await repository.ingest_processed_batch(
+        [
+            (source_name, payload, result_payload, digest)
+            for (source_name, payload, result_payload), digest in zip(items, digests)
+        ]
+    )
+    for (source_name, _, result_payload), (source_id, record) in zip(items, stored):
+        if dedup is not None:
+            dedup.count(source_name, "inserted")
+        await _add_outbox_message(repository, record, source_id, result_payload)
+    return [record for _, record in stored]
+
+
+async def _ingest_success(
+    repository: EventRepository,
+    source_name: str,
+    payload: dict[str, Any],
+    result_payload: dict[str, Any] | None,
+) -> ProcessedRecord:
+    raw_event = await ingest_event(
+        repository=repository, source_name=source_name, payload=payload
+    )
+    return await mark_processed(
+        repository=repository,
+        raw_event=raw_event,
+        status="SUCCESS",
+        result_payload=result_payload,
+    )
+
+
+async def _record_failures(
+    repository: EventRepository,
+    records: list[tuple[str, dict[str, Any]]],
+    outcomes: list[tuple[str, ProcessedRecord | None, str]],
+) -> None:
+    # Stored records are counted by mark_processed; the rest are counted here
+    for (source_name, payload), (status, _, _) in zip(records, outcomes):
+        if status in ("REJECTED", "FAILED"):
+            await repository.record_outcome(source_name, status, payload)
+
+
+@traced("etl.ingest_batch")
+async def ingest_batch(
+    repository: EventRepository,
+    records: list[tuple[str, dict[str, Any]]],
+) -> list[tuple[str, ProcessedRecord | None, str]]:
+    # Ingests (source_name, payload) records in the caller's transaction and
+    # reports (status, record, error) per record: SUCCESS, DUPLICATE,
+    # REJECTED (transform failed) or FAILED. The caller commits.
+    results, errors = await get_transform_registry().transform_indexed(records)
+    outcomes: list[tuple[str, ProcessedRecord | None, str]] = [
+        ("REJECTED", None, f"Transformation failed: {errors[index]}")
+        if index in errors
+        else ("", None, "")
+        for index in range(len(records))
+    ]
+    pending = [index for index in range(len(records)) if index not in errors]
+
+    # Optimistic pass: the whole batch as bulk inserts in one savepoint,
+    # which is much cheaper than two flushes and a savepoint per record.
+    try:
+        async with repository.savepoint():
+            stored = await _ingest_success_batch(
+                repository,
+                [(*records[index], results[index]) for index in pending],
+            )
+        for index, record in zip(pending, stored):
+            outcomes[index] = ("SUCCESS", record, "")
+        await _record_failures(repository, records, outcomes)
+        return outcomes
+    except SPOOLABLE_ERRORS:
+        # The database is down or too slow, not one record at fault: retrying
+        # record by record would only fail every record slowly.
+        raise
+    except Exception:
+        pass
+
+    # Something failed: redo record by record so only the culprits fail
+    for index in pending:
+        source_name, payload = records[index]
+        try:
+            async with repository.savepoint():
+                record = await _ingest_success(
+                    repository, source_name, payload, results[index]
+                )
+        except DuplicateEventError:
+            outcomes[index] = ("DUPLICATE", None, "Duplicate event")
+            continue
+        except SPOOLABLE_ERRORS:
+            raise
+        except Exception as exc:
+            logger.warning(
+                "Record failed in batch",
+                extra={"source_name": source_name},
+                exc_info=True,
+            )
+            outcomes[index] = ("FAILED", None, repr(exc))
+            continue
+        outcomes[index] = ("SUCCESS", record, "")
+    await _record_failures(repository, records, outcomes)
+    return outcomes
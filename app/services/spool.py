@@ -0,0 +1,236 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import get_settings
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Failures that mean "the database is down or too slow", as opposed to a
+# problem with the event itself: only these send events to the spool.
+SPOOLABLE_ERRORS = (
+    OperationalError,
+    InterfaceError,
+    PoolTimeoutError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+RELEASE_CHUNK_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spooled_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    source_name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    claimed_until REAL NOT NULL DEFAULT 0
+);
+-- Row count kept by triggers in the writing transaction, so the capacity
+-- check on append reads one row instead of counting the table
+CREATE TABLE IF NOT EXISTS spool_depth (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    depth INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO spool_depth (id, depth)
+SELECT 1, (SELECT COUNT(*) FROM spooled_events)
+WHERE NOT EXISTS (SELECT 1 FROM spool_depth);
+CREATE TRIGGER IF NOT EXISTS spooled_events_insert AFTER INSERT ON spooled_events
+BEGIN
+    UPDATE spool_depth SET depth = depth + 1 WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS spooled_events_delete AFTER DELETE ON spooled_events
+BEGIN
+    UPDATE spool_depth SET depth = depth - 1 WHERE id = 1;
+END;
+"""
+
+
+class SpoolFullError(Exception):
+    pass
+
+
+class SpooledEvent:
+    __slots__ = ("id", "idempotency_key", "source_name", "payload", "origin")
+
+    def __init__(
+        self,
+        id: int,
+        idempotency_key: str,
+        source_name: str,
+        payload: dict[str, Any],
+        origin: str,
+    ) -> None:
+        self.id = id
+        self.idempotency_key = idempotency_key
+        self.source_name = source_name
+        self.payload = payload
+        self.origin = origin
+
+
+class EventSpool:
+    # Durable local buffer for accepted events, in SQLite with WAL so every
+    # process on the host can append to the same file while a drainer reads
+    # it. An idempotency key makes appends of the same event (client
+    # retries) a no-op. Drainers claim rows with a lease, so several of them
+    # never replay the same rows at once, and delete them once committed.
+
+    def __init__(self, path: str, max_events: int = 1_000_000) -> None:
+        self.path = path
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Survives a process crash; an OS crash may lose the last commits
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._metrics = get_metrics()
+
+    def _append_blocking(
+        self, events: list[tuple[str, dict[str, Any], str, str | None]]
+    ) -> list[str]:
+        keys = [key or uuid.uuid4().hex for _, _, _, key in events]
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                (depth,) = connection.execute(
+                    "SELECT depth FROM spool_depth WHERE id = 1"
+                ).fetchone()
+                if depth + len(events) > self.max_events:
+                    raise SpoolFullError(f"Spool holds {depth} events")
+                connection.executemany(
+                    "INSERT OR IGNORE INTO spooled_events "
+                    "(idempotency_key, source_name, payload, origin, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (key, source_name, json.dumps(payload), origin, now)
+                        for key, (source_name, payload, origin, _) in zip(keys, events)
+                    ],
+                )
+                (depth,) = connection.execute(
+                    "SELECT depth FROM spool_depth WHERE id = 1"
+                ).fetchone()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        self._metrics.increment("spool_appended", len(events))
+        self._metrics.set_gauge("spool_depth", depth)
+        return keys
+
+    async def append(
+        self,
+        source_name: str,
+        payload: dict[str, Any],
+        origin: str,
+        idempotency_key: str | None = None,
+    ) -> str:
+        keys = await self.append_many(
+            [(source_name, payload, origin, idempotency_key)]
+        )
+        return keys[0]
+
+    async def append_many(
+        self, events: list[tuple[str, dict[str, Any], str, str | None]]
+    ) -> list[str]:
+        # events: [(source_name, payload, origin, idempotency_key or None)];
+        # returns the keys. Raises SpoolFullError when over max_events.
+        return await asyncio.to_thread(self._append_blocking, events)
+
+    def _claim_blocking(self, limit: int, lease_seconds: float) -> list[SpooledEvent]:
+        now = time.time()
+        with self._lock:
+            rows = self._connection.execute(
+                "UPDATE spooled_events SET claimed_until = ? WHERE id IN ("
+                "SELECT id FROM spooled_events WHERE claimed_until < ? "
+                "ORDER BY id LIMIT ?) "
+                "RETURNING id, idempotency_key, source_name, payload, origin",
+                (now + lease_seconds, now, limit),
+            ).fetchall()
+        rows.sort()
+        return [
+            SpooledEvent(row_id, key, source_name, json.loads(payload), origin)
+            for row_id, key, source_name, payload, origin in rows
+        ]
+
+    async def claim(
+        self, limit: int, lease_seconds: float = 60.0
+    ) -> list[SpooledEvent]:
+        return await asyncio.to_thread(self._claim_blocking, limit, lease_seconds)
+
+    def _release_blocking(self, ids: list[int], delete: bool) -> None:
+        # Chunked so no statement binds more variables than older SQLite
+        # builds allow (999)
+        with self._lock:
+            for start in range(0, len(ids), RELEASE_CHUNK_SIZE):
+                chunk = ids[start : start + RELEASE_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                statement = (
+                    f"DELETE FROM spooled_events WHERE id IN ({placeholders})"
+                    if delete
+                    else f"UPDATE spooled_events SET claimed_until = 0 "
+                    f"WHERE id IN ({placeholders})"
+                )
+                self._connection.execute(statement, chunk)
+
+    async def delete(self, ids: list[int]) -> None:
+        if ids:
+            await asyncio.to_thread(self._release_blocking, ids, True)
+
+    async def release(self, ids: list[int]) -> None:
+        # Gives claimed rows back right away instead of waiting for the lease
+        if ids:
+            await asyncio.to_thread(self._release_blocking, ids, False)
+
+    def _depth_blocking(self) -> int:
+        with self._lock:
+            (depth,) = self._connection.execute(
+                "SELECT depth FROM spool_depth WHERE id = 1"
+            ).fetchone()
+        self._metrics.set_gauge("spool_depth", depth)
+        return depth
+
+    async def depth(self) -> int:
+        return await asyncio.to_thread(self._depth_blocking)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+@lru_cache(maxsize=1)
+def get_database_circuit_breaker() -> CircuitBreaker:
+    # Only outages count as failures; a duplicate or a payload the transform
+    # rejects says nothing about the database
+    settings = get_settings()
+    return CircuitBreaker(
+        "database",
+        failure_threshold=settings.circuit_failure_threshold,
+        reset_timeout_seconds=settings.circuit_reset_timeout_seconds,
+        failure_exceptions=SPOOLABLE_ERRORS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_spool() -> EventSpool | None:
+    settings = get_settings()
+    if not settings.spool_enabled:
+        return None
+    return EventSpool(settings.spool_path, max_events=settings.spool_max_events)
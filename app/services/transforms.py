@@ -0,0 +1,374 @@
+import ast
+import asyncio
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Row = dict[str, Any]
+BatchResult = tuple[list[Row | None], list[tuple[int, str]]]
+
+_CASTS = {
+    "string": "str(value)",
+    "integer": "_to_int(value)",
+    "number": "float(value)",
+    "boolean": "_to_bool(value)",
+}
+
+_DERIVE_FUNCTIONS = frozenset(
+    {"abs", "round", "min", "max", "int", "float", "str", "len", "bool"}
+)
+
+_DERIVE_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.BoolOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Constant,
+    ast.Load,
+    ast.operator,
+    ast.unaryop,
+    ast.boolop,
+    ast.cmpop,
+)
+
+
+def _load_yaml(text: str) -> Any:
+    # PyYAML is only imported when a YAML file is actually configured
+    import yaml
+
+    return yaml.safe_load(text)
+
+
+class TransformError(ValueError):
+    pass
+
+
+def _to_int(value: Any) -> int:
+    # "2001.0" from spreadsheets is a valid integer; "2001.5" is not
+    if isinstance(value, str):
+        value = float(value) if "." in value else int(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{value!r} is not an integer")
+        return int(value)
+    return int(value)
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "1", "yes"):
+            return True
+        if lowered in ("false", "0", "no"):
+            return False
+        raise ValueError(f"{value!r} is not a boolean")
+    return bool(value)
+
+
+class CompiledTransform:
+    # Steps of one source fused into a single generated batch function. Rows
+    # that fail are returned as (index, error) and get None in the results.
+
+    def __init__(
+        self,
+        source_name: str,
+        transform_batch: Callable[[list[Row]], BatchResult],
+        source_code: str,
+        process_pool: bool = False,
+    ) -> None:
+        self.source_name = source_name
+        self.source_code = source_code
+        self.process_pool = process_pool
+        self._transform_batch = transform_batch
+
+    def transform_batch(self, rows: list[Row]) -> BatchResult:
+        return self._transform_batch(rows)
+
+
+class _FieldReferences(ast.NodeTransformer):
+    def __init__(self) -> None:
+        self.fields: list[str] = []
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        # Function names are not fields; only their arguments are rewritten
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        self.fields.append(node.id)
+        return ast.parse(f"out.get({node.id!r})", mode="eval").body
+
+
+def _derive_expression(target: str, expression: str) -> str:
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as exc:
+        raise TransformError(f"Invalid expression for {target!r}: {exc}") from exc
+    for node in ast.walk(tree):
+        if not isinstance(node, _DERIVE_NODES):
+            raise TransformError(
+                f"Unsupported syntax in expression for {target!r}: "
+                f"{type(node).__name__}"
+            )
+        if isinstance(node, ast.Call) and (
+            not isinstance(node.func, ast.Name)
+            or node.func.id not in _DERIVE_FUNCTIONS
+            or node.keywords
+        ):
+            raise TransformError(f"Unsupported call in expression for {target!r}")
+    references = _FieldReferences()
+    body = ast.unparse(references.visit(tree))
+    fields = list(dict.fromkeys(references.fields))
+    if not fields:
+        return body
+    # A derived field is None when any of its inputs is missing
+    missing = " or ".join(f"out.get({field!r}) is None" for field in fields)
+    return f"None if {missing} else ({body})"
+
+
+def _step_lines(step: Any, namespace: dict[str, Any]) -> list[str]:
+    if not isinstance(step, dict) or len(step) != 1:
+        raise TransformError(f"Each step must have exactly one operation: {step!r}")
+    operation, argument = next(iter(step.items()))
+    slot = len(namespace)
+    lines: list[str] = []
+    if operation == "rename":
+        for old, new in argument.items():
+            lines += [f"if {old!r} in out:", f"    out[{new!r}] = out.pop({old!r})"]
+    elif operation == "drop":
+        lines += [f"out.pop({field!r}, None)" for field in argument]
+    elif operation == "cast":
+        for field, cast in argument.items():
+            if cast not in _CASTS:
+                raise TransformError(f"Unknown cast for field {field!r}: {cast!r}")
+            lines += [
+                f"value = out.get({field!r})",
+                "if value == '':",
+                f"    out[{field!r}] = None",
+                "elif value is not None:",
+                f"    out[{field!r}] = {_CASTS[cast]}",
+            ]
+    elif operation == "derive":
+        for target, expression in argument.items():
+            lines.append(
+                f"out[{target!r}] = {_derive_expression(target, str(expression))}"
+            )
+    elif operation == "lookup":
+        table = argument.get("table")
+        if table is None and "table_path" in argument:
+            table = json.loads(Path(argument["table_path"]).read_text(encoding="utf-8"))
+        if not isinstance(table, dict):
+            raise TransformError("lookup needs a table mapping or a table_path")
+        namespace[f"_lookup_{slot}"] = table
+        namespace[f"_default_{slot}"] = argument.get("default")
+        field = argument["field"]
+        target = argument.get("target", field)
+        lines.append(
+            f"out[{target!r}] = _lookup_{slot}.get(out.get({field!r}), _default_{slot})"
+        )
+    else:
+        raise TransformError(f"Unknown transform operation: {operation!r}")
+    return lines
+
+
+def compile_transform(source_name: str, spec: dict[str, Any]) -> CompiledTransform:
+    if not isinstance(spec, dict) or not isinstance(spec.get("steps"), list):
+        raise TransformError(f"Transform for source {source_name!r} needs steps")
+    namespace: dict[str, Any] = {"_to_int": _to_int, "_to_bool": _to_bool}
+    body: list[str] = []
+    try:
+        for step in spec["steps"]:
+            body += _step_lines(step, namespace)
+    except (AttributeError, KeyError, TypeError) as exc:
+        raise TransformError(
+            f"Invalid transform for source {source_name!r}: {exc!r}"
+        ) from exc
+
+    lines = [
+        "def transform_batch(rows):",
+        "    results = []",
+        "    failures = []",
+        "    for index, row in enumerate(rows):",
+        "        try:",
+        "            out = dict(row)",
+        *(f"            {line}" for line in body),
+        "        except Exception as exc:",
+        "            results.append(None)",
+        "            failures.append((index, repr(exc)))",
+        "            continue",
+        "        results.append(out)",
+        "    return results, failures",
+    ]
+    source_code = "\n".join(lines) + "\n"
+    exec(compile(source_code, f"<transform:{source_name}>", "exec"), namespace)
+    return CompiledTransform(
+        source_name=source_name,
+        transform_batch=namespace["transform_batch"],
+        source_code=source_code,
+        process_pool=bool(spec.get("process_pool", False)),
+    )
+
+
+def load_transforms(path: str) -> dict[str, CompiledTransform]:
+    # Transform file (YAML or JSON):
+    # {source_name: {"process_pool": bool, "steps": [{operation: argument}]}}
+    text = Path(path).read_text(encoding="utf-8")
+    data = json.loads(text) if path.endswith(".json") else _load_yaml(text)
+    if not isinstance(data, dict):
+        raise TransformError("Transform file must map source names to transforms")
+    return {
+        str(source_name): compile_transform(str(source_name), spec)
+        for source_name, spec in data.items()
+    }
+
+
+# Generated functions cannot be pickled, so pool processes compile their own
+# copy of the transforms once, in the initializer.
+_pool_transforms: dict[str, CompiledTransform] = {}
+
+
+def _init_pool_process(path: str) -> None:
+    _pool_transforms.update(load_transforms(path))
+
+
+def _transform_in_pool(source_name: str, rows: list[Row]) -> BatchResult:
+    return _pool_transforms[source_name].transform_batch(rows)
+
+
+class TransformRegistry:
+    def __init__(
+        self,
+        transforms: dict[str, CompiledTransform] | None = None,
+        path: str | None = None,
+        process_workers: int = 0,
+        pool_min_rows: int = 1000,
+    ) -> None:
+        self._transforms = transforms or {}
+        self._path = path
+        self._process_workers = process_workers
+        self._pool_min_rows = pool_min_rows
+        self._pool: ProcessPoolExecutor | None = None
+
+    def get(self, source_name: str) -> CompiledTransform | None:
+        return self._transforms.get(source_name)
+
+    def transform_one(self, source_name: str, payload: Row) -> Row:
+        transform = self._transforms.get(source_name)
+        if transform is None:
+            return payload
+        results, failures = transform.transform_batch([payload])
+        if failures:
+            raise TransformError(f"Transformation failed: {failures[0][1]}")
+        return results[0]  # type: ignore[return-value]
+
+    def _use_pool(self, transform: CompiledTransform, rows: list[Row]) -> bool:
+        return (
+            transform.process_pool
+            and self._path is not None
+            and self._process_workers > 0
+            and len(rows) >= self._pool_min_rows
+        )
+
+    async def transform_batch(self, source_name: str, rows: list[Row]) -> BatchResult:
+        transform = self._transforms.get(source_name)
+        if transform is None:
+            return list(rows), []
+        if not self._use_pool(transform, rows):
+            return transform.transform_batch(rows)
+        if self._pool is None:
+            # Spawned children re-import this module and compile the rules
+            # themselves instead of inheriting the parent's loop and sockets.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pool_process,
+                initargs=(self._path,),
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, _transform_in_pool, source_name, rows
+        )
+
+    async def transform_indexed(
+        self, records: list[tuple[str, Row]]
+    ) -> tuple[list[Row | None], dict[int, str]]:
+        # Transforms (source_name, payload) records one source batch at a time.
+        # Returns the results in record order (None where a record failed)
+        # and {record index: error}.
+        if not self._transforms:
+            return [payload for _, payload in records], {}
+        positions: dict[str, list[int]] = {}
+        for position, (source_name, _) in enumerate(records):
+            positions.setdefault(source_name, []).append(position)
+        results: list[Row | None] = [None] * len(records)
+        errors: dict[int, str] = {}
+        for source_name, indexes in positions.items():
+            batch_results, failures = await self.transform_batch(
+                source_name, [records[index][1] for index in indexes]
+            )
+            for index, result in zip(indexes, batch_results):
+                results[index] = result
+            for failed, error in failures:
+                errors[indexes[failed]] = error
+        return results, errors
+
+    async def transform_records(
+        self, records: list[tuple[str, Row]]
+    ) -> tuple[list[tuple[str, Row, Row]], list[tuple[str, Row, str]]]:
+        # Returns ([(source_name, payload, result)], [(source_name, payload,
+        # error)]), keeping the original order within each list.
+        if not self._transforms:
+            return [(source, payload, payload) for source, payload in records], []
+        results, errors = await self.transform_indexed(records)
+        transformed = [
+            (source_name, payload, results[index])
+            for index, (source_name, payload) in enumerate(records)
+            if index not in errors
+        ]
+        failed_records = [
+            (records[index][0], records[index][1], error)
+            for index, error in sorted(errors.items())
+        ]
+        return transformed, failed_records  # type: ignore[return-value]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+@lru_cache(maxsize=1)
+def get_transform_registry() -> TransformRegistry:
+    settings = get_settings()
+    path = settings.transform_rules_path
+    if not path:
+        return TransformRegistry()
+    registry = TransformRegistry(
+        load_transforms(path),
+        path=path,
+        process_workers=settings.transform_process_workers,
+        pool_min_rows=settings.transform_pool_min_rows,
+    )
+    logger.info("Loaded transforms", extra={"path": path})
+    return registry
+
+
+async def shutdown_transform_pool() -> None:
+    # Joining the pool processes blocks, so it runs off the event loop. A
+    # registry that was never built has no pool to close.
+    if not get_transform_registry.cache_info().currsize:
+        return
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, get_transform_registry().close)
@@ -1,15 +1,19 @@
 from typing import Any
 
 from app.interfaces import EventRepository
+from app.services import etl as etl_services
 from app.sinks.base import DataSink
+from app.tracing import traced
 
 
 class PostgresSink(DataSink):
     def __init__(self, event_repository: EventRepository) -> None:
         self.repository = event_repository
 
+    @traced("sink.postgres.write")
     async def write(self, record: dict[str, Any]) -> None:
-        await self.repository.mark_processed(
+        await etl_services.mark_processed(
+            repository=self.repository,
             raw_event=record["raw_event"],
             status=record.get("status", "Success"),
             result_payload=record.get("payload"),
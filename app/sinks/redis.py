@@ -2,6 +2,7 @@ import json
 from typing import Any
 
 from app.sinks.base import DataSink
+from app.tracing import traced
 from app.utils.cache import RedisCacheClient
 
 
@@ -9,6 +10,7 @@ class RedisSink(DataSink):
     def __init__(self, client: RedisCacheClient | None = None) -> None:
         self.client = client or RedisCacheClient()
 
+    @traced("sink.redis.write")
     async def write(self, record: dict[str, Any]) -> None:
         payload = {
             "id": record.get("id"),
@@ -0,0 +1,8 @@
+from .tracer import (
+    Span as Span,
+    Tracer as Tracer,
+    current_span as current_span,
+    get_tracer as get_tracer,
+    span as span,
+    traced as traced,
+)
@@ -0,0 +1,120 @@
+import json
+import logging
+import queue
+import threading
+from collections import deque
+from typing import Any
+
+from app.tracing.tracer import Span
+
+logger = logging.getLogger(__name__)
+
+_STATUS_ERROR = 2
+
+
+def _attribute_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def encode_span(span: Span) -> dict[str, Any]:
+    encoded: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            {"key": key, "value": _attribute_value(value)}
+            for key, value in span.attributes.items()
+        ],
+        "status": {},
+    }
+    if span.parent_id is not None:
+        encoded["parentSpanId"] = span.parent_id
+    if span.error is not None:
+        encoded["status"] = {"code": _STATUS_ERROR, "message": span.error}
+    return encoded
+
+
+class JsonlSpanExporter:
+    # Writes one OTLP/JSON ExportTraceServiceRequest per line, one line per
+    # trace (the format of the OpenTelemetry Collector file exporter, so the
+    # file can be replayed into any OTLP backend). Spans are buffered until
+    # their root ends; the file is written by a background thread so
+    # exporting never blocks the event loop.
+
+    def __init__(self, path: str, service_name: str = "etlpay") -> None:
+        self.path = path
+        self._resource = {
+            "attributes": [
+                {"key": "service.name", "value": {"stringValue": service_name}}
+            ]
+        }
+        self._lock = threading.Lock()
+        self._pending: dict[str, list[Span]] = {}
+        # Children that end after their root are written on their own
+        self._exported: deque[str] = deque(maxlen=1024)
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_lines, name="span-exporter", daemon=True
+        )
+        self._writer.start()
+
+    def export(self, span: Span, is_root: bool) -> None:
+        with self._lock:
+            if is_root:
+                spans = self._pending.pop(span.trace_id, [])
+                spans.append(span)
+                self._exported.append(span.trace_id)
+            elif span.trace_id in self._exported:
+                spans = [span]
+            else:
+                self._pending.setdefault(span.trace_id, []).append(span)
+                return
+        self._queue.put(self._encode(spans))
+
+    def _encode(self, spans: list[Span]) -> str:
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app.tracing"},
+                            "spans": [encode_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        return json.dumps(request, separators=(",", ":"))
+
+    def _write_lines(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                line = self._queue.get()
+                if line is None:
+                    return
+                try:
+                    f.write(line + "\n")
+                    # Drain whatever else is queued before flushing
+                    while not self._queue.empty():
+                        line = self._queue.get()
+                        if line is None:
+                            return
+                        f.write(line + "\n")
+                    f.flush()
+                except OSError:
+                    logger.exception("Failed to write spans", extra={"path": self.path})
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
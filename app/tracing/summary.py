@@ -0,0 +1,134 @@
+import argparse
+import json
+from typing import Any, Iterable
+
+
+class SpanRecord:
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "children")
+
+    def __init__(
+        self, span_id: str, parent_id: str | None, name: str, start: int, end: int
+    ) -> None:
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.end = end
+        self.children: list["SpanRecord"] = []
+
+    @property
+    def duration(self) -> int:
+        return max(self.end - self.start, 0)
+
+
+def load_traces(lines: Iterable[str]) -> dict[str, list[SpanRecord]]:
+    # Reads OTLP/JSON lines (as written by JsonlSpanExporter) into
+    # {trace id: spans}
+    traces: dict[str, list[SpanRecord]] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        for resource_spans in request.get("resourceSpans", []):
+            for scope_spans in resource_spans.get("scopeSpans", []):
+                for span in scope_spans.get("spans", []):
+                    traces.setdefault(span["traceId"], []).append(
+                        SpanRecord(
+                            span["spanId"],
+                            span.get("parentSpanId") or None,
+                            span["name"],
+                            int(span["startTimeUnixNano"]),
+                            int(span["endTimeUnixNano"]),
+                        )
+                    )
+    return traces
+
+
+def _critical_path(span: SpanRecord, critical: dict[str, int]) -> None:
+    # Walks back from the end of the span picking, each time, the child that
+    # finished last before the current point: those children are what the
+    # span waited on. Whatever they do not cover is the span's own time.
+    cursor = span.end
+    chosen: list[SpanRecord] = []
+    for child in sorted(span.children, key=lambda child: child.end, reverse=True):
+        if child.end <= cursor:
+            chosen.append(child)
+            cursor = child.start
+    own = span.duration - sum(child.duration for child in chosen)
+    critical[span.name] = critical.get(span.name, 0) + max(own, 0)
+    for child in chosen:
+        _critical_path(child, critical)
+
+
+def summarize(traces: dict[str, list[SpanRecord]]) -> list[dict[str, Any]]:
+    # One row per stage (span name): span count, total and self time, and
+    # the time it spent on the critical path of its traces, slowest first.
+    critical: dict[str, int] = {}
+    totals: dict[str, list[int]] = {}
+    root_time = 0
+    for spans in traces.values():
+        by_id = {span.span_id: span for span in spans}
+        roots = []
+        for span in spans:
+            parent = by_id.get(span.parent_id) if span.parent_id else None
+            if parent is None:
+                roots.append(span)
+            else:
+                parent.children.append(span)
+        for span in spans:
+            own = span.duration - sum(child.duration for child in span.children)
+            total = totals.setdefault(span.name, [0, 0, 0])
+            total[0] += 1
+            total[1] += span.duration
+            total[2] += max(own, 0)
+        for root in roots:
+            root_time += root.duration
+            _critical_path(root, critical)
+    rows = [
+        {
+            "stage": name,
+            "spans": count,
+            "total_ms": total_ns / 1e6,
+            "self_ms": self_ns / 1e6,
+            "critical_ms": critical.get(name, 0) / 1e6,
+            "critical_share": critical.get(name, 0) / root_time if root_time else 0.0,
+        }
+        for name, (count, total_ns, self_ns) in totals.items()
+    ]
+    rows.sort(key=lambda row: row["critical_ms"], reverse=True)
+    return rows
+
+
+def format_summary(rows: list[dict[str, Any]], traces: int) -> str:
+    width = max([len("stage")] + [len(row["stage"]) for row in rows])
+    lines = [
+        f"{traces} traces",
+        f"{'stage':<{width}}  {'spans':>7}  {'total ms':>10}  {'self ms':>10}  "
+        f"{'critical ms':>11}  {'share':>6}",
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['stage']:<{width}}  {row['spans']:>7}  {row['total_ms']:>10.1f}  "
+            f"{row['self_ms']:>10.1f}  {row['critical_ms']:>11.1f}  "
+            f"{row['critical_share']:>6.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Summarize critical-path time per stage across a trace file"
+    )
+    parser.add_argument("path", help="Span file written with TRACING_ENABLED=true")
+    parser.add_argument("--top", type=int, default=0, help="Only show the top N stages")
+    args = parser.parse_args(argv)
+    with open(args.path, encoding="utf-8") as f:
+        traces = load_traces(f)
+    rows = summarize(traces)
+    if args.top:
+        rows = rows[: args.top]
+    print(format_summary(rows, len(traces)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
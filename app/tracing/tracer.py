@@ -0,0 +1,161 @@
+import atexit
+import functools
+import inspect
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Protocol, TypeVar
+
+from app.config import get_settings
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span:
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        parent_id: str | None,
+        name: str,
+        attributes: dict[str, Any],
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.error: str | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span, is_root: bool) -> None: ...
+
+    def close(self) -> None: ...
+
+
+# Marks an unsampled trace, so nested spans skip it without a coin toss
+_UNSAMPLED = Span("", None, "", {})
+
+# Copied into every task created under a span, so spans started in child
+# tasks get the right parent without any explicit passing.
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    span = _current_span.get()
+    return None if span is _UNSAMPLED else span
+
+
+class Tracer:
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        sample_rate: float = 1.0,
+    ) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @contextmanager
+    def span(
+        self, name: str, root: bool = False, **attributes: Any
+    ) -> Iterator[Span | None]:
+        # Nested spans join the current trace. Without one, only entry points
+        # (root=True) may start a trace, subject to sampling; everything else
+        # is a no-op, which keeps untraced calls nearly free.
+        parent = _current_span.get()
+        if parent is _UNSAMPLED or self.exporter is None or (
+            parent is None and not root
+        ):
+            yield None
+            return
+        if parent is None and random.random() >= self.sample_rate:
+            token = _current_span.set(_UNSAMPLED)
+            try:
+                yield None
+            finally:
+                _current_span.reset(token)
+            return
+        if parent is None:
+            span = Span(secrets.token_hex(16), None, name, attributes)
+        else:
+            span = Span(parent.trace_id, parent.span_id, name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = repr(exc)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self.exporter.export(span, is_root=parent is None)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+@lru_cache(maxsize=1)
+def get_tracer() -> Tracer:
+    settings = get_settings()
+    if not settings.tracing_enabled:
+        return Tracer()
+    from app.tracing.exporter import JsonlSpanExporter
+
+    tracer = Tracer(
+        JsonlSpanExporter(settings.tracing_path, service_name=settings.app_name),
+        sample_rate=settings.tracing_sample_rate,
+    )
+    # Writes out spans still queued when the process exits
+    atexit.register(tracer.close)
+    return tracer
+
+
+def span(name: str, root: bool = False, **attributes: Any) -> Any:
+    return get_tracer().span(name, root=root, **attributes)
+
+
+def traced(name: str, root: bool = False) -> Callable[[F], F]:
+    # Wraps a function (sync or async) in a span when called inside a trace;
+    # with root=True the function is an entry point that may start one.
+    def decorator(func: F) -> F:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not root and current_span() is None:
+                    return await func(*args, **kwargs)
+                with get_tracer().span(name, root=root):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not root and current_span() is None:
+                return func(*args, **kwargs)
+            with get_tracer().span(name, root=root):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,175 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
+from app.config import get_settings
+from app.utils.metrics import get_metrics
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+
+    def try_acquire(self, now: float | None = None, tokens: float = 1) -> float:
+        # Takes tokens (at most burst); returns 0 on success, otherwise the
+        # seconds until enough tokens are available.
+        now = time.monotonic() if now is None else now
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+
+class AdmissionController:
+    # Caps in-flight requests (sized to the DB pool so admitted requests
+    # never wait on it), lets a short queue absorb bursts and sheds
+    # everything beyond that immediately. Optional per-source token buckets
+    # are checked first; clients pick source names, so only the
+    # max_sources most recently used buckets are kept.
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int = 0,
+        queue_timeout_seconds: float = 0.5,
+        source_rate: float = 0.0,
+        source_burst: float = 0.0,
+        source_rates: dict[str, float] | None = None,
+        max_sources: int = 10_000,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be >= 1")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._source_rate = source_rate
+        self._source_burst = source_burst
+        self._source_rates = source_rates or {}
+        self._max_sources = max_sources
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._available = max_concurrent
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._metrics = get_metrics()
+
+    @property
+    def in_flight(self) -> int:
+        return self.max_concurrent - self._available
+
+    def _bucket(self, source_name: str) -> TokenBucket | None:
+        bucket = self._buckets.get(source_name)
+        if bucket is not None:
+            self._buckets.move_to_end(source_name)
+            return bucket
+        rate = self._source_rates.get(source_name, self._source_rate)
+        if rate <= 0:
+            return None
+        bucket = TokenBucket(rate, max(self._source_burst, rate, 1.0))
+        self._buckets[source_name] = bucket
+        # An evicted source starts again with a full bucket
+        while len(self._buckets) > self._max_sources:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def _shed(self, reason: str, retry_after: float) -> AdmissionRejected:
+        self._metrics.increment("admission_shed", labels={"reason": reason})
+        return AdmissionRejected(reason, retry_after)
+
+    def _update_gauges(self) -> None:
+        self._metrics.set_gauge("admission_in_flight", self.in_flight)
+        self._metrics.set_gauge("admission_queue_depth", len(self._waiters))
+
+    async def _acquire(self) -> None:
+        if self._available > 0 and not self._waiters:
+            self._available -= 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed("overloaded", self.queue_timeout_seconds or 1.0)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._metrics.increment("admission_queued")
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            # The slot can be handed over in the same iteration the timeout
+            # fires; give it back or capacity shrinks for good
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise self._shed("queue_timeout", self.queue_timeout_seconds) from None
+        except BaseException:
+            # Cancelled after the slot was handed over: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release(self) -> None:
+        # Hand the slot straight to the oldest live waiter, if any
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._available += 1
+
+    @asynccontextmanager
+    async def admit(self, source_name: str | None = None) -> AsyncIterator[None]:
+        if source_name is not None:
+            bucket = self._bucket(source_name)
+            if bucket is not None:
+                retry_after = bucket.try_acquire()
+                if retry_after:
+                    raise self._shed("rate_limited", retry_after)
+        await self._acquire()
+        self._metrics.increment("admission_admitted")
+        self._update_gauges()
+        try:
+            yield
+        finally:
+            self._release()
+            self._update_gauges()
+
+
+def _parse_source_rates(value: str) -> dict[str, float]:
+    # "source-a=50,source-b=5"
+    rates: dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        source_name, _, rate = item.rpartition("=")
+        rates[source_name] = float(rate)
+    return rates
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+    settings = get_settings()
+    max_concurrent = settings.admission_max_concurrent or (
+        settings.db_pool_size + settings.db_max_overflow
+    )
+    return AdmissionController(
+        max_concurrent=max_concurrent,
+        max_queue=settings.admission_max_queue,
+        queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+        source_rate=settings.admission_source_rate,
+        source_burst=settings.admission_source_burst,
+        source_rates=_parse_source_rates(settings.admission_source_rates),
+        max_sources=settings.admission_max_sources,
+    )
@@ -1,34 +1,70 @@
+import asyncio
 import logging
+from functools import lru_cache
 
 import redis.asyncio as redis
 
 from app.config import get_settings
 from app.interfaces.events import CacheClient
+from app.tracing import traced
+from app.utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.utils.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_redis_client() -> redis.Redis:
+    # One connection pool per process instead of one per RedisCacheClient
+    settings = get_settings()
+    return redis.Redis(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        decode_responses=True,
+        socket_connect_timeout=settings.redis_connect_timeout_seconds,
+        socket_timeout=settings.redis_timeout_seconds,
+    )
+
+
+async def warm_up_redis(connections: int) -> None:
+    # Concurrent pings make the pool open that many connections
+    client = get_redis_client()
+    await asyncio.gather(*(client.ping() for _ in range(connections)))
+
+
+async def close_redis_client() -> None:
+    if get_redis_client.cache_info().currsize:
+        await get_redis_client().aclose()
+        get_redis_client.cache_clear()
+
+
 class RedisCacheClient(CacheClient):
-    def __init__(self) -> None:
-        settings = get_settings()
-        self._client = redis.Redis(
-            host=settings.redis_host,
-            port=settings.redis_port,
-            decode_responses=True,
-        )
+    # Best-effort cache: any Redis failure is logged and treated as a miss
+    # (get) or a skipped write (set). Behind the "redis" circuit breaker,
+    # calls return right away while Redis is known to be down.
+
+    def __init__(self, client: redis.Redis | None = None) -> None:
+        self._client = client or get_redis_client()
+        self._breaker = get_circuit_breaker("redis")
 
+    @traced("redis.get")
     async def get(self, key: str) -> str | None:
         try:
-            return await self._client.get(key)
-        except redis.ConnectionError:
-            logger.exception(f"Failed to get {key}")
-            return None
+            return await self._breaker.call(self._client.get, key)
+        except CircuitOpenError:
+            get_metrics().increment("cache_skipped", labels={"operation": "get"})
+        except (redis.RedisError, OSError):
+            logger.warning(f"Failed to get {key}", exc_info=True)
+        return None
 
+    @traced("redis.set")
     async def set(self, key: str, value: str, ttl_seconds: int | None = None) -> None:
         try:
             if ttl_seconds is not None:
-                await self._client.setex(key, ttl_seconds, value)
+                await self._breaker.call(self._client.setex, key, ttl_seconds, value)
             else:
-                await self._client.set(key, value)
-        except redis.TimeoutError:
-            logger.exception("Error writing to Redis cache")
+                await self._breaker.call(self._client.set, key, value)
+        except CircuitOpenError:
+            get_metrics().increment("cache_skipped", labels={"operation": "set"})
+        except (redis.RedisError, OSError):
+            logger.warning("Error writing to Redis cache", exc_info=True)
@@ -0,0 +1,130 @@
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.config import get_settings
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Exported as the circuit_state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit {name!r} is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    # Closed: calls go through and consecutive failures are counted. After
+    # failure_threshold of them the circuit opens and calls fail immediately
+    # with CircuitOpenError. Once reset_timeout_seconds have passed it is
+    # half-open: a single trial call decides whether it closes or opens again.
+    # Only used from the event loop, so no locking.
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        failure_exceptions: tuple[type[BaseException], ...] = (Exception,),
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.failure_exceptions = failure_exceptions
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._metrics = get_metrics()
+        self._labels = {"dependency": name}
+        self._metrics.set_gauge("circuit_state", STATE_VALUES[CLOSED], self._labels)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._retry_after() <= 0:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self.reset_timeout_seconds - time.monotonic()
+
+    def _transition(self, state: str) -> None:
+        previous, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._trial_in_flight = False
+        self._metrics.set_gauge("circuit_state", STATE_VALUES[state], self._labels)
+        self._metrics.increment(
+            "circuit_transitions", labels={**self._labels, "state": state}
+        )
+        log = logger.info if state == CLOSED else logger.warning
+        log(
+            f"Circuit {self.name!r} {previous} -> {state}",
+            extra={"dependency": self.name, "state": state},
+        )
+
+    def before_call(self) -> None:
+        # Raises CircuitOpenError unless the call may go through
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self._metrics.increment("circuit_rejected", labels=self._labels)
+        raise CircuitOpenError(self.name, max(self._retry_after(), 0.0))
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == HALF_OPEN or (
+            self._state == CLOSED and self._failures >= self.failure_threshold
+        ):
+            self._transition(OPEN)
+
+    async def call(
+        self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        self.before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except self.failure_exceptions:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Not the dependency's fault (bad input, cancellation): frees a
+            # half-open trial slot without deciding anything
+            self._trial_in_flight = False
+            raise
+        self.record_success()
+        return result
+
+
+@lru_cache(maxsize=None)
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    # One breaker per dependency per process, shared by every client of it
+    settings = get_settings()
+    return CircuitBreaker(
+        name,
+        failure_threshold=settings.circuit_failure_threshold,
+        reset_timeout_seconds=settings.circuit_reset_timeout_seconds,
+    )
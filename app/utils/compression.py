@@ -0,0 +1,195 @@
+import argparse
+import asyncio
+import json
+import logging
+import re
+import struct
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from app.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Stored layout. JSON text never starts with a NUL byte, so anything without
+# the marker is a plain UTF-8 payload (including every row written before
+# compression was introduced).
+_MARKER = b"\x00"
+_ZLIB = b"\x00Z"
+_ZLIB_DICT = b"\x00D"
+_DICT_ID = struct.Struct(">I")
+
+_FRAGMENT = re.compile(r'"[^"\\]{1,64}"\s*:\s*|"[^"\\]{1,32}"|-?\d+(?:\.\d+)?')
+
+
+class PayloadText(str):
+    # A str that remembers its source, so the column type can pick that
+    # source's trained dictionary when the value is written.
+    source_name: str | None = None
+
+    def __new__(cls, value: str, source_name: str | None = None) -> "PayloadText":
+        text = super().__new__(cls, value)
+        text.source_name = source_name
+        return text
+
+
+class PayloadCodec:
+    def __init__(
+        self,
+        threshold_bytes: int = 512,
+        level: int = 6,
+        dictionaries: dict[str, bytes] | None = None,
+    ) -> None:
+        self.threshold_bytes = threshold_bytes
+        self.level = level
+        self._by_source: dict[str, tuple[int, bytes]] = {}
+        self._by_id: dict[int, tuple[str, bytes]] = {}
+        for source_name, dictionary in (dictionaries or {}).items():
+            self.add_dictionary(source_name, dictionary)
+
+    def add_dictionary(self, source_name: str, dictionary: bytes) -> None:
+        dict_id = zlib.crc32(dictionary)
+        self._by_source[source_name] = (dict_id, dictionary)
+        self._by_id[dict_id] = (source_name, dictionary)
+
+    def encode(self, text: str, source_name: str | None = None) -> bytes:
+        raw = text.encode("utf-8")
+        if len(raw) < self.threshold_bytes:
+            return raw
+        entry = self._by_source.get(source_name) if source_name else None
+        if entry is not None:
+            dict_id, dictionary = entry
+            compressor = zlib.compressobj(self.level, zdict=dictionary)
+            encoded = (
+                _ZLIB_DICT
+                + _DICT_ID.pack(dict_id)
+                + compressor.compress(raw)
+                + compressor.flush()
+            )
+        else:
+            encoded = _ZLIB + zlib.compress(raw, self.level)
+        return encoded if len(encoded) < len(raw) else raw
+
+    def decode(self, data: bytes | memoryview | str) -> str:
+        if isinstance(data, str):
+            return data
+        data = bytes(data)
+        if not data.startswith(_MARKER):
+            return data.decode("utf-8")
+        header = data[:2]
+        if header == _ZLIB:
+            return zlib.decompress(data[2:]).decode("utf-8")
+        if header == _ZLIB_DICT:
+            (dict_id,) = _DICT_ID.unpack_from(data, 2)
+            entry = self._by_id.get(dict_id)
+            if entry is None:
+                raise ValueError(f"Unknown compression dictionary {dict_id:#010x}")
+            source_name, dictionary = entry
+            decompressor = zlib.decompressobj(zdict=dictionary)
+            body = data[2 + _DICT_ID.size :]
+            # Keeps the source, so a loaded value that is written back is
+            # compressed with the same dictionary again.
+            return PayloadText(
+                (decompressor.decompress(body) + decompressor.flush()).decode(
+                    "utf-8"
+                ),
+                source_name,
+            )
+        raise ValueError(f"Unknown payload encoding {header!r}")
+
+
+def train_dictionary(samples: list[str], size_bytes: int = 32 * 1024) -> bytes:
+    # zlib dictionaries are just preset history: frequent keys and values
+    # from real payloads, with the most common ones last (closest to the data).
+    counts: Counter[str] = Counter()
+    for sample in samples:
+        counts.update(set(_FRAGMENT.findall(sample)))
+    chosen: list[bytes] = []
+    total = 0
+    for fragment, count in counts.most_common():
+        if count < 2:
+            break
+        encoded = fragment.encode("utf-8")
+        if total + len(encoded) > size_bytes:
+            break
+        chosen.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chosen))
+
+
+@lru_cache(maxsize=1)
+def get_payload_codec() -> PayloadCodec:
+    settings = get_settings()
+    dictionaries: dict[str, bytes] = {}
+    if settings.payload_dictionary_dir:
+        for path in Path(settings.payload_dictionary_dir).glob("*.zdict"):
+            dictionaries[path.stem] = path.read_bytes()
+    return PayloadCodec(
+        threshold_bytes=settings.payload_compression_threshold,
+        level=settings.payload_compression_level,
+        dictionaries=dictionaries,
+    )
+
+
+async def train_source_dictionary(
+    source_name: str,
+    output_dir: str,
+    sample_size: int = 1000,
+    size_bytes: int = 32 * 1024,
+) -> Path:
+    from sqlalchemy import select
+
+    from app.db import AsyncSessionLocal
+    from app.models import IngestionSource, RawEvent
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(RawEvent.payload)
+            .join(IngestionSource, IngestionSource.id == RawEvent.source_id)
+            .where(IngestionSource.name == source_name)
+            .order_by(RawEvent.id.desc())
+            .limit(sample_size)
+        )
+        samples = list(result.scalars().all())
+    dictionary = train_dictionary(samples, size_bytes=size_bytes)
+    path = Path(output_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    dictionary_path = path / f"{source_name}.zdict"
+    dictionary_path.write_bytes(dictionary)
+    logger.info(
+        "Trained compression dictionary",
+        extra={
+            "source_name": source_name,
+            "samples": len(samples),
+            "bytes": len(dictionary),
+        },
+    )
+    return dictionary_path
+
+
+def main() -> None:
+    from app.config import configure_logging
+
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train_parser = subparsers.add_parser("train")
+    train_parser.add_argument("--source", required=True)
+    train_parser.add_argument("--output-dir", default=None)
+    train_parser.add_argument("--samples", type=int, default=1000)
+    train_parser.add_argument("--size", type=int, default=32 * 1024)
+    args = parser.parse_args()
+    configure_logging()
+    output_dir = args.output_dir or get_settings().payload_dictionary_dir
+    if not output_dir:
+        parser.error("--output-dir is required when PAYLOAD_DICTIONARY_DIR is unset")
+    path = asyncio.run(
+        train_source_dictionary(args.source, output_dir, args.samples, args.size)
+    )
+    print(json.dumps({"dictionary": str(path)}))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
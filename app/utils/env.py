@@ -1,9 +1,9 @@
 from pathlib import Path
 
-from dotenv import load_dotenv
-
 
 def load_dataenv(env_path: str | None = ".env") -> None:
     path = Path(env_path or ".env")
     if path.exists():
+        from dotenv import load_dotenv
+
         load_dotenv(dotenv_path=path, override=False)
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, TypeVar
+
+from app.config import get_settings
+from app.utils.metrics import get_metrics, serve_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoopLagMonitor:
+    # A task sleeps for interval_seconds in a loop and records how late it
+    # wakes up (the event-loop lag); lag percentiles over the last
+    # window_samples are exported as gauges. A watchdog thread notices when
+    # the loop has not come back for block_threshold_seconds and logs what
+    # the loop thread is running at that moment, once per stall.
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float = 0.1,
+        block_threshold_seconds: float = 0.25,
+        window_samples: int = 600,
+        publish_every: int = 10,
+    ) -> None:
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.block_threshold_seconds = block_threshold_seconds
+        self.publish_every = publish_every
+        self.stalls = 0
+        self._samples: deque[float] = deque(maxlen=window_samples)
+        self._metrics = get_metrics()
+        self._labels = {"loop": name}
+        self._heartbeat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._sampler: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def lag_percentiles(self) -> dict[int, float]:
+        ordered = sorted(self._samples)
+        return {pct: percentile(ordered, pct) for pct in PERCENTILES}
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._sampler = asyncio.create_task(
+            self._sample(), name=f"loop-monitor:{self.name}"
+        )
+        self._watchdog = threading.Thread(
+            target=self._watch, name=f"loop-watchdog:{self.name}", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+            self._sampler = None
+        if self._watchdog is not None:
+            # The watchdog may be mid-poll or writing a stall report; waiting
+            # for it off the loop keeps stop() from blocking the loop it
+            # watches.
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        self._publish()
+
+    async def _sample(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._samples.append(max(now - started - self.interval_seconds, 0.0))
+            if len(self._samples) % self.publish_every == 0:
+                self._publish()
+
+    def _publish(self) -> None:
+        if not self._samples:
+            return
+        for pct, value in self.lag_percentiles().items():
+            self._metrics.set_gauge(f"loop_lag_p{pct}_seconds", value, self._labels)
+        self._metrics.set_gauge(
+            "loop_lag_max_seconds", max(self._samples), self._labels
+        )
+
+    def _watch(self) -> None:
+        reported = None
+        poll = max(self.block_threshold_seconds / 4, 0.005)
+        while not self._stopped.wait(poll):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval_seconds
+            if blocked < self.block_threshold_seconds or reported == heartbeat:
+                continue
+            reported = heartbeat
+            self.stalls += 1
+            self._metrics.increment("loop_blocked", labels=self._labels)
+            task_name, stack = self._capture_stack()
+            logger.warning(
+                f"Event loop {self.name!r} blocked for {blocked:.3f}s "
+                f"in task {task_name!r}:\n{stack}",
+                extra={"loop": self.name, "blocked_seconds": blocked},
+            )
+
+    def _capture_stack(self) -> tuple[str | None, str]:
+        # Runs on the watchdog thread while the loop thread is stuck; the
+        # thread's frames show the blocking call, the task names the coroutine
+        frame = sys._current_frames().get(self._loop_thread_id or 0)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        return (task.get_name() if task is not None else None), stack
+
+
+@asynccontextmanager
+async def monitor_event_loop(name: str) -> AsyncIterator[LoopLagMonitor | None]:
+    settings = get_settings()
+    if not settings.loop_monitor_enabled:
+        yield None
+        return
+    monitor = LoopLagMonitor(
+        name,
+        interval_seconds=settings.loop_monitor_interval_seconds,
+        block_threshold_seconds=settings.loop_block_threshold_seconds,
+    )
+    monitor.start()
+    try:
+        yield monitor
+    finally:
+        await monitor.stop()
+
+
+async def monitored(awaitable: Awaitable[T], name: str) -> T:
+    # asyncio.run(monitored(run_queue_worker(...), "queue-worker"))
+    async with monitor_event_loop(name), serve_metrics():
+        return await awaitable
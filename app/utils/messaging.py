@@ -1,37 +1,49 @@
 import asyncio
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import pika
-import redis
 
 from app.config import get_settings
 from app.interfaces.events import MessageQueueClient
+from app.tracing import traced
+from app.utils.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from app.utils.metrics import get_metrics
 
 
 logger = logging.getLogger(__name__)
 
 
 class RabbitMQClient(MessageQueueClient):
+    # Every call goes through the "rabbitmq" circuit breaker: while the
+    # broker is down, publishes and depth reads raise CircuitOpenError at
+    # once and pulls return no messages, instead of each waiting for the
+    # connect timeout.
+
     def __init__(self) -> None:
         settings = get_settings()
         credentials = pika.PlainCredentials(
             settings.rabbitmq_user, settings.rabbitmq_password
         )
         self._parameters = pika.ConnectionParameters(
-            host=settings.redis_host,
-            port=settings.redis_port,
+            host=settings.rabbitmq_host,
+            port=settings.rabbitmq_port,
             credentials=credentials,
+            socket_timeout=settings.rabbitmq_connect_timeout_seconds,
+            stack_timeout=settings.rabbitmq_connect_timeout_seconds * 2,
+            blocked_connection_timeout=settings.rabbitmq_timeout_seconds,
+            connection_attempts=1,
         )
         self._exchange = "etlpay.events"
+        self._breaker = get_circuit_breaker("rabbitmq")
 
     async def publish(self, routing_key: str, message: dict[str, Any]) -> None:
         payload = json.dumps(message)
-        try:
-            await asyncio.to_thread(self._publish_blocking, routing_key, payload)
-        except redis.ConnectionError:
-            logger.exception("Failed to publish message")
+        await self._breaker.call(
+            asyncio.to_thread, self._publish_blocking, routing_key, payload
+        )
 
     def _publish_blocking(self, routing_key: str, payload: str) -> None:
         connection = pika.BlockingConnection(self._parameters)
@@ -46,13 +58,70 @@ class RabbitMQClient(MessageQueueClient):
         )
         connection.close()
 
-    async def _pull_batch_blocking(
+    async def publish_batch(self, messages: list[tuple[str, str]]) -> None:
+        await self._breaker.call(
+            asyncio.to_thread, self._publish_batch_blocking, messages
+        )
+
+    def _publish_batch_blocking(self, messages: list[tuple[str, str]]) -> None:
+        connection = pika.BlockingConnection(self._parameters)
+        try:
+            channel = connection.channel()
+            channel.exchange_declare(
+                exchange=self._exchange, exchange_type="topic", durable=True
+            )
+            for routing_key, body in messages:
+                channel.basic_publish(
+                    exchange=self._exchange,
+                    routing_key=routing_key,
+                    body=body,
+                )
+        finally:
+            connection.close()
+
+    async def pull_batch(self, queue: str, max_messages: int) -> list[dict[str, Any]]:
+        return [
+            message
+            for _, message in await self.pull_keyed_batch(queue, max_messages)
+        ]
+
+    @traced("queue.pull_batch")
+    async def pull_keyed_batch(
         self, queue: str, max_messages: int
-    ) -> list[dict[str, Any]]:
+    ) -> list[tuple[str | None, dict[str, Any]]]:
+        # (AMQP message_id, message) pairs; the id is None when the producer
+        # did not set one.
+        try:
+            return await self._breaker.call(
+                asyncio.to_thread, self._pull_batch_blocking, queue, max_messages
+            )
+        except CircuitOpenError:
+            # Nothing can be pulled while the broker is down; the worker
+            # idles for its interval and tries again
+            get_metrics().increment("queue_pull_skipped", labels={"queue": queue})
+            return []
+
+    async def queue_depth(self, queue: str) -> int:
+        return await self._breaker.call(
+            asyncio.to_thread, self._queue_depth_blocking, queue
+        )
+
+    def _queue_depth_blocking(self, queue: str) -> int:
+        connection = pika.BlockingConnection(self._parameters)
+        try:
+            channel = connection.channel()
+            result = channel.queue_declare(queue=queue, passive=True)
+            return result.method.message_count
+        finally:
+            connection.close()
+
+    def _pull_batch_blocking(
+        self, queue: str, max_messages: int
+    ) -> list[tuple[str | None, dict[str, Any]]]:
         connection = pika.BlockingConnection(self._parameters)
         channel = connection.channel()
         channel.queue_declare(queue=queue, durable=True)
-        messages: list[dict[str, Any]] = []
+        messages: list[tuple[str | None, dict[str, Any]]] = []
         for _ in range(max_messages):
             method, properties, body = channel.basic_get(queue=queue, auto_ack=True)
             if not method:
@@ -62,6 +131,83 @@ class RabbitMQClient(MessageQueueClient):
             except json.decoder.JSONDecodeError:
                 continue
             if isinstance(decoded, dict):
-                messages.append(decoded)
+                messages.append((properties.message_id, decoded))
         connection.close()
         return messages
+
+
+class RabbitMQPublisher(RabbitMQClient):
+    # Keeps one connection and transactional channel open across publishes.
+    # pika's BlockingConnection is not thread-safe, so every call runs on the
+    # same dedicated thread.
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="rabbitmq-publisher"
+        )
+        self._connection: Any = None
+        self._channel: Any = None
+
+    async def publish(self, routing_key: str, message: dict[str, Any]) -> None:
+        await self.publish_batch([(routing_key, json.dumps(message))])
+
+    async def publish_batch(self, messages: list[tuple[str, str]]) -> None:
+        loop = asyncio.get_running_loop()
+        await self._breaker.call(
+            loop.run_in_executor,
+            self._executor,
+            self._publish_batch_blocking,
+            messages,
+        )
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._close_blocking)
+        self._executor.shutdown(wait=False)
+
+    def _ensure_channel(self) -> Any:
+        if self._channel is not None and self._channel.is_open:
+            return self._channel
+        self._close_blocking()
+        self._connection = pika.BlockingConnection(self._parameters)
+        channel = self._connection.channel()
+        channel.exchange_declare(
+            exchange=self._exchange, exchange_type="topic", durable=True
+        )
+        # A transaction gives the same guarantee as publisher confirms with one
+        # round trip per batch; a confirm-mode BlockingChannel waits for the
+        # broker after every single basic_publish.
+        channel.tx_select()
+        self._channel = channel
+        return channel
+
+    def _publish_batch_blocking(self, messages: list[tuple[str, str]]) -> None:
+        channel = self._ensure_channel()
+        properties = pika.BasicProperties(
+            content_type="application/json",
+            delivery_mode=pika.DeliveryMode.Persistent,
+        )
+        try:
+            for routing_key, body in messages:
+                channel.basic_publish(
+                    exchange=self._exchange,
+                    routing_key=routing_key,
+                    body=body,
+                    properties=properties,
+                )
+            # Returns once the broker has accepted the whole batch. On failure
+            # nothing is committed; closing the channel discards the batch and
+            # the relay publishes it again.
+            channel.tx_commit()
+        except Exception:
+            self._close_blocking()
+            raise
+
+    def _close_blocking(self) -> None:
+        connection, self._connection, self._channel = self._connection, None, None
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning("Failed to close RabbitMQ connection", exc_info=True)
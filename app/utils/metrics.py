@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _metric_key(name: str, labels: dict[str, Any] | None) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+
+    def increment(
+        self,
+        name: str,
+        amount: float = 1,
+        labels: dict[str, Any] | None = None,
+    ) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(
+        self,
+        name: str,
+        value: float,
+        labels: dict[str, Any] | None = None,
+    ) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+
+@lru_cache(maxsize=1)
+def get_metrics() -> MetricsRegistry:
+    # Process-wide registry shared by the API, gRPC server and workers
+    return MetricsRegistry()
+
+
+async def _write_snapshot(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    # Answers any request with the registry snapshot, the same JSON as
+    # GET /api/metrics, and closes the connection.
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = json.dumps(get_metrics().snapshot()).encode("utf-8")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/json\r\n"
+            b"Content-Length: %d\r\n"
+            b"Connection: close\r\n\r\n" % len(body)
+            + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(host: str, port: int) -> asyncio.Server:
+    return await asyncio.start_server(_write_snapshot, host, port)
+
+
+@asynccontextmanager
+async def serve_metrics() -> AsyncIterator[None]:
+    # Worker processes have their own registry; with WORKER_METRICS_PORT set
+    # it is served over HTTP for as long as the worker runs.
+    settings = get_settings()
+    if not settings.worker_metrics_port:
+        yield
+        return
+    try:
+        server = await start_metrics_server(
+            settings.worker_metrics_host, settings.worker_metrics_port
+        )
+    except OSError:
+        logger.warning(
+            "Worker metrics server failed to start",
+            extra={"port": settings.worker_metrics_port},
+            exc_info=True,
+        )
+        yield
+        return
+    try:
+        yield
+    finally:
+        server.close()
+        await server.wait_closed()
@@ -4,16 +4,18 @@ import time
 from pathlib import Path
 from typing import Any
 
-
-import kagglehub
-
-from app.connectors import CsvFileIngestionConnector, JsonFileIngestionConnector
+from app.connectors import iter_path_batches, shutdown_parser_pools
 from app.db import AsyncSessionLocal
 from app.repositories import SqlAlchemyEventRepository
+from app.services.rules import get_rule_registry
+from app.services.transforms import get_transform_registry, shutdown_transform_pool
 from app.sinks import PostgresSink, RedisSink
 
 
 def download_global_economic_dataset():
+    # Deferred: kagglehub is only needed when actually downloading
+    import kagglehub
+
     path = kagglehub.dataset_download(
         "abidhussai512/global-economic-indicators-dataset"
     )
@@ -22,7 +24,11 @@ def download_global_economic_dataset():
 
 async def validate_dataset_path(dataset_path: str, source_name: str) -> dict[str, Any]:
     base = Path(dataset_path)
-    files = list[Path](base.rglob("*.csv")) + list[Path](base.rglob("*.json"))
+    files = (
+        list[Path](base.rglob("*.csv"))
+        + list[Path](base.rglob("*.json"))
+        + list[Path](base.rglob("*.jsonl"))
+    )
     metrics: dict[str, Any] = {
         "dataset_path": str(base),
         "files_total": len(files),
@@ -30,6 +36,8 @@ async def validate_dataset_path(dataset_path: str, source_name: str) -> dict[str
         "rows_read": 0,
         "rows_valid": 0,
         "rows_invalid": 0,
+        "rows_rejected_by_rule": {},
+        "rows_transform_failed": 0,
         "rows_written_postgres": 0,
         "rows_written_redis": 0,
         "read_errors": 0,
@@ -42,46 +50,50 @@ async def validate_dataset_path(dataset_path: str, source_name: str) -> dict[str
         repository = SqlAlchemyEventRepository(session=session)
         pg_sink = PostgresSink(repository)
         redis_sink = RedisSink()
+        rule_set = get_rule_registry().get(source_name)
+        transforms = get_transform_registry()
+        by_rule: dict[str, int] = metrics["rows_rejected_by_rule"]
         for path in files:
             try:
-                connector: Any
-                if path.suffix.lower() == ".csv":
-                    connector = CsvFileIngestionConnector(str(path))
-                else:
-                    connector = JsonFileIngestionConnector(str(path))
-                batch = await connector.fetch_batch()
+                async for batch in iter_path_batches(str(path)):
+                    metrics["rows_read"] += len(batch)
+                    rows = [row for row in batch if isinstance(row, dict) and row]
+                    if rule_set is not None:
+                        rows, rejected = rule_set.validate_batch(rows)
+                        for rule, count in rule_set.count_rejects(rejected).items():
+                            by_rule[rule] = by_rule.get(rule, 0) + count
+                    metrics["rows_invalid"] += len(batch) - len(rows)
+                    metrics["rows_valid"] += len(rows)
+                    results, failures = await transforms.transform_batch(source_name, rows)
+                    metrics["rows_transform_failed"] += len(failures)
+                    for row, result in zip(rows, results):
+                        if result is None:
+                            continue
+                        try:
+                            raw_event = await repository.ingest_event(
+                                source_name=source_name, payload=row
+                            )
+                            record = {
+                                "raw_event": raw_event,
+                                "status": "SUCCESS",
+                                "payload": result,
+                            }
+                            await pg_sink.write(record)
+                            metrics["rows_written_postgres"] += 1
+                            cache_key = f"kaggle:processed:{raw_event.id}"
+                            await redis_sink.write(
+                                {
+                                    "cache_key": cache_key,
+                                    "id": raw_event.id,
+                                    "status": "SUCCESS",
+                                },
+                            )
+                            metrics["rows_written_redis"] += 1
+                        except Exception:
+                            metrics["write_errors"] += 1
                 metrics["files_processed"] += 1
             except Exception:
                 metrics["read_errors"] += 1
-                continue
-            for row in batch:
-                metrics["rows_read"] += 1
-                if not isinstance(row, dict) or not row:
-                    metrics["rows_invalid"] += 1
-                    continue
-                metrics["rows_valid"] += 1
-                try:
-                    raw_event = await repository.ingest_event(
-                        source_name=source_name, payload=row
-                    )
-                    record = {
-                        "raw_event": raw_event,
-                        "status": "SUCCESS",
-                        "payload": row,
-                    }
-                    await pg_sink.write(record)
-                    metrics["rows_written_postgres"] += 1
-                    cache_key = f"kaggle:processed:{raw_event.id}"
-                    await redis_sink.write(
-                        {
-                            "cache_key": cache_key,
-                            "id": raw_event.id,
-                            "status": "SUCCESS",
-                        },
-                    )
-                    metrics["rows_written_redis"] += 1
-                except Exception:
-                    metrics["write_errors"] += 1
         await session.commit()
     metrics["end_time"] = time.time()
     metrics["duration_seconds"] = metrics["end_time"] - metrics["start_time"]
@@ -103,6 +115,11 @@ def write_validation_report(report_dir: str, metrics: dict[str, Any]) -> Path:
         f"- Rows read: {metrics['rows_read']}",
         f"- Rows valid: {metrics['rows_valid']}",
         f"- Rows invalid: {metrics['rows_invalid']}",
+        *(
+            f"  - Rejected by `{rule}`: {count}"
+            for rule, count in sorted(metrics["rows_rejected_by_rule"].items())
+        ),
+        f"- Rows failed transformation: {metrics['rows_transform_failed']}",
         f"- Rows written Postgres: {metrics['rows_written_postgres']}",
         f"- Rows written Redis: {metrics['rows_written_redis']}",
         f"- Read errors: {metrics['read_errors']}",
@@ -118,7 +135,11 @@ async def run_global_econ_validation(
     report_dir: str = "reports",
 ) -> dict[str, Any]:
     dataset_path = download_global_economic_dataset()
-    metrics = await validate_dataset_path(dataset_path, source_name)
+    try:
+        metrics = await validate_dataset_path(dataset_path, source_name)
+    finally:
+        await shutdown_parser_pools()
+        await shutdown_transform_pool()
     write_validation_report(report_dir, metrics)
     return metrics
 
@@ -1,2 +1,15 @@
-from .file_worker import run_file_worker as run_file_worker
-from .queue_worker import run_queue_worker as run_queue_worker
+from typing import Any
+
+# Resolved lazily so `python -m app.workers.<worker>` only imports that worker
+_LAZY = {
+    "run_file_worker": ".file_worker",
+    "run_queue_worker": ".queue_worker",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        from importlib import import_module
+
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any
+
+from app.config import configure_logging, get_settings
+from app.db import AsyncSessionLocal
+from app.repositories import SqlAlchemyEventRepository
+from app.services.transforms import get_transform_registry
+from app.utils.admission import TokenBucket
+from app.utils.compression import PayloadText
+from app.utils.loop_monitor import monitored
+from app.utils.metrics import get_metrics
+from app.workers.common import run_then_shut_down
+
+
+logger = logging.getLogger(__name__)
+
+
+def split_id_range(
+    first_id: int, last_id: int, range_size: int
+) -> list[tuple[int, int]]:
+    # [first_id, last_id] as half-open [start, end) ranges of range_size ids
+    return [
+        (start, min(start + range_size, last_id + 1))
+        for start in range(first_id, last_id + 1, range_size)
+    ]
+
+
+class RowRateLimiter:
+    # Caps rows/second across all backfill workers; 0 means unlimited
+    def __init__(self, rows_per_second: float, burst: int) -> None:
+        self._bucket = (
+            TokenBucket(rows_per_second, max(rows_per_second, burst))
+            if rows_per_second > 0
+            else None
+        )
+
+    async def acquire(self, rows: int) -> None:
+        if self._bucket is None or not rows:
+            return
+        while (delay := self._bucket.try_acquire(tokens=rows)) > 0:
+            await asyncio.sleep(delay)
+
+
+def _rewrite_rows(
+    rows: list[tuple[int, str, str, int | None]],
+    results: list[Any],
+    errors: dict[int, str],
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    # Same storage rules as SqlAlchemyEventRepository.mark_processed: the
+    # result is only stored when it differs from the raw payload.
+    updates: list[dict[str, Any]] = []
+    inserts: list[dict[str, Any]] = []
+    processed_at = datetime.utcnow()
+    for index, (raw_event_id, payload, source_name, record_id) in enumerate(rows):
+        if index in errors:
+            continue
+        encoded = json.dumps(results[index])
+        result_is_raw = encoded == payload
+        values = {
+            "status": "SUCCESS",
+            "stored_result_payload": (
+                None if result_is_raw else PayloadText(encoded, source_name)
+            ),
+            "result_is_raw": result_is_raw,
+            "processed_at": processed_at,
+        }
+        if record_id is None:
+            inserts.append({"raw_event_id": raw_event_id, **values})
+        else:
+            updates.append({"id": record_id, **values})
+    return updates, inserts
+
+
+async def backfill_range(
+    range_id: int,
+    last_id: int,
+    end_id: int,
+    chunk_size: int,
+    limiter: RowRateLimiter,
+    source_name: str | None = None,
+) -> dict[str, int]:
+    # Reprocesses one id range chunk by chunk. Each chunk is one short
+    # transaction that rewrites the results and moves the checkpoint, so a
+    # live database never sees long-held locks and a rerun resumes at the
+    # last committed chunk.
+    metrics = {"rows": 0, "rejected": 0}
+    registry = get_transform_registry()
+    async with AsyncSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        while True:
+            rows = await repository.scan_raw_events(
+                last_id, end_id, chunk_size, source_name=source_name
+            )
+            # A short chunk ends the range
+            completed = len(rows) < chunk_size
+            await limiter.acquire(len(rows))
+            results, errors = await registry.transform_indexed(
+                [(source, json.loads(payload)) for _, payload, source, _ in rows]
+            )
+            updates, inserts = _rewrite_rows(rows, results, errors)
+            await repository.rewrite_processed_records(updates, inserts)
+            if rows:
+                last_id = rows[-1][0]
+            await repository.checkpoint_backfill_range(
+                range_id, last_id, len(rows) - len(errors), completed
+            )
+            await session.commit()
+            metrics["rows"] += len(rows) - len(errors)
+            metrics["rejected"] += len(errors)
+            get_metrics().increment("backfill_rows", len(rows) - len(errors))
+            if errors:
+                # Existing results are kept for records the transform rejects
+                get_metrics().increment("backfill_rejected", len(errors))
+                logger.warning(
+                    "Backfill kept results the transform rejected",
+                    extra={"range_id": range_id, "rejected": len(errors)},
+                )
+            if completed:
+                return metrics
+
+
+async def run_backfill(
+    job: str,
+    workers: int = 4,
+    range_size: int = 10_000,
+    chunk_size: int = 500,
+    max_rows_per_second: float = 0.0,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    source_name: str | None = None,
+) -> dict[str, int]:
+    # Reprocesses processed_records from raw_events with the current
+    # transforms. The first run of a job splits the id space into ranges and
+    # stores them; later runs of the same job only finish what is left.
+    async with AsyncSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        ranges = await repository.list_backfill_ranges(job)
+        if not ranges:
+            bounds = await repository.raw_event_id_bounds(since=since, until=until)
+            if bounds is None:
+                return {"ranges": 0, "rows": 0, "rejected": 0, "failed": 0}
+            await repository.create_backfill_ranges(
+                job, split_id_range(*bounds, range_size)
+            )
+            await session.commit()
+            ranges = await repository.list_backfill_ranges(job)
+        pending = [
+            (item.id, item.last_id, item.end_id)
+            for item in ranges
+            if item.completed_at is None
+        ]
+
+    queue: asyncio.Queue[tuple[int, int, int]] = asyncio.Queue()
+    for item in pending:
+        queue.put_nowait(item)
+    limiter = RowRateLimiter(max_rows_per_second, burst=chunk_size)
+    totals = {"ranges": 0, "rows": 0, "rejected": 0, "failed": 0}
+    started = time.perf_counter()
+
+    async def worker() -> None:
+        while not queue.empty():
+            range_id, last_id, end_id = queue.get_nowait()
+            try:
+                metrics = await backfill_range(
+                    range_id, last_id, end_id, chunk_size, limiter, source_name
+                )
+            except Exception:
+                # The checkpoint keeps what was done; rerun the job to retry
+                totals["failed"] += 1
+                logger.exception(
+                    "Backfill range failed",
+                    extra={"job": job, "range_id": range_id},
+                )
+                continue
+            totals["ranges"] += 1
+            totals["rows"] += metrics["rows"]
+            totals["rejected"] += metrics["rejected"]
+
+    await asyncio.gather(*(worker() for _ in range(max(workers, 1))))
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Backfill finished",
+        extra={
+            "job": job,
+            **totals,
+            "rows_per_second": round(totals["rows"] / elapsed, 1) if elapsed else 0,
+        },
+    )
+    return totals
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--job", required=True, help="rerun a job to resume it")
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--source", default=None)
+    parser.add_argument("--workers", type=int, default=settings.backfill_workers)
+    parser.add_argument(
+        "--range-size", type=int, default=settings.backfill_range_size
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=settings.backfill_chunk_size
+    )
+    parser.add_argument(
+        "--max-rate", type=float, default=settings.backfill_max_rows_per_second
+    )
+    args = parser.parse_args()
+    configure_logging()
+    totals = asyncio.run(
+        monitored(
+            run_then_shut_down(
+                run_backfill(
+                    args.job,
+                    workers=args.workers,
+                    range_size=args.range_size,
+                    chunk_size=args.chunk_size,
+                    max_rows_per_second=args.max_rate,
+                    since=args.since,
+                    until=args.until,
+                    source_name=args.source,
+                )
+            ),
+            "backfill",
+        )
+    )
+    print(json.dumps(totals))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
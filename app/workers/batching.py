@@ -0,0 +1,87 @@
+import logging
+
+from app.utils.metrics import get_metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveBatchController:
+    # Grows the batch while full batches commit comfortably under the target
+    # latency, shrinks it when latency overshoots or a batch fails, and holds
+    # when the source did not fill the last batch.
+
+    def __init__(
+        self,
+        name: str,
+        initial_size: int = 10,
+        min_size: int = 1,
+        max_size: int = 1000,
+        target_latency_seconds: float = 0.5,
+        grow_factor: float = 1.5,
+        shrink_factor: float = 0.5,
+        headroom: float = 0.8,
+    ) -> None:
+        if not 1 <= min_size <= max_size:
+            raise ValueError("batch sizes must satisfy 1 <= min_size <= max_size")
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency_seconds = target_latency_seconds
+        self.grow_factor = grow_factor
+        self.shrink_factor = shrink_factor
+        self.headroom = headroom
+        self.batch_size = min(max(initial_size, min_size), max_size)
+        self.last_batch_full = False
+        self._metrics = get_metrics()
+        self._metrics.set_gauge("worker_batch_size", self.batch_size, {"worker": name})
+
+    @property
+    def should_sleep(self) -> bool:
+        # A full batch means more work is probably waiting
+        return not self.last_batch_full
+
+    def record(
+        self,
+        requested: int,
+        received: int,
+        latency_seconds: float,
+        failed: bool = False,
+    ) -> str:
+        self.last_batch_full = not failed and received >= requested > 0
+        previous = self.batch_size
+        if failed:
+            decision = "shrink_error"
+            self.batch_size = max(self.min_size, int(previous * self.shrink_factor))
+        elif latency_seconds > self.target_latency_seconds:
+            decision = "shrink_latency"
+            self.batch_size = max(self.min_size, int(previous * self.shrink_factor))
+        elif (
+            self.last_batch_full
+            and latency_seconds < self.target_latency_seconds * self.headroom
+        ):
+            decision = "grow"
+            self.batch_size = min(
+                self.max_size, max(previous + 1, int(previous * self.grow_factor))
+            )
+        else:
+            decision = "hold"
+
+        labels = {"worker": self.name}
+        self._metrics.set_gauge("worker_batch_size", self.batch_size, labels)
+        self._metrics.set_gauge("worker_batch_latency_seconds", latency_seconds, labels)
+        self._metrics.increment(
+            "worker_batch_decisions", labels={"worker": self.name, "decision": decision}
+        )
+        if self.batch_size != previous:
+            logger.info(
+                "Adjusted worker batch size",
+                extra={
+                    "worker": self.name,
+                    "decision": decision,
+                    "from": previous,
+                    "to": self.batch_size,
+                    "latency_seconds": latency_seconds,
+                },
+            )
+        return decision
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from typing import Any, Awaitable
+
+from app.connectors import shutdown_parser_pools
+from app.db import AsyncSessionLocal
+from app.repositories import SqlAlchemyEventRepository
+from app.services import DuplicateEventError, get_aggregator
+from app.services import etl as etl_services
+from app.services.rules import get_rule_registry
+from app.services.transforms import get_transform_registry, shutdown_transform_pool
+from app.sinks import PostgresSink, RedisSink
+from app.tracing import span, traced
+
+
+logger = logging.getLogger(__name__)
+
+
+async def sleep_until_stopped(stop_event: asyncio.Event | None, seconds: float) -> bool:
+    # Sleep for the given interval, waking early when a stop is requested.
+    # Returns True when the worker should stop.
+    if stop_event is None:
+        await asyncio.sleep(seconds)
+        return False
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        return False
+    return True
+
+
+async def run_then_shut_down(worker: Awaitable[Any]) -> Any:
+    # Stats are only flushed when a flush is due and the pools outlive single
+    # batches, so both are settled once the worker returns: the last window
+    # is written and no pool process outlives the worker.
+    try:
+        return await worker
+    finally:
+        aggregator = get_aggregator()
+        if aggregator is not None:
+            await aggregator.flush(AsyncSessionLocal)
+        await shutdown_parser_pools()
+        await shutdown_transform_pool()
+
+
+async def ingest_payloads(
+    payloads: list[dict[str, Any]],
+    source_name: str,
+    origin: str,
+    cache_prefix: str,
+) -> tuple[int, int]:
+    return await ingest_records(
+        [(source_name, payload) for payload in payloads],
+        origin=origin,
+        cache_prefix=cache_prefix,
+    )
+
+
+async def dead_letter_records(
+    records: list[tuple[str, dict[str, Any]]],
+    error: str,
+    origin: str,
+) -> None:
+    # Parks (source_name, payload) records as dead letters in one transaction
+    async with AsyncSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        for source_name, payload in records:
+            await repository.record_dead_letter(
+                source_name=source_name,
+                payload=payload,
+                error=error,
+                origin=origin,
+            )
+        await session.commit()
+
+
+@traced("worker.ingest_records", root=True)
+async def ingest_records(
+    records: list[tuple[str, dict[str, Any]]],
+    origin: str,
+    cache_prefix: str,
+    idempotency_keys: dict[int, str] | None = None,
+) -> tuple[int, int]:
+    # Writes (source_name, payload) records in one transaction, isolating every
+    # record in its own savepoint: a record that fails is rolled back on its
+    # own and stored as a dead letter, and the rest of the batch still commits.
+    # Records that break a source's validation rules or fail its transform
+    # are dead-lettered without being ingested; the rest are stored with the
+    # transformed payload as their result. idempotency_keys maps id(payload)
+    # to the key its event is stored under; a record whose key is already
+    # stored is skipped like a duplicate. Returns (written, dead_lettered).
+    written = 0
+    records, invalid = get_rule_registry().validate_records(records)
+    transformed, failed = await get_transform_registry().transform_records(records)
+    rejected = [
+        (source_name, payload, f"Validation rule failed: {rule}")
+        for source_name, payload, rule in invalid
+    ] + [
+        (source_name, payload, f"Transformation failed: {error}")
+        for source_name, payload, error in failed
+    ]
+    async with AsyncSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        pg_sink = PostgresSink(repository)
+        redis_sink = RedisSink()
+        for source_name, payload, error in rejected:
+            await repository.record_dead_letter(
+                source_name=source_name,
+                payload=payload,
+                error=error,
+                origin=origin,
+            )
+        dead_lettered = len(rejected)
+        for source_name, payload, result in transformed:
+            try:
+                async with repository.savepoint():
+                    raw_event = await etl_services.ingest_event(
+                        repository=repository,
+                        source_name=source_name,
+                        payload=payload,
+                        idempotency_key=(
+                            idempotency_keys.get(id(payload))
+                            if idempotency_keys
+                            else None
+                        ),
+                    )
+                    await pg_sink.write(
+                        {
+                            "raw_event": raw_event,
+                            "status": "SUCCESS",
+                            "payload": result,
+                        },
+                    )
+            except DuplicateEventError:
+                continue
+            except Exception as exc:
+                logger.warning(
+                    "Record failed, sending to dead letters",
+                    extra={"source_name": source_name, "origin": origin},
+                    exc_info=True,
+                )
+                await repository.record_dead_letter(
+                    source_name=source_name,
+                    payload=payload,
+                    error=repr(exc),
+                    origin=origin,
+                )
+                dead_lettered += 1
+                continue
+            written += 1
+            await redis_sink.write(
+                {
+                    "cache_key": f"{cache_prefix}:{raw_event.id}",
+                    "id": raw_event.id,
+                    "status": "SUCCESS",
+                },
+            )
+        with span("db.commit"):
+            await session.commit()
+    aggregator = get_aggregator()
+    if aggregator is not None and aggregator.flush_due():
+        await aggregator.flush(AsyncSessionLocal)
+    return written, dead_lettered
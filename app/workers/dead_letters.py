@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+
+from app.config import configure_logging
+from app.db import AsyncSessionLocal
+from app.repositories import SqlAlchemyEventRepository
+from app.services import DuplicateEventError
+from app.services import etl as etl_services
+
+
+logger = logging.getLogger(__name__)
+
+
+async def replay_dead_letters(
+    source_name: str | None = None,
+    limit: int = 100,
+) -> dict[str, int]:
+    metrics = {"replayed": 0, "failed": 0}
+    async with AsyncSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        dead_letters = await repository.list_pending_dead_letters(
+            limit=limit, source_name=source_name
+        )
+        for dead_letter in dead_letters:
+            try:
+                async with repository.savepoint():
+                    payload = json.loads(dead_letter.payload)
+                    await etl_services.ingest_and_mark_success(
+                        repository=repository,
+                        source_name=dead_letter.source_name,
+                        payload=payload,
+                    )
+            except DuplicateEventError:
+                # Already stored by an earlier replay or a producer re-send
+                pass
+            except Exception as exc:
+                dead_letter.attempts += 1
+                dead_letter.error = repr(exc)
+                metrics["failed"] += 1
+                logger.warning(
+                    "Dead letter replay failed",
+                    extra={"dead_letter_id": dead_letter.id},
+                    exc_info=True,
+                )
+                continue
+            dead_letter.replayed_at = datetime.now(timezone.utc)
+            metrics["replayed"] += 1
+        await session.commit()
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    replay_parser = subparsers.add_parser("replay")
+    replay_parser.add_argument("--source", default=None)
+    replay_parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    configure_logging()
+    metrics = asyncio.run(replay_dead_letters(args.source, args.limit))
+    logger.info("Dead letter replay finished", extra=metrics)
+    print(json.dumps(metrics))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,48 +1,69 @@
 import argparse
 import asyncio
+import fnmatch
 import logging
+import shutil
+import time
 from pathlib import Path
+from typing import Any, Callable, Iterable
 
-from app.connectors import JsonFileIngestionConnector
-from app.db import AsyncSessionLocal
-from app.repositories import SqlAlchemyEventRepository
-from app.services import etl as etl_services
-from app.sinks import PostgresSink, RedisSink
+from app.connectors import iter_path_batches
+from app.utils.loop_monitor import monitored
+from app.workers.batching import AdaptiveBatchController
+from app.workers.common import (
+    ingest_payloads,
+    run_then_shut_down,
+    sleep_until_stopped,
+)
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_WATCH_PATTERNS = ("*.json", "*.jsonl", "*.ndjson", "*.csv")
+DONE_SUFFIX = ".done"
+FAILED_SUFFIX = ".failed"
 
-async def process_file_once(path: str, source_name: str) -> None:
-    connector = JsonFileIngestionConnector(path)
-    batch = await connector.fetch_batch()
-    if not batch:
-        return
-    async with AsyncSessionLocal() as session:
-        repository = SqlAlchemyEventRepository(session=session)
-        pg_sink = PostgresSink(repository)
-        redis_sink = RedisSink()
-        for payload in batch:
-            raw_event = await etl_services.ingest_event(
-                repository=repository,
-                source_name=source_name,
-                payload=payload,
-            )
-            record = {
-                "raw_event": raw_event,
-                "status": "SUCCESS",
-                "payload": payload,
-            }
-            await pg_sink.write(record)
-            cache_key = f"worker:processed:{raw_event.id}"
-            await redis_sink.write(
-                {
-                    "cache_key": cache_key,
-                    "id": raw_event.id,
-                    "status": "SUCCESS",
-                },
-            )
-        await session.commit()
+
+async def write_file_batch(
+    batch: list[dict[str, Any]], source_name: str, path: str
+) -> None:
+    await ingest_payloads(
+        batch,
+        source_name=source_name,
+        origin=f"file:{path}",
+        cache_prefix="worker:processed",
+    )
+
+
+async def process_file_once(
+    path: str,
+    source_name: str,
+    controller: AdaptiveBatchController | None = None,
+) -> int:
+    processed = 0
+    async for batch in iter_path_batches(path):
+        if controller is None:
+            await write_file_batch(batch, source_name, path)
+            processed += len(batch)
+            continue
+        # Commit the file in controller-sized chunks so each commit stays near
+        # the latency target regardless of how large the file is.
+        offset = 0
+        while offset < len(batch):
+            batch_size = controller.batch_size
+            chunk = batch[offset : offset + batch_size]
+            started = time.perf_counter()
+            try:
+                await write_file_batch(chunk, source_name, path)
+            except Exception:
+                controller.record(
+                    batch_size, len(chunk), time.perf_counter() - started, failed=True
+                )
+                raise
+            controller.record(batch_size, len(chunk), time.perf_counter() - started)
+            offset += len(chunk)
+        processed += len(batch)
+    return processed
 
 
 async def run_file_worker(
@@ -51,13 +72,20 @@ async def run_file_worker(
     interval_seconds: int,
     max_retries: int = 3,
     backoff_seconds: float = 1.0,
+    on_batch: Callable[[int], None] | None = None,
+    stop_event: asyncio.Event | None = None,
+    controller: AdaptiveBatchController | None = None,
 ) -> None:
     file_path = Path(path)
     failures = 0
-    while True:
+    while stop_event is None or not stop_event.is_set():
         try:
-            await process_file_once(str(file_path), source_name)
+            processed = await process_file_once(
+                str(file_path), source_name, controller=controller
+            )
             failures = 0
+            if on_batch is not None:
+                on_batch(processed)
         except Exception:
             failures += 1
             logger.exception(
@@ -73,16 +101,180 @@ async def run_file_worker(
             delay = backoff_seconds * failures
             await asyncio.sleep(delay)
             continue
-        await asyncio.sleep(interval_seconds)
+        await sleep_until_stopped(stop_event, interval_seconds)
+
+
+def _matches(name: str, patterns: Iterable[str]) -> bool:
+    # Dot-files are in-progress writes (write to ".name", then rename)
+    if name.startswith(".") or name.endswith((DONE_SUFFIX, FAILED_SUFFIX)):
+        return False
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _finish(path: Path, suffix: str, target_dir: str | None) -> None:
+    # Moves a handled file out of the watched set so it is never re-read
+    try:
+        if target_dir:
+            destination = Path(target_dir) / path.name
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            if destination.exists():
+                destination = destination.with_name(
+                    f"{destination.name}.{time.time_ns()}"
+                )
+            shutil.move(str(path), str(destination))
+        else:
+            path.rename(path.with_name(path.name + suffix))
+    except OSError:
+        logger.exception("Failed to move handled file", extra={"path": str(path)})
+
+
+async def _wait_until_settled(path: Path, settle_seconds: float) -> bool:
+    # Returns once size and mtime stop changing, i.e. the writer is done;
+    # False if the file disappeared.
+    try:
+        previous = path.stat()
+        while True:
+            await asyncio.sleep(settle_seconds)
+            current = path.stat()
+            if (current.st_size, current.st_mtime_ns) == (
+                previous.st_size,
+                previous.st_mtime_ns,
+            ):
+                return True
+            previous = current
+    except FileNotFoundError:
+        return False
+
+
+async def run_directory_worker(
+    directory: str,
+    source_name: str,
+    patterns: Iterable[str] = DEFAULT_WATCH_PATTERNS,
+    max_concurrency: int = 4,
+    done_dir: str | None = None,
+    failed_dir: str | None = None,
+    settle_seconds: float = 0.05,
+    step_ms: int = 50,
+    on_batch: Callable[[int], None] | None = None,
+    stop_event: asyncio.Event | None = None,
+    controller: AdaptiveBatchController | None = None,
+) -> None:
+    # Event-driven (inotify via watchfiles) alternative to polling one path:
+    # every matching file that appears in the directory is ingested once,
+    # then renamed to *.done (or *.failed), or moved to done_dir/failed_dir.
+    from watchfiles import Change, awatch
+
+    root = Path(directory)
+    patterns = tuple(patterns)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    in_flight: set[Path] = set()
+    tasks: set[asyncio.Task[None]] = set()
+
+    async def handle(path: Path) -> None:
+        async with semaphore:
+            try:
+                if not await _wait_until_settled(path, settle_seconds):
+                    return
+                processed = await process_file_once(
+                    str(path), source_name, controller=controller
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to ingest watched file",
+                    extra={"source_name": source_name, "path": str(path)},
+                )
+                _finish(path, FAILED_SUFFIX, failed_dir)
+            else:
+                _finish(path, DONE_SUFFIX, done_dir)
+                if on_batch is not None:
+                    on_batch(processed)
+            finally:
+                in_flight.discard(path)
+
+    def schedule(path: Path) -> None:
+        if path in in_flight or not path.is_file():
+            return
+        in_flight.add(path)
+        task = asyncio.create_task(handle(path))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    def watch_filter(change: "Change", path: str) -> bool:
+        return change != Change.deleted and _matches(Path(path).name, patterns)
+
+    root.mkdir(parents=True, exist_ok=True)
+    # Files that arrived while the worker was not running
+    for path in sorted(root.iterdir()):
+        if _matches(path.name, patterns):
+            schedule(path)
+    async for changes in awatch(
+        root,
+        watch_filter=watch_filter,
+        stop_event=stop_event,
+        step=step_ms,
+        recursive=False,
+    ):
+        for _, changed in changes:
+            schedule(Path(changed))
+    # Let files already picked up finish before returning
+    if tasks:
+        await asyncio.gather(*tasks)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--path", required=True)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--path")
+    target.add_argument("--watch-dir")
     parser.add_argument("--source", required=True)
     parser.add_argument("--interval", type=int, default=10)
+    parser.add_argument("--pattern", action="append")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--done-dir", default=None)
+    parser.add_argument("--failed-dir", default=None)
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--initial-batch", type=int, default=100)
+    parser.add_argument("--target-latency-ms", type=float, default=500.0)
+    parser.add_argument("--min-batch", type=int, default=1)
+    parser.add_argument("--max-batch", type=int, default=5000)
     args = parser.parse_args()
-    asyncio.run(run_file_worker(args.path, args.source, args.interval))
+    controller = None
+    if args.adaptive:
+        controller = AdaptiveBatchController(
+            name=f"file:{args.path or args.watch_dir}",
+            initial_size=args.initial_batch,
+            min_size=args.min_batch,
+            max_size=args.max_batch,
+            target_latency_seconds=args.target_latency_ms / 1000,
+        )
+    if args.watch_dir:
+        asyncio.run(
+            monitored(
+                run_then_shut_down(
+                    run_directory_worker(
+                        args.watch_dir,
+                        args.source,
+                        patterns=args.pattern or DEFAULT_WATCH_PATTERNS,
+                        max_concurrency=args.concurrency,
+                        done_dir=args.done_dir,
+                        failed_dir=args.failed_dir,
+                        controller=controller,
+                    )
+                ),
+                "file-worker",
+            ),
+        )
+        return
+    asyncio.run(
+        monitored(
+            run_then_shut_down(
+                run_file_worker(
+                    args.path, args.source, args.interval, controller=controller
+                )
+            ),
+            "file-worker",
+        ),
+    )
 
 
 if __name__ == "__main__":  # pragma: no cover
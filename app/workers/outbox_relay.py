@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import logging
+
+from app.config import configure_logging
+from app.db import AsyncSessionLocal
+from app.interfaces.events import MessageQueueClient
+from app.repositories import SqlAlchemyEventRepository
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.loop_monitor import monitored
+from app.utils.messaging import RabbitMQPublisher
+from app.workers.common import sleep_until_stopped
+
+
+logger = logging.getLogger(__name__)
+
+
+async def relay_outbox_once(publisher: MessageQueueClient, batch_size: int = 500) -> int:
+    async with AsyncSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        messages = await repository.claim_outbox_batch(limit=batch_size)
+        if not messages:
+            return 0
+        # Rows stay locked until commit; a failed publish rolls back and the
+        # whole batch is retried (at-least-once delivery).
+        await publisher.publish_batch(
+            [(message.routing_key, message.payload) for message in messages]
+        )
+        await repository.delete_outbox_messages([message.id for message in messages])
+        await session.commit()
+        return len(messages)
+
+
+async def run_outbox_relay(
+    batch_size: int = 500,
+    interval_seconds: float = 1.0,
+    max_retries: int = 3,
+    backoff_seconds: float = 1.0,
+    stop_event: asyncio.Event | None = None,
+) -> None:
+    publisher = RabbitMQPublisher()
+    failures = 0
+    try:
+        while stop_event is None or not stop_event.is_set():
+            try:
+                relayed = await relay_outbox_once(publisher, batch_size=batch_size)
+                failures = 0
+            except CircuitOpenError as exc:
+                # The broker is known to be down: wait for the next trial
+                # without counting it as a failed attempt
+                logger.warning(
+                    "RabbitMQ circuit open, outbox relay waiting",
+                    extra={"retry_after_seconds": exc.retry_after},
+                )
+                await sleep_until_stopped(
+                    stop_event, max(exc.retry_after, interval_seconds)
+                )
+                continue
+            except Exception:
+                failures += 1
+                logger.exception(
+                    "Outbox relay iteration failed",
+                    extra={"attempt": failures},
+                )
+                if failures > max_retries:
+                    raise
+                await asyncio.sleep(backoff_seconds * failures)
+                continue
+            if relayed == batch_size:
+                # Backlog: keep draining without sleeping
+                continue
+            await sleep_until_stopped(stop_event, interval_seconds)
+    finally:
+        await publisher.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+    configure_logging()
+    asyncio.run(
+        monitored(
+            run_outbox_relay(
+                batch_size=args.batch_size, interval_seconds=args.interval
+            ),
+            "outbox-relay",
+        ),
+    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,51 +1,88 @@
 import argparse
 import asyncio
+import hashlib
 import logging
+import time
+from typing import Any, Callable
 
-from app.db import AsyncSessionLocal
-from app.repositories import SqlAlchemyEventRepository
-from app.services import etl as etl_services
-from app.sinks import PostgresSink, RedisSink
+from app.services.dedup import content_hash
+from app.services.spool import SPOOLABLE_ERRORS, get_spool
+from app.tracing import span
+from app.utils.loop_monitor import monitored
 from app.utils.messaging import RabbitMQClient
+from app.utils.metrics import get_metrics
+from app.workers.batching import AdaptiveBatchController
+from app.workers.common import (
+    ingest_records,
+    run_then_shut_down,
+    sleep_until_stopped,
+)
+from app.workers.sharding import LaneDispatcher, split_envelope
 
 
 logger = logging.getLogger(__name__)
 
 
+def message_key(
+    origin: str, source_name: str, message_id: str | None, message: dict[str, Any]
+) -> str:
+    # Fixed-length idempotency key of a pulled message: the producer's
+    # message_id scoped to the queue, or else the message content.
+    if message_id:
+        return hashlib.sha256(f"{origin}\x00{message_id}".encode("utf-8")).hexdigest()
+    return content_hash(source_name, message)
+
+
 async def process_queue_once(
     queue_name: str,
     source_name: str,
     max_messages: int = 10,
-) -> None:
-    client = RabbitMQClient()
-    messages = await client.pull_batch(queue_name, max_messages=max_messages)
-    if not messages:
-        return
-    async with AsyncSessionLocal() as session:
-        repository = SqlAlchemyEventRepository(session=session)
-        pg_sink = PostgresSink(repository)
-        redis_sink = RedisSink()
-        for payload in messages:
-            raw_event = await etl_services.ingest_event(
-                repository=repository,
-                source_name=source_name,
-                payload=payload,
-            )
-            record = {
-                "raw_event": raw_event,
-                "status": "SUCCESS",
-                "payload": payload,
-            }
-            await pg_sink.write(record)
-            cache_key = f"queue:processed:{raw_event.id}"
-            await redis_sink.write(
-                {
-                    "cache_key": cache_key,
-                    "id": raw_event.id,
-                    "status": "SUCCESS",
+) -> int:
+    with span("queue_worker.batch", root=True, queue=queue_name):
+        client = RabbitMQClient()
+        pulled = await client.pull_keyed_batch(queue_name, max_messages=max_messages)
+        if not pulled:
+            return 0
+        origin = f"queue:{queue_name}"
+        # Messages are acknowledged on pull, so a batch whose commit lands but
+        # is reported as failed is spooled and replayed. Each message is
+        # stored under a key derived from it, the producer's message_id or
+        # else its content, and the replay of a stored message is skipped.
+        messages = [message for _, message in pulled]
+        keys = [
+            message_key(origin, source_name, message_id, message)
+            for message_id, message in pulled
+        ]
+        try:
+            await ingest_records(
+                [(source_name, message) for message in messages],
+                origin=origin,
+                cache_prefix="queue:processed",
+                idempotency_keys={
+                    id(message): key for message, key in zip(messages, keys)
                 },
             )
-        await session.commit()
+        except SPOOLABLE_ERRORS:
+            # The messages are already acknowledged: keep them in the spool
+            # rather than losing them while the database is down
+            spool = get_spool()
+            if spool is None:
+                raise
+            logger.warning(
+                "Database unavailable, spooling queue batch",
+                extra={"queue_name": queue_name, "messages": len(messages)},
+                exc_info=True,
+            )
+            await spool.append_many(
+                [
+                    (source_name, message, origin, key)
+                    for message, key in zip(messages, keys)
+                ]
+            )
+            get_metrics().increment(
+                "ingest_spooled", len(messages), labels={"origin": origin}
+            )
+        return len(messages)
 
 
 async def run_queue_worker(
@@ -55,14 +92,31 @@ async def run_queue_worker(
     max_messages: int = 10,
     max_retries: int = 3,
     backoff_seconds: float = 1.0,
+    on_batch: Callable[[int], None] | None = None,
+    stop_event: asyncio.Event | None = None,
+    controller: AdaptiveBatchController | None = None,
 ) -> None:
     failures = 0
-    while True:
+    while stop_event is None or not stop_event.is_set():
+        batch_size = controller.batch_size if controller else max_messages
+        started = time.perf_counter()
         try:
-            await process_queue_once(queue_name, source_name, max_messages=max_messages)
+            processed = await process_queue_once(
+                queue_name, source_name, max_messages=batch_size
+            )
             failures = 0
+            if controller is not None:
+                controller.record(
+                    batch_size, processed, time.perf_counter() - started
+                )
+            if on_batch is not None:
+                on_batch(processed)
         except Exception:
             failures += 1
+            if controller is not None:
+                controller.record(
+                    batch_size, 0, time.perf_counter() - started, failed=True
+                )
             logger.exception(
                 "Queue worker iteration failed",
                 extra={
@@ -76,7 +130,48 @@ async def run_queue_worker(
             delay = backoff_seconds * failures
             await asyncio.sleep(delay)
             continue
-        await asyncio.sleep(interval_seconds)
+        if controller is not None and not controller.should_sleep:
+            continue
+        await sleep_until_stopped(stop_event, interval_seconds)
+
+
+async def run_sharded_queue_worker(
+    queue_name: str,
+    default_source_name: str,
+    interval_seconds: int,
+    lanes: int,
+    max_messages: int = 100,
+    lane_capacity: int = 1000,
+    stop_event: asyncio.Event | None = None,
+) -> None:
+    client = RabbitMQClient()
+    dispatcher = LaneDispatcher(
+        lanes=lanes,
+        origin=f"queue:{queue_name}",
+        cache_prefix="queue:processed",
+        lane_capacity=lane_capacity,
+        max_batch=max_messages,
+    )
+    dispatcher.start()
+    try:
+        while stop_event is None or not stop_event.is_set():
+            try:
+                messages = await client.pull_batch(
+                    queue_name, max_messages=max_messages
+                )
+            except Exception:
+                logger.exception(
+                    "Sharded queue pull failed", extra={"queue_name": queue_name}
+                )
+                await sleep_until_stopped(stop_event, interval_seconds)
+                continue
+            for message in messages:
+                source_name, payload = split_envelope(message, default_source_name)
+                await dispatcher.dispatch(source_name, payload)
+            if len(messages) < max_messages:
+                await sleep_until_stopped(stop_event, interval_seconds)
+    finally:
+        await dispatcher.stop()
 
 
 def main() -> None:
@@ -85,13 +180,56 @@ def main() -> None:
     parser.add_argument("--source", required=True)
     parser.add_argument("--interval", type=int, default=5)
     parser.add_argument("--max-messages", type=int, default=10)
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--target-latency-ms", type=float, default=500.0)
+    parser.add_argument("--min-batch", type=int, default=1)
+    parser.add_argument("--max-batch", type=int, default=1000)
+    parser.add_argument(
+        "--lanes",
+        type=int,
+        default=1,
+        help="Shard messages by their source_name into this many concurrent lanes",
+    )
     args = parser.parse_args()
+    if args.lanes > 1 and args.adaptive:
+        parser.error("--adaptive cannot be combined with --lanes")
+    if args.lanes > 1:
+        asyncio.run(
+            monitored(
+                run_then_shut_down(
+                    run_sharded_queue_worker(
+                        queue_name=args.queue,
+                        default_source_name=args.source,
+                        interval_seconds=args.interval,
+                        lanes=args.lanes,
+                        max_messages=args.max_messages,
+                    )
+                ),
+                "queue-worker",
+            ),
+        )
+        return
+    controller = None
+    if args.adaptive:
+        controller = AdaptiveBatchController(
+            name=f"queue:{args.queue}",
+            initial_size=args.max_messages,
+            min_size=args.min_batch,
+            max_size=args.max_batch,
+            target_latency_seconds=args.target_latency_ms / 1000,
+        )
     asyncio.run(
-        run_queue_worker(
-            queue_name=args.queue,
-            source_name=args.source,
-            interval_seconds=args.interval,
-            max_messages=args.max_messages,
+        monitored(
+            run_then_shut_down(
+                run_queue_worker(
+                    queue_name=args.queue,
+                    source_name=args.source,
+                    interval_seconds=args.interval,
+                    max_messages=args.max_messages,
+                    controller=controller,
+                )
+            ),
+            "queue-worker",
         ),
     )
 
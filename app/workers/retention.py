@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+
+from app.config import configure_logging, get_settings
+from app.db import AsyncSessionLocal
+from app.repositories import SqlAlchemyEventRepository
+from app.services.archive import archive_expired_events
+from app.utils.loop_monitor import monitored
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_retention(
+    retention_days: int,
+    archive_path: str,
+    batch_size: int = 1000,
+) -> dict[str, int]:
+    # Archives every event older than retention_days, one batch per
+    # transaction so deletes never hold locks for long on a live database.
+    metrics = {"archived": 0, "batches": 0}
+    if retention_days <= 0:
+        return metrics
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    while True:
+        async with AsyncSessionLocal() as session:
+            repository = SqlAlchemyEventRepository(session=session)
+            archived = await archive_expired_events(
+                repository, archive_path, cutoff, batch_size
+            )
+            await session.commit()
+        metrics["archived"] += archived
+        metrics["batches"] += 1 if archived else 0
+        if archived < batch_size:
+            break
+    logger.info(
+        "Retention finished",
+        extra={"cutoff": cutoff.isoformat(), **metrics},
+    )
+    return metrics
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=settings.retention_days)
+    parser.add_argument("--archive-path", default=settings.archive_path)
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.retention_batch_size
+    )
+    args = parser.parse_args()
+    configure_logging()
+    metrics = asyncio.run(
+        monitored(
+            run_retention(args.days, args.archive_path, args.batch_size),
+            "retention",
+        )
+    )
+    print(json.dumps(metrics))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
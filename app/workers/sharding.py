@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import zlib
+from typing import Any
+
+from app.workers.common import dead_letter_records, ingest_records
+
+
+logger = logging.getLogger(__name__)
+
+
+def split_envelope(
+    message: dict[str, Any], default_source: str
+) -> tuple[str, dict[str, Any]]:
+    # Sharded messages look like {"source_name": ..., "payload": {...}};
+    # anything else is treated as a bare payload for the default source.
+    source_name = message.get("source_name")
+    payload = message.get("payload")
+    if isinstance(source_name, str) and source_name.strip() and isinstance(payload, dict):
+        return source_name.strip(), payload
+    return default_source, message
+
+
+def lane_for_source(source_name: str, lanes: int) -> int:
+    # crc32 rather than hash(): stable across processes and restarts
+    return zlib.crc32(source_name.encode("utf-8")) % lanes
+
+
+class LaneDispatcher:
+    # Routes records to K FIFO lanes by source. Each lane writes its records
+    # strictly in arrival order with its own session, so a source keeps its
+    # ordering while unrelated sources in other lanes commit concurrently.
+
+    def __init__(
+        self,
+        lanes: int,
+        origin: str,
+        cache_prefix: str,
+        lane_capacity: int = 1000,
+        max_batch: int = 100,
+        retry_backoff_seconds: float = 1.0,
+        max_retry_backoff_seconds: float = 30.0,
+        max_retries: int = 5,
+    ) -> None:
+        if lanes < 1:
+            raise ValueError("lanes must be >= 1")
+        self.lanes = lanes
+        self._origin = origin
+        self._cache_prefix = cache_prefix
+        self._max_batch = max_batch
+        self._retry_backoff_seconds = retry_backoff_seconds
+        self._max_retry_backoff_seconds = max_retry_backoff_seconds
+        self._max_retries = max_retries
+        self._queues: list[asyncio.Queue[tuple[str, dict[str, Any]]]] = [
+            asyncio.Queue(maxsize=lane_capacity) for _ in range(lanes)
+        ]
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._run_lane(index), name=f"lane-{index}")
+            for index in range(self.lanes)
+        ]
+
+    async def dispatch(self, source_name: str, payload: dict[str, Any]) -> None:
+        # Blocks when the lane is full, which throttles the consumer
+        await self._queues[lane_for_source(source_name, self.lanes)].put(
+            (source_name, payload)
+        )
+
+    async def drain(self) -> None:
+        await asyncio.gather(*(queue.join() for queue in self._queues))
+
+    async def stop(self, timeout_seconds: float = 30.0) -> None:
+        # Lets the lanes finish what is queued, but never waits forever on a
+        # lane stuck retrying
+        try:
+            await asyncio.wait_for(self.drain(), timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Lanes did not drain before the timeout, cancelling",
+                extra={"pending": sum(queue.qsize() for queue in self._queues)},
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run_lane(self, index: int) -> None:
+        queue = self._queues[index]
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self._max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._write_batch(index, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write_batch(
+        self, index: int, batch: list[tuple[str, dict[str, Any]]]
+    ) -> None:
+        origin = f"{self._origin}#lane{index}"
+        attempt = 0
+        while True:
+            try:
+                await ingest_records(
+                    batch, origin=origin, cache_prefix=self._cache_prefix
+                )
+                return
+            except Exception as exc:
+                # Retry the same batch in place: moving on would break the
+                # per-source ordering guarantee. After max_retries the batch
+                # is parked as dead letters so the lane's sources move on.
+                attempt += 1
+                if attempt > self._max_retries:
+                    logger.exception(
+                        "Lane batch failed, sending to dead letters",
+                        extra={"lane": index, "records": len(batch)},
+                    )
+                    try:
+                        await dead_letter_records(batch, repr(exc), origin)
+                    except Exception:
+                        # The lane must keep going; the batch is lost
+                        logger.exception(
+                            "Dead-lettering lane batch failed, dropping it",
+                            extra={"lane": index, "records": len(batch)},
+                        )
+                    return
+                delay = min(
+                    self._retry_backoff_seconds * 2 ** (attempt - 1),
+                    self._max_retry_backoff_seconds,
+                )
+                logger.exception(
+                    "Lane batch failed, retrying",
+                    extra={"lane": index, "attempt": attempt, "delay": delay},
+                )
+                await asyncio.sleep(delay)
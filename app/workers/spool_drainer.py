@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import logging
+import time
+
+from app.config import configure_logging, get_settings
+from app.services.spool import EventSpool, get_spool
+from app.utils.loop_monitor import monitored
+from app.utils.metrics import get_metrics
+from app.workers.batching import AdaptiveBatchController
+from app.workers.common import (
+    ingest_records,
+    run_then_shut_down,
+    sleep_until_stopped,
+)
+
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 30.0
+
+
+async def drain_spool_once(spool: EventSpool, batch_size: int) -> int:
+    # Replays the oldest spooled events in one transaction and deletes them
+    # once it commits. On failure they are released for the next attempt.
+    # Each event is stored under its spool idempotency key, so an event
+    # whose commit already landed (API timeout, or a crash between commit and
+    # delete) is skipped whatever DEDUP_ENABLED says.
+    events = await spool.claim(batch_size)
+    if not events:
+        return 0
+    ids = [event.id for event in events]
+    try:
+        await ingest_records(
+            [(event.source_name, event.payload) for event in events],
+            origin="spool",
+            cache_prefix="spool:processed",
+            idempotency_keys={
+                id(event.payload): event.idempotency_key for event in events
+            },
+        )
+    except BaseException:
+        await spool.release(ids)
+        raise
+    await spool.delete(ids)
+    get_metrics().increment("spool_drained", len(ids))
+    return len(ids)
+
+
+async def run_spool_drainer(
+    spool: EventSpool,
+    batch_size: int = 500,
+    interval_seconds: float = 1.0,
+    stop_event: asyncio.Event | None = None,
+) -> None:
+    # Batches grow while the database keeps up and shrink when commits slow
+    # down; while it is down the drainer backs off exponentially instead of
+    # hammering it, and the events stay in the spool.
+    controller = AdaptiveBatchController(
+        name="spool",
+        initial_size=batch_size,
+        max_size=batch_size * 10,
+        target_latency_seconds=1.0,
+    )
+    failures = 0
+    while stop_event is None or not stop_event.is_set():
+        requested = controller.batch_size
+        started = time.perf_counter()
+        try:
+            drained = await drain_spool_once(spool, requested)
+        except Exception:
+            failures += 1
+            controller.record(
+                requested, 0, time.perf_counter() - started, failed=True
+            )
+            delay = min(interval_seconds * 2**failures, MAX_BACKOFF_SECONDS)
+            logger.warning(
+                "Spool drain failed, backing off",
+                extra={"attempt": failures, "delay_seconds": delay},
+                exc_info=True,
+            )
+            if await sleep_until_stopped(stop_event, delay):
+                return
+            continue
+        failures = 0
+        controller.record(requested, drained, time.perf_counter() - started)
+        if drained:
+            await spool.depth()
+        if drained == requested:
+            # Backlog: keep draining without sleeping
+            continue
+        await sleep_until_stopped(stop_event, interval_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--interval", type=float, default=None)
+    args = parser.parse_args()
+    configure_logging()
+    settings = get_settings()
+    spool = get_spool()
+    if spool is None:
+        parser.error("the spool is disabled; set SPOOL_ENABLED=true")
+    asyncio.run(
+        monitored(
+            run_then_shut_down(
+                run_spool_drainer(
+                    spool,
+                    batch_size=args.batch_size or settings.spool_drain_batch_size,
+                    interval_seconds=(
+                        args.interval or settings.spool_drain_interval_seconds
+                    ),
+                )
+            ),
+            "spool-drainer",
+        ),
+    )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
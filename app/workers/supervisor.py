@@ -0,0 +1,380 @@
+import argparse
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import time
+from typing import Any, Callable
+
+from app.config import configure_logging
+from app.utils.loop_monitor import monitor_event_loop
+from app.utils.messaging import RabbitMQClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScalingPolicy:
+    def __init__(
+        self,
+        min_workers: int,
+        max_workers: int,
+        target_backlog_per_worker: int = 100,
+        target_drain_seconds: float = 30.0,
+        scale_down_cooldown_seconds: float = 60.0,
+    ) -> None:
+        if min_workers < 0 or max_workers < max(min_workers, 1):
+            raise ValueError("max_workers must be >= min_workers and >= 1")
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_backlog_per_worker = target_backlog_per_worker
+        self.target_drain_seconds = target_drain_seconds
+        self.scale_down_cooldown_seconds = scale_down_cooldown_seconds
+        self._last_change_at = float("-inf")
+
+    def desired_workers(
+        self,
+        current: int,
+        queue_depth: int,
+        throughput: float | None,
+        now: float,
+    ) -> int:
+        if queue_depth <= 0:
+            desired = self.min_workers
+        elif throughput and current > 0:
+            # Size the pool so the observed per-worker rate drains the
+            # backlog within the target window.
+            per_worker_rate = throughput / current
+            desired = math.ceil(
+                queue_depth / (per_worker_rate * self.target_drain_seconds)
+            )
+        else:
+            # No throughput signal yet (or workers are stalled): fall back to
+            # a static backlog budget and always add at least one worker.
+            desired = max(
+                math.ceil(queue_depth / self.target_backlog_per_worker),
+                current + 1,
+            )
+        desired = min(max(desired, self.min_workers), self.max_workers)
+
+        if desired > current:
+            self._last_change_at = now
+            return desired
+        if desired < current:
+            if now - self._last_change_at < self.scale_down_cooldown_seconds:
+                return current
+            self._last_change_at = now
+            return current - 1
+        return current
+
+
+class _WorkerSlot:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.process: Any = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at: float | None = None
+
+
+class WorkerSupervisor:
+    def __init__(
+        self,
+        target: Callable[..., None],
+        args: Callable[[int], tuple[Any, ...]],
+        restart_backoff_seconds: float = 1.0,
+        max_restart_backoff_seconds: float = 60.0,
+        stable_after_seconds: float = 30.0,
+    ) -> None:
+        # "spawn" gives every child a fresh interpreter, so each one builds its
+        # own event loop, engine pool and broker connections.
+        self._context = multiprocessing.get_context("spawn")
+        self._target = target
+        self._args = args
+        self._restart_backoff_seconds = restart_backoff_seconds
+        self._max_restart_backoff_seconds = max_restart_backoff_seconds
+        self._stable_after_seconds = stable_after_seconds
+        self._slots: list[_WorkerSlot] = []
+        self._stopping: list[Any] = []
+        self.processed = self._context.Value("Q", 0)
+
+    @property
+    def size(self) -> int:
+        return len(self._slots)
+
+    def _start(self, slot: _WorkerSlot) -> None:
+        process = self._context.Process(
+            target=self._target,
+            args=self._args(slot.index) + (self.processed,),
+            name=f"etl-worker-{slot.index}",
+            daemon=False,
+        )
+        process.start()
+        slot.process = process
+        slot.started_at = time.monotonic()
+        slot.restart_at = None
+        logger.info(
+            "Started worker process",
+            extra={"slot": slot.index, "pid": process.pid},
+        )
+
+    def scale_to(self, count: int) -> None:
+        while len(self._slots) < count:
+            slot = _WorkerSlot(index=len(self._slots))
+            self._slots.append(slot)
+            self._start(slot)
+        while len(self._slots) > count:
+            slot = self._slots.pop()
+            if slot.process is not None and slot.process.is_alive():
+                # SIGTERM lets the child finish its current batch before exiting.
+                slot.process.terminate()
+                self._stopping.append(slot.process)
+            logger.info("Stopping worker process", extra={"slot": slot.index})
+
+    def reap(self) -> None:
+        now = time.monotonic()
+        for process in list(self._stopping):
+            if not process.is_alive():
+                process.join()
+                self._stopping.remove(process)
+        for slot in self._slots:
+            if slot.restart_at is not None:
+                if now >= slot.restart_at:
+                    self._start(slot)
+                continue
+            if slot.process is None or slot.process.is_alive():
+                continue
+            exitcode = slot.process.exitcode
+            slot.process.join()
+            if now - slot.started_at >= self._stable_after_seconds:
+                slot.failures = 0
+            slot.failures += 1
+            delay = min(
+                self._restart_backoff_seconds * 2 ** (slot.failures - 1),
+                self._max_restart_backoff_seconds,
+            )
+            slot.restart_at = now + delay
+            logger.warning(
+                "Worker process exited, scheduling restart",
+                extra={
+                    "slot": slot.index,
+                    "exitcode": exitcode,
+                    "attempt": slot.failures,
+                    "delay": delay,
+                },
+            )
+
+    def stop(self, timeout_seconds: float = 30.0) -> None:
+        self.scale_to(0)
+        deadline = time.monotonic() + timeout_seconds
+        for process in self._stopping:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self._stopping.clear()
+
+
+async def _run_child(run: Callable[..., Any], kwargs: dict[str, Any], processed) -> None:
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+    loop.add_signal_handler(signal.SIGINT, stop_event.set)
+
+    def report(count: int) -> None:
+        with processed.get_lock():
+            processed.value += count
+
+    from app.workers.common import run_then_shut_down
+
+    async with monitor_event_loop(f"worker-{os.getpid()}"):
+        await run_then_shut_down(
+            run(**kwargs, on_batch=report, stop_event=stop_event)
+        )
+
+
+def _queue_worker_entry(
+    queue_name: str,
+    source_name: str,
+    interval_seconds: int,
+    max_messages: int,
+    processed,
+) -> None:
+    from app.workers.queue_worker import run_queue_worker
+
+    configure_logging()
+    asyncio.run(
+        _run_child(
+            run_queue_worker,
+            {
+                "queue_name": queue_name,
+                "source_name": source_name,
+                "interval_seconds": interval_seconds,
+                "max_messages": max_messages,
+            },
+            processed,
+        ),
+    )
+
+
+def _file_worker_entry(
+    path: str,
+    source_name: str,
+    interval_seconds: int,
+    processed,
+) -> None:
+    from app.workers.file_worker import run_file_worker
+
+    configure_logging()
+    asyncio.run(
+        _run_child(
+            run_file_worker,
+            {
+                "path": path,
+                "source_name": source_name,
+                "interval_seconds": interval_seconds,
+            },
+            processed,
+        ),
+    )
+
+
+async def _wait_for_stop(stop_event: asyncio.Event, seconds: float) -> None:
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_queue_supervisor(
+    queue_name: str,
+    source_name: str,
+    policy: ScalingPolicy,
+    interval_seconds: int = 5,
+    max_messages: int = 10,
+    poll_seconds: float = 5.0,
+) -> None:
+    supervisor = WorkerSupervisor(
+        target=_queue_worker_entry,
+        args=lambda index: (queue_name, source_name, interval_seconds, max_messages),
+    )
+    client = RabbitMQClient()
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+    loop.add_signal_handler(signal.SIGINT, stop_event.set)
+
+    supervisor.scale_to(max(policy.min_workers, 1))
+    last_processed = 0
+    last_sample = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            supervisor.reap()
+            now = time.monotonic()
+            processed = supervisor.processed.value
+            elapsed = now - last_sample
+            throughput = (processed - last_processed) / elapsed if elapsed > 0 else None
+            last_processed, last_sample = processed, now
+            try:
+                depth = await client.queue_depth(queue_name)
+            except Exception:
+                logger.exception(
+                    "Failed to read queue depth",
+                    extra={"queue_name": queue_name},
+                )
+            else:
+                desired = policy.desired_workers(
+                    supervisor.size, depth, throughput, now
+                )
+                if desired != supervisor.size:
+                    logger.info(
+                        "Scaling queue workers",
+                        extra={
+                            "queue_name": queue_name,
+                            "queue_depth": depth,
+                            "throughput": throughput,
+                            "from": supervisor.size,
+                            "to": desired,
+                        },
+                    )
+                    supervisor.scale_to(desired)
+            await _wait_for_stop(stop_event, poll_seconds)
+    finally:
+        supervisor.stop()
+
+
+async def run_file_supervisor(
+    paths: list[str],
+    source_name: str,
+    interval_seconds: int = 10,
+    poll_seconds: float = 1.0,
+) -> None:
+    # Each file gets exactly one worker; running several workers on the same
+    # path would ingest its rows more than once.
+    supervisor = WorkerSupervisor(
+        target=_file_worker_entry,
+        args=lambda index: (paths[index], source_name, interval_seconds),
+    )
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+    loop.add_signal_handler(signal.SIGINT, stop_event.set)
+
+    supervisor.scale_to(len(paths))
+    try:
+        while not stop_event.is_set():
+            supervisor.reap()
+            await _wait_for_stop(stop_event, poll_seconds)
+    finally:
+        supervisor.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    queue_parser = subparsers.add_parser("queue")
+    queue_parser.add_argument("--queue", required=True)
+    queue_parser.add_argument("--source", required=True)
+    queue_parser.add_argument("--interval", type=int, default=5)
+    queue_parser.add_argument("--max-messages", type=int, default=10)
+    queue_parser.add_argument("--min-workers", type=int, default=1)
+    queue_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    queue_parser.add_argument("--target-backlog", type=int, default=100)
+    queue_parser.add_argument("--target-drain-seconds", type=float, default=30.0)
+    queue_parser.add_argument("--scale-down-cooldown", type=float, default=60.0)
+    queue_parser.add_argument("--poll-interval", type=float, default=5.0)
+
+    file_parser = subparsers.add_parser("file")
+    file_parser.add_argument("--path", action="append", required=True)
+    file_parser.add_argument("--source", required=True)
+    file_parser.add_argument("--interval", type=int, default=10)
+
+    args = parser.parse_args()
+    configure_logging()
+    if args.mode == "queue":
+        policy = ScalingPolicy(
+            min_workers=args.min_workers,
+            max_workers=args.max_workers,
+            target_backlog_per_worker=args.target_backlog,
+            target_drain_seconds=args.target_drain_seconds,
+            scale_down_cooldown_seconds=args.scale_down_cooldown,
+        )
+        asyncio.run(
+            run_queue_supervisor(
+                queue_name=args.queue,
+                source_name=args.source,
+                policy=policy,
+                interval_seconds=args.interval,
+                max_messages=args.max_messages,
+                poll_seconds=args.poll_interval,
+            ),
+        )
+    else:
+        asyncio.run(run_file_supervisor(args.path, args.source, args.interval))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
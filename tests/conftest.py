@@ -3,7 +3,7 @@ import pytest_asyncio
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 import app.routes.api as api_module
-from app.db import get_db_session
+from app.db import get_db_session, get_read_db_session
 from app.main import create_app
 from app.models import Base
 
@@ -40,6 +40,7 @@ def test_app():
     logging.basicConfig(level=logging.INFO)
     
     app.dependency_overrides[get_db_session] = override_get_db_session
+    app.dependency_overrides[get_read_db_session] = override_get_db_session
     return app
 
 
@@ -51,6 +52,23 @@ class DummyRedisClient:
         return None
 
 
+class DummyRedisSink:
+    def __init__(self) -> None:
+        self.client = DummyRedisClient()
+
+    async def write(self, record) -> None:
+        return None
+
+
+@pytest.fixture
+def worker_database(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Worker sessions use the test database and sinks skip Redis
+    import app.workers.common as common_module
+
+    monkeypatch.setattr(common_module, "AsyncSessionLocal", TestSessionLocal)
+    monkeypatch.setattr(common_module, "RedisSink", DummyRedisSink)
+
+
 @pytest.fixture(autouse=True)
 def mock_redis_client(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(api_module, "RedisCacheClient", DummyRedisClient)
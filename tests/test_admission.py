@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import app.middlewares.admission as admission_module
+from app.utils.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2, burst=2)
+    now = time.monotonic()
+
+    assert bucket.try_acquire(now=now) == 0
+    assert bucket.try_acquire(now=now) == 0
+    assert bucket.try_acquire(now=now) == pytest.approx(0.5)
+    assert bucket.try_acquire(now=now + 0.5) == 0
+
+
+@pytest.mark.asyncio
+async def test_controller_queues_then_sheds_beyond_capacity():
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=1, queue_timeout_seconds=1.0
+    )
+    release = asyncio.Event()
+    order: list[str] = []
+
+    async def hold(name: str) -> None:
+        async with controller.admit():
+            order.append(name)
+            await release.wait()
+
+    first = asyncio.create_task(hold("first"))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(hold("queued"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with controller.admit():
+            pass
+    assert rejected.value.reason == "overloaded"
+
+    release.set()
+    await asyncio.gather(first, queued)
+    assert order == ["first", "queued"]
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_request_is_shed_after_timeout():
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=5, queue_timeout_seconds=0.01
+    )
+
+    async with controller.admit():
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit():
+                pass
+
+    assert rejected.value.reason == "queue_timeout"
+    assert controller.in_flight == 0
+
+
+def test_source_buckets_are_bounded():
+    controller = AdmissionController(max_concurrent=1, source_rate=1, max_sources=2)
+    for source_name in ("a", "b", "a", "c"):
+        controller._bucket(source_name)
+
+    assert list(controller._buckets) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_slot_handed_over_as_the_queue_times_out_is_returned(monkeypatch):
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=5, queue_timeout_seconds=0.01
+    )
+    controller._available = 0
+
+    async def handed_over_then_timed_out(waiter, timeout):
+        # The holder leaves in the same loop iteration the timeout fires
+        controller._release()
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(asyncio, "wait_for", handed_over_then_timed_out)
+    with pytest.raises(AdmissionRejected):
+        async with controller.admit():
+            pass
+
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_ingest_returns_429_with_retry_after_when_rate_limited(
+    test_app, monkeypatch
+):
+    controller = AdmissionController(
+        max_concurrent=4, source_rates={"limited-source": 0.5}
+    )
+    monkeypatch.setattr(admission_module, "get_admission_controller", lambda: controller)
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {"source_name": "limited-source", "payload": {"limited": 1}}
+        accepted = await client.post("/api/ingest", json=payload)
+        payload["payload"] = {"limited": 2}
+        limited = await client.post("/api/ingest", json=payload)
+
+    assert accepted.status_code == 201
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert controller.in_flight == 0
@@ -44,3 +44,26 @@ async def test_list_sources_returns_created_source(test_app):
         sources = response_sources.json()
         names = {item["name"] for item in sources}
         assert "source-list" in names
+
+
+@pytest.mark.asyncio
+async def test_pass_through_payload_is_stored_once_and_resolved_on_read(test_app):
+    from app.models import ProcessedRecord
+    from tests.conftest import TestSessionLocal
+
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {"source_name": "dedup-source", "payload": {"value": 31}}
+        response = await client.post("/api/ingest", json=payload)
+        assert response.status_code == 201
+        record_id = response.json()["id"]
+        assert response.json()["result_payload"] == {"value": 31}
+
+        response_records = await client.get("/api/processed-records")
+        records = {item["id"]: item for item in response_records.json()}
+        assert records[record_id]["result_payload"] == {"value": 31}
+
+    async with TestSessionLocal() as session:
+        record = await session.get(ProcessedRecord, record_id)
+    assert record.result_is_raw is True
+    assert record.stored_result_payload is None
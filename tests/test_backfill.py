@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+import app.workers.backfill as backfill_module
+import app.workers.common as common_module
+from app.models import BackfillRange, ProcessedRecord, RawEvent
+from app.repositories import SqlAlchemyEventRepository
+from app.services.transforms import TransformRegistry, compile_transform
+from app.workers.backfill import run_backfill, split_id_range
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def use_test_database(worker_database, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(backfill_module, "AsyncSessionLocal", TestSessionLocal)
+
+
+def test_split_id_range_covers_bounds():
+    assert split_id_range(5, 14, 4) == [(5, 9), (9, 13), (13, 15)]
+    assert split_id_range(7, 7, 100) == [(7, 8)]
+
+
+@pytest.mark.asyncio
+async def test_backfill_rewrites_results_and_resumes(monkeypatch):
+    since = datetime.utcnow()
+    await common_module.ingest_payloads(
+        [{"backfill": index} for index in range(5)],
+        source_name="backfill-source",
+        origin="file:backfill.json",
+        cache_prefix="test:processed",
+    )
+    # An event that was never processed gets a record too
+    async with TestSessionLocal() as session:
+        await SqlAlchemyEventRepository(session).ingest_event(
+            "backfill-source", {"backfill": 5}
+        )
+        await session.commit()
+    registry = TransformRegistry(
+        {
+            "backfill-source": compile_transform(
+                "backfill-source",
+                {"steps": [{"derive": {"doubled": "backfill * 2"}}]},
+            )
+        }
+    )
+    monkeypatch.setattr(backfill_module, "get_transform_registry", lambda: registry)
+
+    totals = await run_backfill(
+        "test-backfill",
+        workers=2,
+        range_size=2,
+        chunk_size=1,
+        max_rows_per_second=1000,
+        since=since,
+        source_name="backfill-source",
+    )
+
+    assert totals["rows"] == 6
+    assert totals["failed"] == 0
+    async with TestSessionLocal() as session:
+        records = (
+            await session.execute(
+                select(ProcessedRecord)
+                .join(RawEvent, RawEvent.id == ProcessedRecord.raw_event_id)
+                .where(RawEvent.received_at >= since)
+            )
+        ).scalars().all()
+        ranges = (
+            await session.execute(
+                select(BackfillRange).where(BackfillRange.job == "test-backfill")
+            )
+        ).scalars().all()
+    doubled = sorted(json.loads(record.result_payload)["doubled"] for record in records)
+    assert doubled == [0, 2, 4, 6, 8, 10]
+    assert all(item.completed_at is not None for item in ranges)
+
+    # Finished ranges are skipped when the job is run again
+    again = await run_backfill("test-backfill", source_name="backfill-source")
+    assert again == {"ranges": 0, "rows": 0, "rejected": 0, "failed": 0}
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+from app.config import get_settings
+from app.utils.loop_monitor import monitored
+from app.utils.metrics import get_metrics
+from app.workers.batching import AdaptiveBatchController
+
+
+def test_controller_grows_on_fast_full_batches_and_skips_sleep():
+    controller = AdaptiveBatchController(
+        name="test-grow", initial_size=10, max_size=100, target_latency_seconds=1.0
+    )
+    decision = controller.record(requested=10, received=10, latency_seconds=0.1)
+    assert decision == "grow"
+    assert controller.batch_size == 15
+    assert controller.should_sleep is False
+
+
+def test_controller_shrinks_on_slow_or_failed_batches():
+    controller = AdaptiveBatchController(
+        name="test-shrink", initial_size=40, min_size=5, target_latency_seconds=0.5
+    )
+    assert controller.record(requested=40, received=40, latency_seconds=2.0) == "shrink_latency"
+    assert controller.batch_size == 20
+    assert controller.record(requested=20, received=0, latency_seconds=0.1, failed=True) == "shrink_error"
+    assert controller.batch_size == 10
+    assert controller.should_sleep is True
+
+
+def test_controller_holds_on_partial_batch_and_exports_metrics():
+    controller = AdaptiveBatchController(name="test-hold", initial_size=10)
+    assert controller.record(requested=10, received=3, latency_seconds=0.01) == "hold"
+    snapshot = get_metrics().snapshot()
+    assert snapshot["gauges"]['worker_batch_size{worker="test-hold"}'] == 10
+    assert snapshot["counters"]['worker_batch_decisions{decision="hold",worker="test-hold"}'] == 1
+
+
+@pytest.mark.asyncio
+async def test_monitored_worker_serves_its_metrics(monkeypatch):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    monkeypatch.setattr(get_settings(), "worker_metrics_host", "127.0.0.1")
+    monkeypatch.setattr(get_settings(), "worker_metrics_port", port)
+
+    async def worker() -> dict:
+        AdaptiveBatchController(name="test-served", initial_size=7)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: worker\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+    snapshot = await monitored(worker(), "test-worker")
+
+    assert snapshot["gauges"]['worker_batch_size{worker="test-served"}'] == 7
+    # The server stops with the worker
+    with pytest.raises(OSError):
+        await asyncio.open_connection("127.0.0.1", port)
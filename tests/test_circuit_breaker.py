@@ -0,0 +1,123 @@
+import pytest
+import redis.asyncio as redis
+
+import app.utils.circuit_breaker as breaker_module
+from app.utils.cache import RedisCacheClient
+from app.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_circuit_breaker,
+)
+from app.utils.messaging import RabbitMQClient
+from app.utils.metrics import get_metrics
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(breaker_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    get_circuit_breaker.cache_clear()
+    yield
+    get_circuit_breaker.cache_clear()
+
+
+async def fail():
+    raise ConnectionError("down")
+
+
+async def succeed():
+    return "ok"
+
+
+@pytest.mark.asyncio
+async def test_opens_after_threshold_and_half_opens_after_timeout(clock):
+    breaker = CircuitBreaker("test-dep", failure_threshold=2, reset_timeout_seconds=5)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as rejected:
+        await breaker.call(succeed)
+    assert rejected.value.retry_after == 5
+
+    clock.now += 5
+    assert breaker.state == HALF_OPEN
+    assert await breaker.call(succeed) == "ok"
+    assert breaker.state == CLOSED
+    gauges = get_metrics().snapshot()["gauges"]
+    assert gauges['circuit_state{dependency="test-dep"}'] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker("trial-dep", failure_threshold=1, reset_timeout_seconds=5)
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    clock.now += 5
+    breaker.before_call()
+    # Only one trial call at a time while half-open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_fails_fast_when_open(monkeypatch):
+    monkeypatch.setattr(breaker_module.get_settings(), "circuit_failure_threshold", 2)
+
+    class DownRedis:
+        calls = 0
+
+        async def get(self, key):
+            self.calls += 1
+            raise redis.ConnectionError("down")
+
+        async def set(self, key, value):
+            self.calls += 1
+            raise redis.TimeoutError("slow")
+
+    client = DownRedis()
+    cache = RedisCacheClient(client=client)
+
+    assert await cache.get("a") is None
+    await cache.set("b", "1")
+    assert get_circuit_breaker("redis").state == OPEN
+    assert await cache.get("c") is None
+    await cache.set("d", "1")
+    assert client.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_pull_batch_returns_nothing_when_open(monkeypatch):
+    breaker = get_circuit_breaker("rabbitmq")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    def unreachable(queue, max_messages):
+        raise AssertionError("the broker must not be called")
+
+    client = RabbitMQClient()
+    monkeypatch.setattr(client, "_pull_batch_blocking", unreachable)
+
+    assert await client.pull_batch("events", max_messages=10) == []
+    with pytest.raises(CircuitOpenError):
+        await client.publish_batch([("events", "{}")])
@@ -0,0 +1,64 @@
+import pytest
+
+from app.connectors import ColumnarCsvIngestionConnector
+from app.connectors.columnar import CATEGORY, DATE, FLOAT, INT, STRING
+
+
+@pytest.mark.asyncio
+async def test_columnar_connector_infers_types_and_widens_later_chunks(tmp_path):
+    path = tmp_path / "indicators.csv"
+    path.write_text(
+        "country,year,value,date,note\n"
+        "Brazil,2000,1.5,2000-01-01,a\n"
+        "Chile,2001,,2001-01-01,b\n"
+        "Brazil,2002,3,,c\n"
+        "Chile,2003.5,4,2003-01-01,d\n"
+    )
+    connector = ColumnarCsvIngestionConnector(
+        str(path), chunk_rows=3, category_ratio=0.7
+    )
+
+    chunks = list(connector.iter_column_batches())
+
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    assert chunks[0].types == {
+        "country": CATEGORY,
+        "year": INT,
+        "value": FLOAT,
+        "date": DATE,
+        "note": STRING,
+    }
+    # "2003.5" no longer fits the int column inferred from the first chunk
+    assert chunks[1].types["year"] == FLOAT
+    records = await connector.fetch_batch()
+    assert records[1] == {
+        "country": "Chile",
+        "year": 2001,
+        "value": None,
+        "date": "2001-01-01",
+        "note": "b",
+    }
+    assert records[2]["date"] is None
+    assert records[3]["year"] == 2003.5
+
+
+def test_columnar_connector_keeps_text_that_numbers_and_dates_would_change(
+    tmp_path,
+):
+    path = tmp_path / "ids.csv"
+    path.write_text(
+        "big,zip,stamp,day\n"
+        "99999999999999999999,004,2000-01-01T10:30,2000-01-01\n"
+        "1,010,2000-01-02T11:00,2000-01-02\n"
+    )
+    connector = ColumnarCsvIngestionConnector(str(path), category_ratio=0)
+
+    [chunk] = list(connector.iter_column_batches())
+
+    assert chunk.types == {"big": STRING, "zip": STRING, "stamp": STRING, "day": DATE}
+    assert chunk.to_records()[0] == {
+        "big": "99999999999999999999",
+        "zip": "004",
+        "stamp": "2000-01-01T10:30",
+        "day": "2000-01-01",
+    }
@@ -0,0 +1,72 @@
+from functools import lru_cache
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import app.db.engine as engine_module
+from app.db import get_db_session, get_read_db_session
+from app.routes.api import router as api_router
+
+
+def test_engine_applies_pool_and_statement_cache_settings(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(
+        engine_module,
+        "create_async_engine",
+        lambda url, **kwargs: captured.update(url=url, **kwargs),
+    )
+    settings = engine_module.get_settings()
+    monkeypatch.setattr(settings, "db_statement_cache_size", 0)
+    monkeypatch.setattr(settings, "db_pool_recycle_seconds", 60)
+    replica_url = "postgresql+asyncpg://replica/db"
+    monkeypatch.setattr(settings, "db_read_replica_url", replica_url)
+
+    engine_module.get_read_engine.__wrapped__()
+
+    assert captured["url"] == replica_url
+    assert captured["pool_size"] == settings.db_read_pool_size
+    assert captured["pool_recycle"] == 60
+    assert captured["pool_pre_ping"] is True
+    assert captured["connect_args"] == {
+        "prepared_statement_cache_size": 0,
+        "statement_cache_size": 0,
+    }
+
+
+def test_read_endpoints_use_the_read_session():
+    read_paths = {"/sources", "/processed-records", "/stats"}
+    for route in api_router.routes:
+        dependencies = {dependency.call for dependency in route.dependant.dependencies}
+        if route.path in read_paths:
+            assert get_read_db_session in dependencies
+            assert get_db_session not in dependencies
+        elif route.path == "/ingest":
+            assert get_db_session in dependencies
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_pool_stats(test_app, monkeypatch):
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///./test_etlpay.db",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=2,
+    )
+    get_engine = lru_cache(maxsize=1)(lambda: engine)
+    monkeypatch.setattr(engine_module, "get_engine", get_engine)
+    get_engine()
+    try:
+        async with engine.connect():
+            transport = ASGITransport(app=test_app)
+            async with AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                response = await client.get("/api/metrics")
+    finally:
+        await engine.dispose()
+
+    gauges = response.json()["gauges"]
+    assert gauges['db_pool_size{pool="primary"}'] == 2
+    assert gauges['db_pool_checked_out{pool="primary"}'] == 1
+    assert 'db_pool_size{pool="read"}' not in gauges
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import func, select
+
+import app.workers.common as common_module
+import app.workers.dead_letters as dead_letters_module
+from app.models import DeadLetter, ProcessedRecord, RawEvent
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def use_test_database(worker_database, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(dead_letters_module, "AsyncSessionLocal", TestSessionLocal)
+
+
+@pytest.mark.asyncio
+async def test_poisoned_record_is_dead_lettered_and_batch_commits():
+    payloads = [{"value": 1}, {"value": {1, 2}}, {"value": 3}]
+
+    written, dead_lettered = await common_module.ingest_payloads(
+        payloads,
+        source_name="poison-source",
+        origin="file:poison.json",
+        cache_prefix="test:processed",
+    )
+
+    assert (written, dead_lettered) == (2, 1)
+    async with TestSessionLocal() as session:
+        dead_letters = (
+            await session.execute(
+                select(DeadLetter).where(DeadLetter.origin == "file:poison.json")
+            )
+        ).scalars().all()
+        processed = await session.scalar(
+            select(func.count(ProcessedRecord.id))
+            .join(RawEvent, RawEvent.id == ProcessedRecord.raw_event_id)
+            .where(RawEvent.payload.in_(['{"value": 1}', '{"value": 3}']))
+        )
+    assert len(dead_letters) == 1
+    assert "TypeError" in dead_letters[0].error
+    assert processed == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_marks_dead_letters_replayed():
+    async with TestSessionLocal() as session:
+        session.add(
+            DeadLetter(
+                source_name="replay-source",
+                origin="queue:replay",
+                payload='{"value": 42}',
+                error="OperationalError()",
+            )
+        )
+        await session.commit()
+
+    metrics = await dead_letters_module.replay_dead_letters(source_name="replay-source")
+
+    assert metrics == {"replayed": 1, "failed": 0}
+    async with TestSessionLocal() as session:
+        pending = (
+            await session.execute(
+                select(DeadLetter).where(
+                    DeadLetter.source_name == "replay-source",
+                    DeadLetter.replayed_at.is_(None),
+                )
+            )
+        ).scalars().all()
+    assert pending == []
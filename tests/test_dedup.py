@@ -0,0 +1,55 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config import get_settings
+from app.repositories import SqlAlchemyEventRepository
+from app.services.dedup import DedupIndex, content_hash, get_dedup_index
+from app.utils.metrics import get_metrics
+from tests.conftest import TestSessionLocal
+
+
+def test_content_hash_is_canonical():
+    assert content_hash("s", {"a": 1, "b": 2}) == content_hash("s", {"b": 2, "a": 1})
+    assert content_hash("s", {"a": 1}) != content_hash("t", {"a": 1})
+
+
+@pytest.fixture
+def dedup_enabled(monkeypatch):
+    monkeypatch.setattr(get_settings(), "dedup_enabled", True)
+    get_dedup_index.cache_clear()
+    yield
+    get_dedup_index.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_ingest_is_skipped(test_app, dedup_enabled):
+    body = {"source_name": "dedup-api", "payload": {"value": 33}}
+    labels = 'outcome="{}",source="dedup-api"'
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.post("/api/ingest", json=body)
+        second = await client.post("/api/ingest", json=body)
+        # A fresh process that skipped warm-up falls back to the unique index
+        get_dedup_index.cache_clear()
+        third = await client.post("/api/ingest", json=body)
+
+    assert first.status_code == 201
+    assert second.status_code == 409
+    assert third.status_code == 409
+    counters = get_metrics().snapshot()["counters"]
+    assert counters["dedup_events{" + labels.format("skipped_memory") + "}"] == 1
+    assert counters["dedup_events{" + labels.format("skipped_confirmed") + "}"] == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_recent_hashes(test_app, dedup_enabled):
+    body = {"source_name": "dedup-warm", "payload": {"value": 34}}
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.post("/api/ingest", json=body)).status_code == 201
+
+    dedup = DedupIndex(recent_capacity=10)
+    async with TestSessionLocal() as session:
+        await dedup.warm_up(SqlAlchemyEventRepository(session=session))
+
+    assert dedup.seen_recently("dedup-warm", content_hash("dedup-warm", {"value": 34}))
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+from app.workers.file_worker import run_directory_worker
+
+
+async def _wait_for(predicate, timeout: float = 10.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.asyncio
+async def test_directory_worker_ingests_existing_and_new_files_once(
+    tmp_path, worker_database
+):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "backlog.json").write_text(json.dumps([{"watch": 1}, {"watch": 2}]))
+    (inbox / "notes.txt").write_text("ignored")
+    processed: list[int] = []
+    stop_event = asyncio.Event()
+
+    worker = asyncio.create_task(
+        run_directory_worker(
+            str(inbox),
+            "watch-source",
+            done_dir=str(tmp_path / "done"),
+            on_batch=processed.append,
+            stop_event=stop_event,
+        )
+    )
+    await _wait_for(lambda: (tmp_path / "done" / "backlog.json").exists())
+    # Writers create a dot-file and rename it once complete
+    partial = inbox / ".live.jsonl"
+    partial.write_text('{"watch": 3}\n{"watch": 4}\n')
+    partial.rename(inbox / "live.jsonl")
+    await _wait_for(lambda: (tmp_path / "done" / "live.jsonl").exists())
+    stop_event.set()
+    await asyncio.wait_for(worker, timeout=10)
+
+    assert sorted(processed) == [2, 2]
+    assert (inbox / "notes.txt").exists()
+    assert not (inbox / "live.jsonl").exists()
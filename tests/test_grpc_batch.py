@@ -0,0 +1,198 @@
+import json
+
+import grpc
+import pytest
+import pytest_asyncio
+from google.protobuf import struct_pb2
+from sqlalchemy.exc import OperationalError
+
+import app.grpc.server as server_module
+from app.config import get_settings
+from app.grpc import etlpay_pb2, etlpay_pb2_grpc
+from app.grpc.server import EtlServiceServicer, decode_payload
+from app.repositories import SqlAlchemyEventRepository
+from app.services import etl as etl_services
+from app.services.dedup import get_dedup_index
+from tests.conftest import TestSessionLocal
+
+
+def _struct(data):
+    struct = struct_pb2.Struct()
+    struct.update(data)
+    return struct
+
+
+@pytest_asyncio.fixture
+async def stub(monkeypatch):
+    monkeypatch.setattr(server_module, "AsyncSessionLocal", TestSessionLocal)
+    server = grpc.aio.server()
+    etlpay_pb2_grpc.add_EtlServiceServicer_to_server(EtlServiceServicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        yield etlpay_pb2_grpc.EtlServiceStub(channel)
+    await server.stop(None)
+
+
+def test_struct_payload_keeps_integers_and_nesting():
+    request = etlpay_pb2.IngestRequest(
+        source_name="grpc-struct",
+        payload_struct=_struct({"year": 2001, "rate": 1.5, "tags": ["a", None]}),
+    )
+
+    assert decode_payload(request) == {"year": 2001, "rate": 1.5, "tags": ["a", None]}
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_reports_each_event(stub):
+    response = await stub.IngestBatch(
+        etlpay_pb2.IngestBatchRequest(
+            events=[
+                etlpay_pb2.IngestRequest(
+                    source_name="grpc-batch", payload_struct=_struct({"batch": 1})
+                ),
+                etlpay_pb2.IngestRequest(
+                    source_name="grpc-batch",
+                    payload_bytes=json.dumps({"batch": 2}).encode(),
+                ),
+                etlpay_pb2.IngestRequest(
+                    source_name="grpc-batch", payload_bytes=b"not json"
+                ),
+            ]
+        )
+    )
+
+    assert [result.status for result in response.results] == [
+        "SUCCESS",
+        "SUCCESS",
+        "REJECTED",
+    ]
+    assert response.results[0].id > 0
+    assert (response.accepted, response.rejected) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream_acknowledges_micro_batches(stub, monkeypatch):
+    monkeypatch.setattr(get_settings(), "grpc_batch_size", 2)
+
+    async def events():
+        for number in range(5):
+            yield etlpay_pb2.IngestRequest(
+                source_name="grpc-stream",
+                payload_json=json.dumps({"stream": number}),
+            )
+
+    acks = [ack async for ack in stub.IngestStream(events())]
+
+    assert [ack.offset for ack in acks] == [0, 2, 4]
+    assert sum(ack.accepted for ack in acks) == 5
+    assert all(result.id > 0 for ack in acks for result in ack.results)
+
+
+@pytest.mark.asyncio
+async def test_failed_event_does_not_fail_its_batch(stub, monkeypatch):
+    original = etl_services.ingest_event
+    original_batch = SqlAlchemyEventRepository.ingest_processed_batch
+
+    async def ingest_processed_batch(self, items):
+        # The bulk insert fails as a whole when any row is refused
+        if any(payload.get("poison") for _, payload, _, _ in items):
+            raise RuntimeError("boom")
+        return await original_batch(self, items)
+
+    async def ingest_event(repository, source_name, payload):
+        if payload.get("poison"):
+            raise RuntimeError("boom")
+        return await original(
+            repository=repository, source_name=source_name, payload=payload
+        )
+
+    monkeypatch.setattr(etl_services, "ingest_event", ingest_event)
+    monkeypatch.setattr(
+        SqlAlchemyEventRepository, "ingest_processed_batch", ingest_processed_batch
+    )
+    response = await stub.IngestBatch(
+        etlpay_pb2.IngestBatchRequest(
+            events=[
+                etlpay_pb2.IngestRequest(
+                    source_name="grpc-poison", payload_json=json.dumps(payload)
+                )
+                for payload in ({"poison": False}, {"poison": True}, {"poison": 0})
+            ]
+        )
+    )
+
+    assert [result.status for result in response.results] == [
+        "SUCCESS",
+        "FAILED",
+        "SUCCESS",
+    ]
+    assert "boom" in response.results[1].error
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_not_counted_as_rejected(stub, monkeypatch):
+    monkeypatch.setattr(get_settings(), "dedup_enabled", True)
+    get_dedup_index.cache_clear()
+    event = etlpay_pb2.IngestRequest(
+        source_name="grpc-duplicate", payload_json=json.dumps({"duplicate": 1})
+    )
+    try:
+        response = await stub.IngestBatch(
+            etlpay_pb2.IngestBatchRequest(events=[event, event])
+        )
+    finally:
+        get_dedup_index.cache_clear()
+
+    assert [result.status for result in response.results] == [
+        "SUCCESS",
+        "DUPLICATE",
+    ]
+    assert (response.accepted, response.rejected) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_database_outage_fails_the_batch(stub, monkeypatch):
+    async def ingest_processed_batch(self, items):
+        raise OperationalError("INSERT", {}, ConnectionError("database is down"))
+
+    monkeypatch.setattr(
+        SqlAlchemyEventRepository, "ingest_processed_batch", ingest_processed_batch
+    )
+
+    with pytest.raises(grpc.aio.AioRpcError) as excinfo:
+        await stub.IngestBatch(
+            etlpay_pb2.IngestBatchRequest(
+                events=[
+                    etlpay_pb2.IngestRequest(
+                        source_name="grpc-outage", payload_json="{}"
+                    )
+                ]
+            )
+        )
+
+    assert excinfo.value.code() == grpc.StatusCode.UNAVAILABLE
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_bulk_pass_and_duplicate_fallback(monkeypatch):
+    monkeypatch.setattr(get_settings(), "dedup_enabled", True)
+    get_dedup_index.cache_clear()
+    records = [("grpc-bulk", {"bulk": index}) for index in range(3)]
+    try:
+        async with TestSessionLocal() as session:
+            repository = SqlAlchemyEventRepository(session=session)
+            stored = await etl_services.ingest_batch(repository, records)
+            # The repeated event fails the bulk insert and is found record
+            # by record
+            again = await etl_services.ingest_batch(
+                repository, [("grpc-bulk", {"bulk": 3}), records[0]]
+            )
+            await session.commit()
+    finally:
+        get_dedup_index.cache_clear()
+
+    assert [status for status, _, _ in stored] == ["SUCCESS"] * 3
+    assert len({record.id for _, record, _ in stored}) == 3
+    assert all(record.result_is_raw for _, record, _ in stored)
+    assert [status for status, _, _ in again] == ["SUCCESS", "DUPLICATE"]
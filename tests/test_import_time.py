@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Generous ceiling for slow CI machines; the point is catching regressions
+# such as an engine or a heavy library being imported again at module level.
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# Only loaded by the code paths that need them
+DEFERRED = {"kagglehub", "numpy", "watchfiles", "yaml", "uvicorn", "asyncpg", "dotenv"}
+
+ENTRY_POINTS = [
+    "app.workers.queue_worker",
+    "app.workers.file_worker",
+    "app.workers.supervisor",
+    "app.workers.dead_letters",
+    "app.workers.outbox_relay",
+    "app.validation.global_econ",
+    "app.grpc.server",
+    "app.main",
+]
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    # module -> cumulative import time in microseconds
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_entry_point_imports_stay_lean(module):
+    times = _import_times(f"import {module}")
+
+    assert not DEFERRED & times.keys()
+    assert times[module] / 1000 < BUDGET_MS
+
+
+def test_importing_app_has_no_side_effects():
+    statement = (
+        "import app.main, app.db.engine as e; "
+        "assert app.main._app is None; "
+        "assert e.get_engine.cache_info().currsize == 0"
+    )
+    subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from app.connectors import ParallelJsonlIngestionConnector
+import app.connectors.jsonl as jsonl_module
+from app.connectors.jsonl import shutdown_parser_pools, split_ranges
+
+
+def _write_lines(path, count: int) -> None:
+    lines = [json.dumps({"id": index, "name": "x" * (index % 7)}) for index in range(count)]
+    lines.insert(10, "not json")
+    lines.insert(20, "")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_split_ranges_are_newline_aligned_and_cover_file(tmp_path):
+    path = tmp_path / "events.jsonl"
+    _write_lines(path, 100)
+    data = path.read_bytes()
+
+    ranges = split_ranges(str(path), chunk_bytes=128)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert all(data[end - 1 : end] == b"\n" for _, end in ranges)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered", [True, False])
+async def test_parallel_jsonl_connector_parses_all_ranges(tmp_path, ordered):
+    path = tmp_path / "events.jsonl"
+    _write_lines(path, 100)
+    connector = ParallelJsonlIngestionConnector(
+        str(path), chunk_bytes=256, processes=2, ordered=ordered
+    )
+
+    rows = await connector.fetch_batch()
+
+    ids = [row["id"] for row in rows]
+    assert sorted(ids) == list(range(100))
+    if ordered:
+        assert ids == list(range(100))
+    assert connector.invalid_lines == 1
+
+
+@pytest.mark.asyncio
+async def test_connectors_share_one_pool_until_shutdown(tmp_path):
+    path = tmp_path / "events.jsonl"
+    _write_lines(path, 20)
+
+    for _ in range(2):
+        connector = ParallelJsonlIngestionConnector(str(path), processes=1)
+        assert len(await connector.fetch_batch()) == 20
+    pool = jsonl_module._POOLS[1]
+    assert jsonl_module.get_parser_pool(1) is pool
+
+    await shutdown_parser_pools()
+
+    assert jsonl_module._POOLS == {}
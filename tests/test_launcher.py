@@ -0,0 +1,64 @@
+import pytest
+import uvicorn
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+import app.main as main_module
+from app.db import warm_up_engine
+
+
+def test_production_launcher_runs_workers_with_uvloop_and_httptools(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        uvicorn, "run", lambda target, **kwargs: calls.append((target, kwargs))
+    )
+
+    main_module.run(["--production", "--workers", "3"])
+
+    target, options = calls[0]
+    assert target == "app.main:create_app"
+    assert options["factory"] is True
+    assert options["workers"] == 3
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["timeout_graceful_shutdown"] > 0
+
+
+def test_development_launcher_keeps_reload(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        uvicorn, "run", lambda target, **kwargs: calls.append((target, kwargs))
+    )
+    monkeypatch.setattr(main_module.get_settings(), "app_env", "development")
+
+    main_module.run([])
+
+    target, options = calls[0]
+    assert target == "app.main:app"
+    assert options["reload"] is True
+    assert "workers" not in options
+
+
+@pytest.mark.asyncio
+async def test_warm_up_engine_fills_the_pool():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///./test_etlpay.db",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=3,
+    )
+    try:
+        await warm_up_engine(3, engine=engine)
+        assert engine.pool.checkedin() == 3
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_tolerates_unavailable_dependencies(monkeypatch):
+    async def unavailable(connections: int) -> None:
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(main_module, "warm_up_engine", unavailable)
+    monkeypatch.setattr(main_module, "warm_up_redis", unavailable)
+
+    await main_module.warm_up()
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.utils.loop_monitor import LoopLagMonitor, percentile
+from app.utils.metrics import get_metrics
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 99) == 0
+
+
+@pytest.mark.asyncio
+async def test_blocked_loop_is_reported_with_its_stack(caplog):
+    monitor = LoopLagMonitor(
+        "test-blocked",
+        interval_seconds=0.01,
+        block_threshold_seconds=0.05,
+        publish_every=1,
+    )
+
+    async def blocking_handler() -> None:
+        time.sleep(0.2)
+
+    monitor.start()
+    with caplog.at_level(logging.WARNING, logger="app.utils.loop_monitor"):
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(blocking_handler(), name="slow-request")
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    assert monitor.stalls == 1
+    assert "slow-request" in caplog.text
+    assert "blocking_handler" in caplog.text
+    snapshot = get_metrics().snapshot()
+    assert snapshot["counters"]['loop_blocked{loop="test-blocked"}'] == 1
+    assert snapshot["gauges"]['loop_lag_max_seconds{loop="test-blocked"}'] >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_reports_no_stalls():
+    monitor = LoopLagMonitor(
+        "test-idle", interval_seconds=0.01, block_threshold_seconds=0.2
+    )
+
+    monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    assert monitor.stalls == 0
+    assert monitor.lag_percentiles()[50] < 0.2
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_the_watchdog_off_the_loop():
+    monitor = LoopLagMonitor("test-stop", interval_seconds=0.01)
+
+    def slow_watch() -> None:
+        # A watchdog still busy with a stall report when stop() is called
+        monitor._stopped.wait()
+        time.sleep(0.2)
+
+    monitor._watch = slow_watch
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    monitor.start()
+    task = asyncio.create_task(ticker())
+    await monitor.stop()
+    task.cancel()
+
+    assert ticks >= 5
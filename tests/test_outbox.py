@@ -0,0 +1,101 @@
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+
+import app.workers.outbox_relay as outbox_relay_module
+from app.config import get_settings
+from app.models import OutboxMessage
+from tests.conftest import TestSessionLocal
+
+
+class RecordingPublisher:
+    def __init__(self) -> None:
+        self.published: list[tuple[str, str]] = []
+
+    async def publish_batch(self, messages: list[tuple[str, str]]) -> None:
+        self.published.extend(messages)
+
+
+@pytest.mark.asyncio
+async def test_outbox_row_is_written_with_record_and_relayed(test_app, monkeypatch):
+    monkeypatch.setattr(get_settings(), "outbox_enabled", True)
+    monkeypatch.setattr(outbox_relay_module, "AsyncSessionLocal", TestSessionLocal)
+
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/ingest",
+            json={"source_name": "outbox-source", "payload": {"value": 7}},
+        )
+    assert response.status_code == 201
+
+    publisher = RecordingPublisher()
+    relayed = await outbox_relay_module.relay_outbox_once(publisher, batch_size=100)
+
+    assert relayed >= 1
+    routing_key, body = publisher.published[-1]
+    assert routing_key == "etl.processed"
+    assert json.loads(body)["id"] == response.json()["id"]
+    async with TestSessionLocal() as session:
+        remaining = await session.scalar(select(func.count(OutboxMessage.id)))
+    assert remaining == 0
+
+
+class FakeChannel:
+    is_open = True
+
+    def __init__(self, calls: list[str]) -> None:
+        self.calls = calls
+
+    def exchange_declare(self, **kwargs) -> None:
+        pass
+
+    def tx_select(self) -> None:
+        self.calls.append("tx_select")
+
+    def basic_publish(self, routing_key: str, **kwargs) -> None:
+        self.calls.append(f"publish:{routing_key}")
+
+    def tx_commit(self) -> None:
+        self.calls.append("tx_commit")
+
+
+@pytest.mark.asyncio
+async def test_publisher_commits_each_batch_once(monkeypatch):
+    from app.utils.circuit_breaker import get_circuit_breaker
+    from app.utils.messaging import RabbitMQPublisher
+
+    calls: list[str] = []
+
+    class FakeConnection:
+        is_open = True
+
+        def __init__(self, parameters) -> None:
+            pass
+
+        def channel(self) -> FakeChannel:
+            return FakeChannel(calls)
+
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setattr("pika.BlockingConnection", FakeConnection)
+    get_circuit_breaker.cache_clear()
+    publisher = RabbitMQPublisher()
+    try:
+        await publisher.publish_batch([("a", "{}"), ("b", "{}")])
+        await publisher.publish_batch([("c", "{}")])
+    finally:
+        await publisher.close()
+        get_circuit_breaker.cache_clear()
+
+    assert calls == [
+        "tx_select",
+        "publish:a",
+        "publish:b",
+        "tx_commit",
+        "publish:c",
+        "tx_commit",
+    ]
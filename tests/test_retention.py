@@ -0,0 +1,140 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, update
+
+import app.workers.common as common_module
+import app.workers.retention as retention_module
+from app.config import get_settings
+from app.models import ArchivedRecordRange, ArchiveSegment, ProcessedRecord, RawEvent
+from app.repositories import SqlAlchemyEventRepository
+from app.services.archive import id_runs
+from tests.conftest import TestSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_retention_archives_old_events_and_serves_them(
+    test_app, tmp_path, worker_database, monkeypatch
+):
+    monkeypatch.setattr(retention_module, "AsyncSessionLocal", TestSessionLocal)
+    monkeypatch.setattr(get_settings(), "archive_path", str(tmp_path))
+    await common_module.ingest_payloads(
+        [{"retained": index} for index in range(3)],
+        source_name="retention-source",
+        origin="file:retention.json",
+        cache_prefix="test:processed",
+    )
+    old = datetime.utcnow() - timedelta(days=40)
+    async with TestSessionLocal() as session:
+        raw_ids = (
+            await session.scalars(
+                select(RawEvent.id).where(
+                    RawEvent.payload.in_(
+                        [json.dumps({"retained": index}) for index in range(3)]
+                    )
+                )
+            )
+        ).all()
+        # Spread over two days to get one segment per day
+        for raw_id, days in zip(raw_ids, (0, 0, 1)):
+            await session.execute(
+                update(RawEvent)
+                .where(RawEvent.id == raw_id)
+                .values(received_at=old - timedelta(days=days))
+            )
+        record_ids = (
+            await session.scalars(
+                select(ProcessedRecord.id).where(
+                    ProcessedRecord.raw_event_id.in_(raw_ids)
+                )
+            )
+        ).all()
+        await session.commit()
+
+    metrics = await retention_module.run_retention(30, str(tmp_path), batch_size=2)
+
+    assert metrics["archived"] == 3
+    async with TestSessionLocal() as session:
+        remaining = (
+            await session.scalars(select(RawEvent.id).where(RawEvent.id.in_(raw_ids)))
+        ).all()
+        segments = (
+            await session.scalars(
+                select(ArchiveSegment).where(
+                    ArchiveSegment.first_raw_event_id.in_(raw_ids)
+                )
+            )
+        ).all()
+        segment_ids = [segment.id for segment in segments]
+        runs = (
+            await session.scalars(
+                select(ArchivedRecordRange).where(
+                    ArchivedRecordRange.segment_id.in_(segment_ids)
+                )
+            )
+        ).all()
+    assert remaining == []
+    assert sum(segment.event_count for segment in segments) == 3
+    # The id runs of the new segments cover exactly the archived records
+    assert sorted(
+        record_id
+        for run in runs
+        for record_id in range(run.first_record_id, run.last_record_id + 1)
+    ) == sorted(record_ids)
+    with gzip.open(tmp_path / segments[0].path, "rt") as segment:
+        first = json.loads(segment.readline())
+    assert first["raw_event"]["source_name"] == "retention-source"
+
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(f"/api/processed-records/{record_ids[0]}")
+        missing = await client.get("/api/processed-records/999999999")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == record_ids[0]
+    assert body["status"] == "SUCCESS"
+    assert body["result_payload"]["retained"] in (0, 1, 2)
+    assert missing.status_code == 404
+
+
+def test_id_runs_fold_consecutive_ids():
+    assert id_runs([9, 1, 2, 3, 7, 8]) == [(1, 3), (7, 9)]
+    assert id_runs([]) == []
+
+
+@pytest.mark.asyncio
+async def test_archive_lookup_finds_the_run_holding_the_record():
+    base = 700_000_000
+    async with TestSessionLocal() as session:
+        repository = SqlAlchemyEventRepository(session=session)
+        for name, runs in (("a", [(1, 3), (9, 10)]), ("b", [(4, 5), (11, 11)])):
+            segment = ArchiveSegment(
+                day="2026-01-01",
+                path=f"runs-{name}.ndjson.gz",
+                first_raw_event_id=base,
+                last_raw_event_id=base,
+                event_count=1,
+            )
+            await repository.add_archive_segment(
+                segment, [(base + first, base + last) for first, last in runs]
+            )
+        await session.commit()
+
+        found = {}
+        for offset in (1, 3, 4, 6, 10, 11, 12):
+            segment = await repository.find_archive_segment(base + offset)
+            found[offset] = segment.path if segment is not None else None
+
+    assert found == {
+        1: "runs-a.ndjson.gz",
+        3: "runs-a.ndjson.gz",
+        4: "runs-b.ndjson.gz",
+        6: None,
+        10: "runs-a.ndjson.gz",
+        11: "runs-b.ndjson.gz",
+        12: None,
+    }
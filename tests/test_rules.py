@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import select
+
+import app.workers.common as common_module
+from app.models import DeadLetter
+from app.services.rules import (
+    RuleRegistry,
+    RuleSetError,
+    compile_rule_set,
+    load_rule_registry,
+)
+from app.utils.metrics import get_metrics
+from tests.conftest import TestSessionLocal
+
+
+RULES = {
+    "country": {"required": True, "type": "string", "regex": "[A-Z][a-z ]+"},
+    "year": {"type": "integer", "min": 1960, "max": 2100},
+    "unit": {"enum": ["USD", "%"]},
+}
+
+
+def test_compiled_rule_set_reports_first_broken_rule():
+    rule_set = compile_rule_set("econ", RULES)
+    rows = [
+        {"country": "Brazil", "year": 2000, "unit": "USD"},
+        {"country": "", "year": 2000},
+        {"country": "brazil"},
+        {"country": "Chile", "year": 1900},
+        {"country": "Chile", "year": "2000"},
+        {"country": "Chile", "unit": "EUR"},
+        {"country": "Peru"},
+    ]
+
+    valid, rejected = rule_set.validate_batch(rows)
+
+    assert valid == [rows[0], rows[6]]
+    assert rule_set.count_rejects(rejected) == {
+        "country.required": 1,
+        "country.regex": 1,
+        "year.min": 1,
+        "year.type": 1,
+        "unit.enum": 1,
+    }
+
+
+def test_field_names_and_bounds_are_not_spliced_into_code():
+    rule_set = compile_rule_set(
+        "odd", {"REJECT(x": {"required": True}, "ratio": {"min": 0.5, "max": 1e300}}
+    )
+
+    valid, rejected = rule_set.validate_batch(
+        [{"REJECT(x": 1, "ratio": 0.75}, {"ratio": 0.75}, {"REJECT(x": 1, "ratio": 0}]
+    )
+
+    assert valid == [{"REJECT(x": 1, "ratio": 0.75}]
+    assert [rule for _, rule in rejected] == ["REJECT(x.required", "ratio.min"]
+    for bound in (float("inf"), float("nan")):
+        with pytest.raises(RuleSetError):
+            compile_rule_set("odd", {"ratio": {"max": bound}})
+
+
+def test_rules_file_is_validated_when_loaded(tmp_path):
+    path = tmp_path / "rules.yaml"
+    path.write_text("econ:\n  year:\n    between: [1, 2]\n")
+
+    with pytest.raises(RuleSetError):
+        load_rule_registry(str(path))
+
+
+@pytest.mark.asyncio
+async def test_rule_rejects_are_dead_lettered_by_workers(
+    worker_database, monkeypatch
+):
+    registry = RuleRegistry({"rules-source": compile_rule_set("rules-source", RULES)})
+    monkeypatch.setattr(common_module, "get_rule_registry", lambda: registry)
+
+    written, dead_lettered = await common_module.ingest_payloads(
+        [{"country": "Brazil", "year": 2001}, {"country": "Brazil", "year": 1800}],
+        source_name="rules-source",
+        origin="file:rules.json",
+        cache_prefix="test:processed",
+    )
+
+    assert (written, dead_lettered) == (1, 1)
+    async with TestSessionLocal() as session:
+        dead_letter = (
+            await session.execute(
+                select(DeadLetter).where(DeadLetter.origin == "file:rules.json")
+            )
+        ).scalar_one()
+    assert dead_letter.error == "Validation rule failed: year.min"
+    counters = get_metrics().snapshot()["counters"]
+    assert counters['validation_rejects{rule="year.min",source="rules-source"}'] >= 1
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+import app.workers.sharding as sharding_module
+from app.workers.sharding import LaneDispatcher, lane_for_source, split_envelope
+
+
+def test_split_envelope_falls_back_to_default_source():
+    assert split_envelope({"source_name": "a", "payload": {"v": 1}}, "d") == ("a", {"v": 1})
+    assert split_envelope({"v": 1}, "d") == ("d", {"v": 1})
+
+
+@pytest.mark.asyncio
+async def test_lanes_keep_per_source_order(monkeypatch):
+    written: list[tuple[str, dict]] = []
+
+    async def fake_ingest_records(records, origin, cache_prefix):
+        await asyncio.sleep(0)
+        written.extend(records)
+        return len(records), 0
+
+    monkeypatch.setattr(sharding_module, "ingest_records", fake_ingest_records)
+    dispatcher = LaneDispatcher(lanes=4, origin="queue:test", cache_prefix="t", max_batch=3)
+    dispatcher.start()
+    for sequence in range(20):
+        for source_name in ("alpha", "beta", "gamma"):
+            await dispatcher.dispatch(source_name, {"seq": sequence})
+    await dispatcher.stop()
+
+    for source_name in ("alpha", "beta", "gamma"):
+        sequences = [payload["seq"] for name, payload in written if name == source_name]
+        assert sequences == list(range(20))
+    assert lane_for_source("alpha", 4) == lane_for_source("alpha", 4)
+
+
+@pytest.mark.asyncio
+async def test_poison_batch_is_dead_lettered_after_retries(monkeypatch):
+    dead_lettered: list[tuple[str, dict]] = []
+
+    async def failing_ingest_records(records, origin, cache_prefix):
+        raise ValueError("poison")
+
+    async def fake_dead_letter_records(records, error, origin):
+        dead_lettered.extend(records)
+
+    monkeypatch.setattr(sharding_module, "ingest_records", failing_ingest_records)
+    monkeypatch.setattr(
+        sharding_module, "dead_letter_records", fake_dead_letter_records
+    )
+    dispatcher = LaneDispatcher(
+        lanes=1,
+        origin="queue:test",
+        cache_prefix="t",
+        retry_backoff_seconds=0,
+        max_retries=2,
+    )
+    dispatcher.start()
+    await dispatcher.dispatch("alpha", {"seq": 1})
+    await asyncio.wait_for(dispatcher.stop(timeout_seconds=5), timeout=10)
+
+    assert dead_lettered == [("alpha", {"seq": 1})]
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_lanes_that_do_not_drain(monkeypatch):
+    async def hanging_ingest_records(records, origin, cache_prefix):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(sharding_module, "ingest_records", hanging_ingest_records)
+    dispatcher = LaneDispatcher(lanes=1, origin="queue:test", cache_prefix="t")
+    dispatcher.start()
+    await dispatcher.dispatch("alpha", {"seq": 1})
+
+    await asyncio.wait_for(dispatcher.stop(timeout_seconds=0.05), timeout=5)
@@ -0,0 +1,245 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+import app.routes.api as api_module
+import app.workers.queue_worker as queue_worker_module
+from app.models import RawEvent
+from app.services import etl as etl_services
+from app.config import get_settings
+from app.services.spool import (
+    EventSpool,
+    SpoolFullError,
+    get_database_circuit_breaker,
+)
+from app.workers.common import ingest_records
+from app.workers.spool_drainer import drain_spool_once
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def fresh_database_breaker():
+    # Failures simulated by one test must not open the circuit for the next
+    get_database_circuit_breaker.cache_clear()
+    yield
+    get_database_circuit_breaker.cache_clear()
+
+
+@pytest.fixture
+def spool(tmp_path):
+    spool = EventSpool(str(tmp_path / "spool.db"), max_events=3)
+    yield spool
+    spool.close()
+
+
+@pytest.mark.asyncio
+async def test_append_is_idempotent_and_claims_lease(spool):
+    first = await spool.append("spool-src", {"value": 1}, "api", "key-1")
+    again = await spool.append("spool-src", {"value": 1}, "api", "key-1")
+    await spool.append("spool-src", {"value": 2}, "api")
+
+    assert first == again == "key-1"
+    assert await spool.depth() == 2
+    claimed = await spool.claim(10)
+    assert [event.payload for event in claimed] == [{"value": 1}, {"value": 2}]
+    # Leased rows are invisible to other drainers until released
+    assert await spool.claim(10) == []
+    await spool.release([claimed[0].id])
+    assert [event.id for event in await spool.claim(10)] == [claimed[0].id]
+    await spool.delete([event.id for event in claimed])
+    assert await spool.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_append_rejects_when_full(spool):
+    await spool.append_many(
+        [("spool-src", {"value": i}, "api", None) for i in range(3)]
+    )
+
+    with pytest.raises(SpoolFullError):
+        await spool.append("spool-src", {"value": 4}, "api")
+
+
+@pytest.mark.asyncio
+async def test_drainer_writes_spooled_events(spool, worker_database):
+    await spool.append("spool-drain", {"spooled": 1}, "api")
+    await spool.append("spool-drain", {"spooled": 2}, "api")
+
+    assert await drain_spool_once(spool, batch_size=10) == 2
+
+    assert await spool.depth() == 0
+    async with TestSessionLocal() as session:
+        count = await session.scalar(
+            select(func.count(RawEvent.id)).where(
+                RawEvent.payload.in_(['{"spooled": 1}', '{"spooled": 2}'])
+            )
+        )
+    assert count == 2
+
+
+@pytest.mark.asyncio
+async def test_drainer_keeps_events_when_database_fails(spool, monkeypatch):
+    async def failing_ingest(*args, **kwargs):
+        raise OperationalError("INSERT", {}, Exception("database is down"))
+
+    monkeypatch.setattr("app.workers.spool_drainer.ingest_records", failing_ingest)
+    await spool.append("spool-drain", {"spooled": 3}, "api")
+
+    with pytest.raises(OperationalError):
+        await drain_spool_once(spool, batch_size=10)
+
+    assert len(await spool.claim(10)) == 1
+
+
+@pytest.mark.asyncio
+async def test_ingest_spools_when_database_fails(test_app, spool, monkeypatch):
+    async def failing_ingest(*args, **kwargs):
+        raise OperationalError("INSERT", {}, Exception("database is down"))
+
+    monkeypatch.setattr(etl_services, "ingest_and_mark_success", failing_ingest)
+    monkeypatch.setattr(api_module, "get_spool", lambda: spool)
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/ingest",
+            json={"source_name": "spool-api", "payload": {"value": 7}},
+            headers={"Idempotency-Key": "api-key-7"},
+        )
+
+    assert response.status_code == 202
+    assert response.json() == {"status": "SPOOLED", "idempotency_key": "api-key-7"}
+    [event] = await spool.claim(10)
+    assert (event.source_name, event.payload) == ("spool-api", {"value": 7})
+
+
+@pytest.mark.asyncio
+async def test_ingest_returns_503_when_spool_full(test_app, spool, monkeypatch):
+    async def failing_ingest(*args, **kwargs):
+        raise OperationalError("INSERT", {}, Exception("database is down"))
+
+    monkeypatch.setattr(etl_services, "ingest_and_mark_success", failing_ingest)
+    monkeypatch.setattr(api_module, "get_spool", lambda: spool)
+    await spool.append_many(
+        [("spool-api", {"value": i}, "api", None) for i in range(3)]
+    )
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/ingest", json={"source_name": "spool-api", "payload": {"value": 8}}
+        )
+
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_replay_of_a_landed_commit_is_skipped(
+    test_app, spool, worker_database, monkeypatch
+):
+    # The API commit landed although the request fell back to the spool
+    monkeypatch.setattr(api_module, "get_spool", lambda: spool)
+    body = {"source_name": "spool-landed", "payload": {"value": 9}}
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/ingest", json=body, headers={"Idempotency-Key": "landed-9"}
+        )
+        retry = await client.post(
+            "/api/ingest", json=body, headers={"Idempotency-Key": "landed-9"}
+        )
+    await spool.append("spool-landed", {"value": 9}, "api", "landed-9")
+
+    assert (response.status_code, retry.status_code) == (201, 409)
+    assert await drain_spool_once(spool, batch_size=10) == 1
+    async with TestSessionLocal() as session:
+        count = await session.scalar(
+            select(func.count(RawEvent.id)).where(
+                RawEvent.idempotency_key == "landed-9"
+            )
+        )
+    assert count == 1
+    assert await spool.depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_spools_without_touching_the_database(
+    test_app, spool, monkeypatch
+):
+    calls = []
+
+    async def failing_ingest(*args, **kwargs):
+        calls.append(kwargs["idempotency_key"])
+        raise OperationalError("INSERT", {}, Exception("database is down"))
+
+    monkeypatch.setattr(get_settings(), "circuit_failure_threshold", 1)
+    monkeypatch.setattr(etl_services, "ingest_and_mark_success", failing_ingest)
+    monkeypatch.setattr(api_module, "get_spool", lambda: spool)
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = [
+            await client.post(
+                "/api/ingest",
+                json={"source_name": "spool-open", "payload": {"value": value}},
+            )
+            for value in (1, 2)
+        ]
+
+    assert [response.status_code for response in responses] == [202, 202]
+    assert len(calls) == 1
+    assert await spool.depth() == 2
+    # The generated key the first attempt was written with is the spooled one
+    assert responses[0].json()["idempotency_key"] == calls[0]
+
+
+@pytest.mark.asyncio
+async def test_delete_and_release_chunk_large_id_lists(tmp_path):
+    spool = EventSpool(str(tmp_path / "large.db"), max_events=2000)
+    try:
+        await spool.append_many(
+            [("spool-large", {"value": index}, "api", None) for index in range(1200)]
+        )
+        claimed = [event.id for event in await spool.claim(2000)]
+        await spool.release(claimed)
+        assert len(await spool.claim(2000)) == 1200
+
+        await spool.delete(claimed)
+
+        assert await spool.depth() == 0
+    finally:
+        spool.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_of_a_landed_queue_batch_is_skipped(
+    spool, worker_database, monkeypatch
+):
+    class FakeClient:
+        async def pull_keyed_batch(self, queue, max_messages):
+            return [("msg-1", {"value": 1}), (None, {"value": 2})]
+
+    async def landed_then_failed(*args, **kwargs):
+        # The commit landed, but the worker saw the connection drop
+        await ingest_records(*args, **kwargs)
+        raise OperationalError("COMMIT", {}, Exception("connection lost"))
+
+    monkeypatch.setattr(queue_worker_module, "RabbitMQClient", FakeClient)
+    monkeypatch.setattr(queue_worker_module, "ingest_records", landed_then_failed)
+    monkeypatch.setattr(queue_worker_module, "get_spool", lambda: spool)
+
+    assert await queue_worker_module.process_queue_once("spool-queue", "spool-q") == 2
+    assert await drain_spool_once(spool, batch_size=10) == 2
+
+    keys = [
+        queue_worker_module.message_key(
+            "queue:spool-queue", "spool-q", "msg-1", {"value": 1}
+        ),
+        queue_worker_module.message_key(
+            "queue:spool-queue", "spool-q", None, {"value": 2}
+        ),
+    ]
+    async with TestSessionLocal() as session:
+        count = await session.scalar(
+            select(func.count(RawEvent.id)).where(RawEvent.idempotency_key.in_(keys))
+        )
+    assert count == 2
+    assert await spool.depth() == 0
@@ -0,0 +1,116 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import app.workers.common as common_module
+from app.config import get_settings
+from app.repositories import SqlAlchemyEventRepository
+from app.services import get_aggregator
+from app.services.aggregates import WindowAggregator
+from app.services.etl import ingest_batch
+from tests.conftest import TestSessionLocal
+
+
+@pytest.fixture(autouse=True)
+def stats_enabled(monkeypatch):
+    monkeypatch.setattr(get_settings(), "stats_enabled", True)
+    get_aggregator.cache_clear()
+    yield
+    get_aggregator.cache_clear()
+
+
+def test_aggregator_keeps_tumbling_windows_per_source_and_status():
+    aggregator = WindowAggregator(window_seconds=60, fields=("value",))
+
+    aggregator.record(1, "SUCCESS", {"value": 4}, at=120.0)
+    aggregator.record(1, "SUCCESS", {"value": 10, "other": 1}, at=179.9)
+    aggregator.record(1, "FAILED", {"value": "n/a"}, at=150.0)
+    aggregator.record(1, "SUCCESS", {"value": 1}, at=180.0)
+
+    rows = {
+        (row["status"], int(row["window_start"].timestamp()), row["field"]): row
+        for row in aggregator.drain()
+    }
+    assert rows[("SUCCESS", 120, "")]["event_count"] == 2
+    assert rows[("SUCCESS", 120, "value")]["value_sum"] == 14
+    assert rows[("SUCCESS", 120, "value")]["value_min"] == 4
+    assert rows[("SUCCESS", 120, "value")]["value_max"] == 10
+    assert rows[("FAILED", 120, "")]["event_count"] == 1
+    assert ("FAILED", 120, "value") not in rows
+    assert rows[("SUCCESS", 180, "")]["event_count"] == 1
+    assert len(aggregator) == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_endpoint_serves_flushed_rollups(test_app):
+    aggregator = get_aggregator()
+    assert aggregator is not None
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for value in (1, 2, 3):
+            response = await client.post(
+                "/api/ingest",
+                json={"source_name": "stats-source", "payload": {"stats": value}},
+            )
+            assert response.status_code == 201
+            # Flushing twice merges into the same rollup rows
+            await aggregator.flush(TestSessionLocal)
+        response = await client.get("/api/stats", params={"source": "stats-source"})
+
+    assert response.status_code == 200
+    windows = response.json()
+    assert sum(window["event_count"] for window in windows) == 3
+    assert {window["status"] for window in windows} == {"SUCCESS"}
+
+
+@pytest.mark.asyncio
+async def test_failed_records_are_counted_in_windows(test_app, worker_database):
+    aggregator = get_aggregator()
+    assert aggregator is not None
+    # Workers count dead letters, batch ingest counts its failed records
+    await common_module.ingest_payloads(
+        [{"value": 1}, {"value": {1, 2}}],
+        source_name="stats-failed",
+        origin="file:stats.json",
+        cache_prefix="test:processed",
+    )
+    async with TestSessionLocal() as session:
+        outcomes = await ingest_batch(
+            SqlAlchemyEventRepository(session=session),
+            [("stats-failed", {"value": 2}), ("stats-failed", {"value": {3}})],
+        )
+        await session.commit()
+    assert [status for status, _, _ in outcomes] == ["SUCCESS", "FAILED"]
+    await aggregator.flush(TestSessionLocal)
+
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/stats", params={"source": "stats-failed"})
+
+    counts: dict[str, int] = {}
+    for window in response.json():
+        counts[window["status"]] = counts.get(window["status"], 0) + window[
+            "event_count"
+        ]
+    assert counts == {"SUCCESS": 2, "FAILED": 2}
+
+
+@pytest.mark.asyncio
+async def test_worker_flushes_its_last_window_on_shutdown(test_app, worker_database):
+    aggregator = get_aggregator()
+    assert aggregator is not None
+    # The flush interval has not passed, so only shutdown writes the rollups
+    await common_module.run_then_shut_down(
+        common_module.ingest_payloads(
+            [{"value": 1}, {"value": 2}],
+            source_name="stats-shutdown",
+            origin="file:stats.json",
+            cache_prefix="test:processed",
+        )
+    )
+    assert len(aggregator) == 0
+
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/stats", params={"source": "stats-shutdown"})
+
+    assert [window["event_count"] for window in response.json()] == [2]
@@ -0,0 +1,22 @@
+from app.workers.supervisor import ScalingPolicy
+
+
+def test_scaling_policy_scales_up_from_observed_throughput():
+    policy = ScalingPolicy(min_workers=1, max_workers=8, target_drain_seconds=10.0)
+    # Two workers drain 10 msg/s each; 600 messages in 10s needs 6 of them.
+    assert policy.desired_workers(current=2, queue_depth=600, throughput=20.0, now=0.0) == 6
+
+
+def test_scaling_policy_adds_worker_without_throughput_signal():
+    policy = ScalingPolicy(min_workers=1, max_workers=4, target_backlog_per_worker=100)
+    assert policy.desired_workers(current=1, queue_depth=50, throughput=None, now=0.0) == 2
+    assert policy.desired_workers(current=4, queue_depth=10_000, throughput=0.0, now=1.0) == 4
+
+
+def test_scaling_policy_scales_down_one_step_after_cooldown():
+    policy = ScalingPolicy(
+        min_workers=1, max_workers=8, scale_down_cooldown_seconds=60.0
+    )
+    assert policy.desired_workers(current=1, queue_depth=5000, throughput=None, now=0.0) == 8
+    assert policy.desired_workers(current=8, queue_depth=0, throughput=0.0, now=30.0) == 8
+    assert policy.desired_workers(current=8, queue_depth=0, throughput=0.0, now=61.0) == 7
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import app.tracing.tracer as tracer_module
+from app.tracing import Tracer, span, traced
+from app.tracing.exporter import JsonlSpanExporter
+from app.tracing.summary import load_traces, main, summarize
+
+
+class MemoryExporter:
+    def __init__(self) -> None:
+        self.spans = []
+
+    def export(self, span, is_root) -> None:
+        self.spans.append(span)
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = MemoryExporter()
+    tracer = Tracer(exporter, sample_rate=1.0)
+    monkeypatch.setattr(tracer_module, "get_tracer", lambda: tracer)
+    return exporter
+
+
+@pytest.mark.asyncio
+async def test_spans_follow_the_trace_across_tasks(exporter):
+    @traced("child")
+    async def child() -> None:
+        await asyncio.sleep(0)
+
+    await child()  # outside any trace: not recorded
+    with span("root", root=True):
+        await asyncio.gather(child(), asyncio.create_task(child()))
+
+    root = exporter.spans[-1]
+    children = exporter.spans[:-1]
+    assert root.name == "root" and root.parent_id is None
+    assert [item.name for item in children] == ["child", "child"]
+    assert {item.parent_id for item in children} == {root.span_id}
+    assert {item.trace_id for item in children} == {root.trace_id}
+
+
+def test_unsampled_traces_record_nothing(monkeypatch):
+    exporter = MemoryExporter()
+    tracer = Tracer(exporter, sample_rate=0.0)
+    monkeypatch.setattr(tracer_module, "get_tracer", lambda: tracer)
+
+    with span("root", root=True) as root:
+        with span("child") as child:
+            pass
+
+    assert root is None and child is None
+    assert exporter.spans == []
+
+
+@pytest.mark.asyncio
+async def test_ingest_request_is_traced_end_to_end(test_app, exporter):
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/ingest",
+            json={"source_name": "traced-source", "payload": {"traced": 1}},
+        )
+        missing = await client.get("/api/processed-records/999999999")
+
+    assert response.status_code == 201
+    assert missing.status_code == 404
+    roots = {item.name: item for item in exporter.spans if item.parent_id is None}
+    record_span = roots["GET /api/processed-records/{record_id}"]
+    assert record_span.attributes["http.target"] == "/api/processed-records/999999999"
+    names = {item.name for item in exporter.spans}
+    assert {
+        "POST /api/ingest",
+        "etl.ingest_and_mark_success",
+        "repository.ingest_event",
+        "repository.mark_processed",
+        "db.commit",
+    } <= names
+    assert len({item.trace_id for item in exporter.spans}) == 2
+
+
+def _write_trace(path) -> None:
+    # root 0-100ms waits on a (0-60) then c (60-100); b (10-30) runs
+    # alongside a and is not on the critical path
+    exporter = JsonlSpanExporter(str(path), service_name="test")
+    ms = 1_000_000
+    spans = {}
+    timings = [("root", 0, 100), ("a", 0, 60), ("b", 10, 30), ("c", 60, 100)]
+    for name, start, end in timings:
+        item = tracer_module.Span("t1", None, name, {"n": 1})
+        item.start_ns, item.end_ns = start * ms, end * ms
+        spans[name] = item
+    for name in ("a", "b", "c"):
+        spans[name].parent_id = spans["root"].span_id
+        exporter.export(spans[name], is_root=False)
+    exporter.export(spans["root"], is_root=True)
+    exporter.close()
+
+
+def test_summary_attributes_critical_path_per_stage(tmp_path, capsys):
+    path = tmp_path / "traces.jsonl"
+    _write_trace(path)
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(spans) == 4
+
+    rows = {row["stage"]: row for row in summarize(load_traces(lines))}
+    assert rows["a"]["critical_ms"] == pytest.approx(60)
+    assert rows["c"]["critical_ms"] == pytest.approx(40)
+    assert rows["b"]["critical_ms"] == 0
+    assert rows["root"]["self_ms"] == 0
+
+    main([str(path), "--top", "2"])
+    output = capsys.readouterr().out
+    assert "1 traces" in output
+    assert "60.0%" in output
@@ -0,0 +1,141 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+import app.workers.common as common_module
+from app.config import get_settings
+from app.models import DeadLetter, ProcessedRecord, RawEvent
+from app.services.transforms import (
+    TransformError,
+    TransformRegistry,
+    compile_transform,
+    get_transform_registry,
+    load_transforms,
+    shutdown_transform_pool,
+)
+from tests.conftest import TestSessionLocal
+
+
+SPEC = {
+    "steps": [
+        {"rename": {"Country Code": "code", "Year": "year"}},
+        {"drop": ["notes"]},
+        {"cast": {"year": "integer", "gdp": "number", "population": "integer"}},
+        {"derive": {"gdp_per_capita": "round(gdp / population, 2)"}},
+        {"lookup": {"field": "code", "target": "region", "table": {"BRA": "LATAM"}}},
+    ]
+}
+
+
+def test_compiled_transform_applies_steps_in_order():
+    transform = compile_transform("econ", SPEC)
+    rows = [
+        {"Country Code": "BRA", "Year": "2001.0", "gdp": "100", "population": "8"},
+        {"Country Code": "XXX", "Year": "2002", "gdp": "", "notes": "n/a"},
+        {"Country Code": "BRA", "Year": "abc"},
+    ]
+
+    results, failures = transform.transform_batch(rows)
+
+    assert results[0] == {
+        "code": "BRA",
+        "year": 2001,
+        "gdp": 100.0,
+        "population": 8,
+        "gdp_per_capita": 12.5,
+        "region": "LATAM",
+    }
+    assert results[1]["gdp_per_capita"] is None
+    assert results[1]["region"] is None
+    assert "notes" not in results[1]
+    assert results[2] is None
+    assert [index for index, _ in failures] == [2]
+    # Input rows are left untouched
+    assert rows[0]["Year"] == "2001.0"
+
+
+def test_derive_rejects_unsafe_expressions():
+    with pytest.raises(TransformError):
+        compile_transform("econ", {"steps": [{"derive": {"x": "gdp.__class__"}}]})
+    with pytest.raises(TransformError):
+        compile_transform("econ", {"steps": [{"derive": {"x": "open('f')"}}]})
+
+
+@pytest.mark.asyncio
+async def test_process_pool_compiles_transforms_in_workers(tmp_path):
+    path = tmp_path / "transforms.json"
+    path.write_text(json.dumps({"econ": {**SPEC, "process_pool": True}}))
+    registry = TransformRegistry(
+        load_transforms(str(path)), path=str(path), process_workers=1, pool_min_rows=2
+    )
+    rows = [{"Country Code": "BRA", "Year": str(2000 + index)} for index in range(3)]
+    try:
+        results, failures = await registry.transform_batch("econ", rows)
+    finally:
+        registry.close()
+
+    assert failures == []
+    assert [result["year"] for result in results] == [2000, 2001, 2002]
+
+
+@pytest.mark.asyncio
+async def test_run_then_shut_down_shuts_down_the_transform_pool(
+    tmp_path, monkeypatch
+):
+    path = tmp_path / "transforms.json"
+    path.write_text(json.dumps({"econ": {**SPEC, "process_pool": True}}))
+    monkeypatch.setattr(get_settings(), "transform_rules_path", str(path))
+    monkeypatch.setattr(get_settings(), "transform_process_workers", 1)
+    monkeypatch.setattr(get_settings(), "transform_pool_min_rows", 2)
+    get_transform_registry.cache_clear()
+    registry = get_transform_registry()
+    rows = [{"Country Code": "BRA", "Year": str(2000 + index)} for index in range(3)]
+
+    async def worker():
+        await registry.transform_batch("econ", rows)
+        assert registry._pool is not None
+        raise RuntimeError("worker crashed")
+
+    try:
+        with pytest.raises(RuntimeError):
+            await common_module.run_then_shut_down(worker())
+        assert registry._pool is None
+    finally:
+        get_transform_registry.cache_clear()
+
+    # Nothing to close once the registry is gone
+    await shutdown_transform_pool()
+
+
+
+@pytest.mark.asyncio
+async def test_workers_store_transformed_result(worker_database, monkeypatch):
+    registry = TransformRegistry({"transform-source": compile_transform("econ", SPEC)})
+    monkeypatch.setattr(common_module, "get_transform_registry", lambda: registry)
+
+    written, dead_lettered = await common_module.ingest_payloads(
+        [{"Country Code": "BRA", "Year": "2003"}, {"Year": "bad"}],
+        source_name="transform-source",
+        origin="file:transform.json",
+        cache_prefix="test:processed",
+    )
+
+    assert (written, dead_lettered) == (1, 1)
+    async with TestSessionLocal() as session:
+        record = (
+            await session.execute(
+                select(ProcessedRecord)
+                .join(RawEvent, RawEvent.id == ProcessedRecord.raw_event_id)
+                .where(RawEvent.payload == '{"Country Code": "BRA", "Year": "2003"}')
+            )
+        ).scalar_one()
+        dead_letter = (
+            await session.execute(
+                select(DeadLetter).where(DeadLetter.origin == "file:transform.json")
+            )
+        ).scalar_one()
+    assert record.result_payload == json.dumps(
+        {"code": "BRA", "year": 2003, "gdp_per_capita": None, "region": "LATAM"}
+    )
+    assert dead_letter.error.startswith("Transformation failed: ValueError")